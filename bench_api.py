@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Нагрузочный замер API товаров (scripts/api_server.py, scripts/api_server_async.py)
+
+N соединений keep-alive в потоках в течение заданного времени запрашивают
+один адрес. Печатаются запросов в секунду, задержки (p50/p99/max) и коды
+ответов. С --etag каждый запрос идет с If-None-Match последнего ETag
+(повторные загрузки каталога браузером - ответы 304).
+
+Запуск: python bench_api.py [адрес] [секунд] [соединений] [--etag]
+Например: python bench_api.py http://127.0.0.1:5002/api/products 10 50
+"""
+
+import sys
+import time
+import threading
+from collections import Counter
+from http.client import HTTPConnection
+from urllib.parse import urlsplit
+
+DEFAULT_URL = 'http://127.0.0.1:5002/api/products'
+
+
+def worker(url: str, deadline: float, use_etag: bool, latencies: list, statuses: Counter, lock: threading.Lock):
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    connection = HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    etag = None
+    local_latencies, local_statuses = [], Counter()
+    while time.perf_counter() < deadline:
+        headers = {'If-None-Match': etag} if use_etag and etag else {}
+        started = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except OSError as e:
+            local_statuses[type(e).__name__] += 1
+            connection.close()
+            connection = HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+            continue
+        local_latencies.append(time.perf_counter() - started)
+        local_statuses[response.status] += 1
+        etag = response.getheader('ETag') or etag
+    connection.close()
+    with lock:
+        latencies.extend(local_latencies)
+        statuses.update(local_statuses)
+
+
+def percentile(values: list, share: float) -> float:
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(len(values) * share))]
+
+
+def run(url: str, seconds: float, connections: int, use_etag: bool) -> dict:
+    latencies, statuses, lock = [], Counter(), threading.Lock()
+    deadline = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=worker, args=(url, deadline, use_etag, latencies, statuses, lock), daemon=True)
+        for _ in range(connections)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50': percentile(latencies, 0.5),
+        'p99': percentile(latencies, 0.99),
+        'max': latencies[-1] if latencies else 0.0,
+        'statuses': dict(statuses),
+    }
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    url = args[0] if args else DEFAULT_URL
+    seconds = float(args[1]) if len(args) > 1 else 10
+    connections = int(args[2]) if len(args) > 2 else 50
+    use_etag = '--etag' in sys.argv
+    print(f"🧪 {url}: {connections} соединений, {seconds:.0f} с{', с If-None-Match' if use_etag else ''}")
+    result = run(url, seconds, connections, use_etag)
+    print(f"   запросов {result['requests']}, {result['rps']:.0f} в секунду")
+    print(f"   задержка p50 {result['p50'] * 1000:.1f} мс, p99 {result['p99'] * 1000:.1f} мс, "
+          f"max {result['max'] * 1000:.1f} мс")
+    print(f"   ответы: {result['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Замеры синхронизации с Google Sheets на локальной замене (fake_sheets.py)
+
+Сценарии на листе из N синтетических строк:
+- SheetsDeltaSync: первая сверка, повтор без изменений, правки 1% строк
+  в таблице и локально;
+- запись изменений по одной ячейке против одного batch_update
+  (с квотой 60 запросов в минуту, как у Sheets API);
+- чтение: get_all_values против потокового iter_products (пиковая память);
+- те же записи через SheetsClient: ограничение частоты и повторы
+  (без ошибок 429) и склейка в один batch_update;
+- GoogleSheetsAPI.update_products_order через HTTP-сервер (если
+  установлен requests).
+
+Задержка не ждется, а суммируется (Faults(sleep=False)), поэтому
+«время API» и число запросов одинаковы от запуска к запуску.
+
+Запуск: python bench_sheets_sync.py [строк] [задержка_мс]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+import tracemalloc
+
+from fake_sheets import FakeAPIError, FakeSheet, FakeWorksheet, FakeSpreadsheet, Faults, generate_rows, run_server
+from sheets_client import SheetsClient, quota_bucket
+from sheets_reader import iter_products
+from sheets_sync import SHEET_FIELDS, SheetsDeltaSync, parse_rows
+
+BENCH_PORT = 8090
+CHANGED_SHARE = 0.01
+
+
+def products_from_values(values: list) -> list:
+    """Товары products.json из строк листа"""
+    _, rows = parse_rows(values)
+    return [dict(record) for _, record in rows.values() if record.get('title')]
+
+
+def measure(sheet: FakeSheet, action):
+    """Выполняет action и возвращает (результат, запросы, время API, время CPU)"""
+    before = dict(sheet.stats)
+    started = time.perf_counter()
+    result = action()
+    wall = time.perf_counter() - started
+    requests_made = sheet.stats['requests'] - before['requests']
+    api_time = sheet.stats['simulated_seconds'] - before['simulated_seconds']
+    return result, requests_made, api_time, wall
+
+
+def print_row(name: str, requests_made: int, api_time: float, wall: float, note: str = ''):
+    print(f"   {name:<34} запросов {requests_made:>5}   API {api_time:>8.2f} с   CPU {wall:>6.2f} с  {note}")
+
+
+def bench_delta_sync(rows: int, latency: float):
+    print(f"\n🔁 SheetsDeltaSync, {rows} строк")
+    sheet = FakeSheet(generate_rows(rows), Faults(latency=latency, sleep=False))
+    worksheet = FakeSpreadsheet(sheet).sheet1
+    products = products_from_values(sheet.values)
+    rng = random.Random(7)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sync = SheetsDeltaSync(worksheet, state_path=os.path.join(tmp, 'state.json'))
+
+        (products, report), n, api, wall = measure(sheet, lambda: sync.sync(products))
+        print_row('первая сверка', n, api, wall)
+
+        (products, report), n, api, wall = measure(sheet, lambda: sync.sync(products))
+        print_row('без изменений', n, api, wall, '(чтение пропущено)' if report['skipped_read'] else '')
+
+        count = max(1, int(rows * CHANGED_SHARE))
+        for row in rng.sample(sheet.values[1:], count):
+            row[SHEET_FIELDS.index('price')] = f"{rng.randrange(5, 100) * 100} р."
+        sheet.updated = time.time() + 1
+        (products, report), n, api, wall = measure(sheet, lambda: sync.sync(products))
+        print_row(f'правки в таблице ({count})', n, api, wall, f"получено {len(report['pulled'])}")
+
+        for product in rng.sample(products, count):
+            product['status'] = 'preorder' if product['status'] == 'stock' else 'stock'
+        (products, report), n, api, wall = measure(sheet, lambda: sync.sync(products))
+        print_row(f'локальные правки ({count})', n, api, wall, f"ячеек {report['cells_written']}")
+
+
+def bench_reads(rows: int, latency: float):
+    print(f"\n📥 Чтение товаров, {rows} строк")
+    sheet = FakeSheet(generate_rows(rows), Faults(latency=latency, sleep=False))
+    worksheet = FakeWorksheet(sheet)
+    readers = (
+        ('get_all_values + разбор', lambda: len(products_from_values(worksheet.get_all_values()))),
+        ('iter_products (страницы)', lambda: sum(1 for _ in iter_products(worksheet))),
+    )
+    for name, read in readers:
+        tracemalloc.start()
+        count, n, api, wall = measure(sheet, read)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print_row(name, n, api, wall, f"товаров {count}, пик памяти {peak / 1024 / 1024:.1f} МБ")
+
+
+def bench_writes(rows: int, latency: float):
+    print(f"\n✍️  Запись {int(rows * CHANGED_SHARE)} изменений, квота 60 запросов/мин")
+    count = max(1, int(rows * CHANGED_SHARE))
+    for name, batched in (('по одной ячейке', False), ('один batch_update', True)):
+        sheet = FakeSheet(generate_rows(rows), Faults(latency=latency, quota_per_minute=60, sleep=False))
+        worksheet = FakeWorksheet(sheet)
+        updates = [{'range': f"B{row}", 'values': [[str(row)]]} for row in range(2, count + 2)]
+
+        def write():
+            if batched:
+                worksheet.batch_update(updates)
+                return 0
+            failed = 0
+            for item in updates:
+                try:
+                    worksheet.update(item['range'], item['values'])
+                except FakeAPIError:
+                    failed += 1
+            return failed
+
+        failed, n, api, wall = measure(sheet, write)
+        print_row(name, n, api, wall, f"ошибок 429: {failed}" if failed else '')
+
+
+def bench_client(rows: int, latency: float):
+    """SheetsClient на виртуальных часах листа: ожидания тоже не ждутся, а суммируются"""
+    print(f"\n🚦 SheetsClient, {int(rows * CHANGED_SHARE)} изменений, квота 60 запросов/мин, 5% ответов 503")
+    count = max(1, int(rows * CHANGED_SHARE))
+    for name, coalesce in (('по одной ячейке с ограничением', False), ('склейка в batch_update', True)):
+        sheet = FakeSheet(generate_rows(rows), Faults(latency=latency, quota_per_minute=60,
+                                                      error_rate=0.05, sleep=False))
+
+        def clock():
+            return sheet.stats['simulated_seconds']
+
+        def sleep(seconds):
+            sheet.stats['simulated_seconds'] += seconds
+
+        client = SheetsClient(FakeWorksheet(sheet), bucket=quota_bucket(clock, sleep), seed=3)
+        worksheet = client.wrap()
+
+        def write():
+            for row in range(2, count + 2):
+                for _ in range(2):  # вторая правка той же ячейки заменяет первую
+                    if coalesce:
+                        client.queue(row, 1, str(row))
+                    else:
+                        worksheet.update(f"B{row}", [[str(row)]])
+            client.flush()
+
+        _, n, api, wall = measure(sheet, write)
+        print_row(name, n, api, wall, f"повторов {client.stats['retries']}, склеено {client.stats['coalesced']}")
+
+
+def bench_reorder_http(rows: int, latency: float):
+    try:
+        import requests  # noqa: F401  (нужен GoogleSheetsAPI)
+    except ImportError:
+        print("\n⚠️ requests не установлен - замер GoogleSheetsAPI через HTTP пропущен")
+        return
+
+    os.environ['SHEETS_API_URL'] = f"http://127.0.0.1:{BENCH_PORT}"
+    from scripts import google_sheets_api
+    google_sheets_api.SHEETS_API_URL = os.environ['SHEETS_API_URL']
+
+    print(f"\n↕️  update_products_order через HTTP, {rows} строк")
+    sheet = FakeSheet(generate_rows(rows), Faults(latency=latency, sleep=False))
+    server = run_server(sheet, BENCH_PORT)
+    try:
+        api = google_sheets_api.GoogleSheetsAPI()
+        api.api_key = 'fake'
+        ids = [str(i) for i in range(1, 101)]
+        orders = {product_id: len(ids) - i for i, product_id in enumerate(ids)}
+
+        def one_by_one():
+            for product_id, order in orders.items():
+                api.update_products_order({product_id: order + 1000})
+
+        _, n, api_time, wall = measure(sheet, one_by_one)
+        print_row(f'по одному товару ({len(ids)})', n, api_time, wall)
+        _, n, api_time, wall = measure(sheet, lambda: api.update_products_order(orders))
+        print_row(f'одним пакетом ({len(ids)})', n, api_time, wall)
+    finally:
+        server.shutdown()
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 150) / 1000
+    print(f"🧪 Замеры синхронизации: {rows} строк, задержка {latency * 1000:.0f} мс на запрос")
+    bench_delta_sync(rows, latency)
+    bench_reads(rows, latency)
+    bench_writes(rows, latency)
+    bench_client(rows, latency)
+    bench_reorder_http(rows, latency)
+
+
+if __name__ == "__main__":
+    main()
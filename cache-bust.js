@@ -3,9 +3,11 @@
 console.log('Cache busted at:', new Date().toISOString());
 
 // Force reload of products.json with cache busting
+// (в собранном сайте имя products.<hash>.json уже меняется вместе с данными)
 function loadProductsWithCacheBust() {
+    const assets = window.__ASSETS__ || {};
     const timestamp = new Date().getTime();
-    return fetch(`products.json?v=${timestamp}`)
+    return fetch(assets['products.json'] || `products.json?v=${timestamp}`)
         .then(response => response.json())
         .then(data => {
             console.log('Products loaded with cache bust:', data);
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Локальная замена Google Sheets для проверки и замеров синхронизации
+
+- FakeSheet - данные листа в памяти (можно сгенерировать 10k+ строк);
+- FakeClient / FakeSpreadsheet / FakeWorksheet - те вызовы gspread,
+  которые используют наши скрипты (get_all_values и get_values
+  дополняют короткие строки пустыми ячейками, get и batch_get - нет,
+  как в gspread);
+- run_server() - HTTP-сервер с частью Sheets API v4 (values.get,
+  update, append, batchGet, batchUpdate) для GoogleSheetsAPI
+  (адрес задается переменной окружения SHEETS_API_URL).
+
+Задержка, ошибки 429 (квота в минуту) и 5xx настраиваются через Faults.
+Со sleep=False задержка не ждется, а только суммируется в
+stats['simulated_seconds'] - так замеры повторяются один в один.
+
+Запуск сервера: python fake_sheets.py [порт] [строк]
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import threading
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from sheets_client import column_letter
+
+HEADERS = ['ID', 'Order', 'Section', 'Title', 'Price', 'Desc', 'Meta', 'Status', 'Images', 'Link']
+DEFAULT_PORT = 8089
+MAX_COLUMNS = 26
+MAX_ROWS = 1000000
+GRID_ROWS = 1000  # строк в сетке нового листа Google
+
+
+class FakeAPIError(Exception):
+    """Ошибка API в стиле gspread.exceptions.APIError (code и response.status_code)"""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"{code}: {message}")
+        self.code = code
+        self.response = SimpleNamespace(status_code=code, headers={'Retry-After': '1'} if code == 429 else {})
+
+
+class Faults:
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, quota_per_minute: int = 0,
+                 error_rate: float = 0.0, sleep: bool = True, seed: int = 42):
+        """
+        latency/jitter - задержка каждого запроса (сек), quota_per_minute -
+        сколько запросов в минуту проходит до 429 (0 - без ограничения),
+        error_rate - доля ответов 503, sleep=False - задержка только считается.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.quota_per_minute = quota_per_minute
+        self.error_rate = error_rate
+        self.sleep = sleep
+        self.rng = random.Random(seed)
+
+
+def column_index(letters: str) -> int:
+    """A -> 0, AA -> 26"""
+    index = 0
+    for char in letters.upper():
+        index = index * 26 + ord(char) - ord('A') + 1
+    return index - 1
+
+
+def parse_range(a1: str) -> tuple:
+    """'Sheet1!B2:D10' -> (строка0, колонка0, строка1, колонка1) включительно, с 0"""
+    a1 = a1.split('!', 1)[-1]
+    start, _, end = a1.partition(':')
+
+    def cell(ref, default_row):
+        match = re.fullmatch(r'([A-Za-z]*)(\d*)', ref)
+        if not match:
+            raise ValueError(f"Неверный диапазон: {a1}")
+        letters, digits = match.groups()
+        col = column_index(letters) if letters else None
+        row = int(digits) - 1 if digits else default_row
+        return row, col
+
+    r0, c0 = cell(start, 0)
+    if end:
+        r1, c1 = cell(end, MAX_ROWS - 1)
+    else:
+        r1, c1 = r0, c0
+    return r0, c0 if c0 is not None else 0, r1, c1 if c1 is not None else MAX_COLUMNS - 1
+
+
+def fill_gaps(rows: list) -> list:
+    """Дополняет строки пустыми ячейками до общей ширины (как gspread.utils.fill_gaps)"""
+    width = max((len(row) for row in rows), default=0)
+    return [list(row) + [''] * (width - len(row)) for row in rows]
+
+
+def generate_rows(count: int, seed: int = 1) -> list:
+    """Синтетический лист товаров: заголовки + count строк"""
+    rng = random.Random(seed)
+    sections = ['home', 'nessffo']
+    statuses = ['stock', 'preorder']
+    values = [list(HEADERS)]
+    for i in range(1, count + 1):
+        values.append([
+            str(i),
+            str(i),
+            sections[i % 2],
+            f"Товар {i}",
+            f"{rng.randrange(5, 100) * 100} р.",
+            f"Описание товара {i} " + 'x' * rng.randrange(20, 200),
+            f"Состав: {rng.randrange(10, 100)}% хлопок",
+            statuses[rng.randrange(2)],
+            ','.join(f"product_{i}/product_{i}_{n}.jpg" for n in range(1, rng.randrange(2, 6))),
+            'https://t.me/stub123',
+        ])
+    return values
+
+
+class FakeSheet:
+    """Лист в памяти со счетчиками запросов и имитацией задержек и квот"""
+
+    def __init__(self, values: list = None, faults: Faults = None):
+        self.values = [list(row) for row in (values or [list(HEADERS)])]
+        self.faults = faults or Faults()
+        self.lock = threading.Lock()
+        self.updated = time.time()
+        self.stats = {'requests': 0, 'reads': 0, 'writes': 0, 'cells_written': 0,
+                      'rate_limited': 0, 'errors': 0, 'simulated_seconds': 0.0}
+        self._window = []
+
+    # ---------- имитация сети ----------
+
+    def request(self, kind: str):
+        """Учет запроса: задержка, 429 по квоте, случайные 503"""
+        faults = self.faults
+        with self.lock:
+            self.stats['requests'] += 1
+            delay = faults.latency + (faults.rng.uniform(0, faults.jitter) if faults.jitter else 0)
+            self.stats['simulated_seconds'] += delay
+            now = self.stats['simulated_seconds'] if not faults.sleep else time.monotonic()
+            if faults.quota_per_minute:
+                self._window = [t for t in self._window if now - t < 60]
+                if len(self._window) >= faults.quota_per_minute:
+                    self.stats['rate_limited'] += 1
+                    raise FakeAPIError(429, "Quota exceeded for quota metric 'Write requests' per minute")
+                self._window.append(now)
+            if faults.error_rate and faults.rng.random() < faults.error_rate:
+                self.stats['errors'] += 1
+                raise FakeAPIError(503, "The service is currently unavailable")
+            self.stats['reads' if kind == 'read' else 'writes'] += 1
+        if delay and faults.sleep:
+            time.sleep(delay)
+
+    # ---------- данные ----------
+
+    def get(self, a1: str) -> list:
+        """Значения диапазона (пустые хвосты обрезаются, как в API)"""
+        r0, c0, r1, c1 = parse_range(a1)
+        with self.lock:
+            rows = [row[c0:c1 + 1] for row in self.values[r0:r1 + 1]]
+        rows = [row[:max((i + 1 for i, v in enumerate(row) if v != ''), default=0)] for row in rows]
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def set(self, a1: str, values: list) -> int:
+        """Запись значений начиная с левого верхнего угла диапазона"""
+        r0, c0, _, _ = parse_range(a1)
+        cells = 0
+        with self.lock:
+            for i, row in enumerate(values):
+                while len(self.values) <= r0 + i:
+                    self.values.append([])
+                target = self.values[r0 + i]
+                for j, value in enumerate(row):
+                    while len(target) <= c0 + j:
+                        target.append('')
+                    target[c0 + j] = '' if value is None else str(value)
+                    cells += 1
+            self.stats['cells_written'] += cells
+            self.updated = time.time()
+        return cells
+
+    def delete(self, start: int, end: int) -> int:
+        """Удаляет строки start..end (с 1, включительно), нижние сдвигаются вверх"""
+        with self.lock:
+            deleted = len(self.values[start - 1:end])
+            del self.values[start - 1:end]
+            self.updated = time.time()
+        return deleted
+
+    def append(self, values: list) -> str:
+        with self.lock:
+            last = len(self.values)
+            while last > 0 and not any(self.values[last - 1]):
+                last -= 1
+        a1 = f"A{last + 1}"
+        self.set(a1, values)
+        return a1
+
+
+# ---------- замена gspread ----------
+
+class FakeWorksheet:
+    def __init__(self, sheet: FakeSheet, spreadsheet=None):
+        self.sheet = sheet
+        self.spreadsheet = spreadsheet
+        self.title = 'Sheet1'
+
+    @property
+    def row_count(self) -> int:
+        """Строк в сетке листа (данные плюс пустой хвост)"""
+        return max(len(self.sheet.values), GRID_ROWS)
+
+    def get_all_values(self) -> list:
+        self.sheet.request('read')
+        return fill_gaps(self.sheet.get('A1:Z'))
+
+    def get_all_records(self) -> list:
+        values = self.get_all_values()
+        if not values:
+            return []
+        headers = values[0]
+        return [{h: row[i] if i < len(row) else '' for i, h in enumerate(headers)} for row in values[1:]]
+
+    def get_values(self, range_name: str) -> list:
+        self.sheet.request('read')
+        return fill_gaps(self.sheet.get(range_name))
+
+    def get(self, range_name: str) -> list:
+        """Как в API: пустые хвосты строк и диапазона обрезаны"""
+        self.sheet.request('read')
+        return self.sheet.get(range_name)
+
+    def batch_get(self, ranges: list) -> list:
+        self.sheet.request('read')
+        return [self.sheet.get(r) for r in ranges]
+
+    def update(self, range_name, values=None, **kwargs):
+        # gspread 5: update(range, values); gspread 6: update(values, range)
+        if isinstance(range_name, list):
+            range_name, values = values, range_name
+        self.sheet.request('write')
+        self.sheet.set(range_name, values)
+
+    def update_cell(self, row: int, col: int, value):
+        self.sheet.request('write')
+        self.sheet.set(f"{column_letter(col - 1)}{row}", [[value]])
+
+    def batch_update(self, data: list, value_input_option: str = 'RAW', **kwargs):
+        self.sheet.request('write')
+        for item in data:
+            self.sheet.set(item['range'], item['values'])
+
+    def delete_rows(self, start_index: int, end_index: int = None):
+        self.sheet.request('write')
+        self.sheet.delete(start_index, end_index or start_index)
+
+    def append_rows(self, values: list, value_input_option: str = 'RAW', **kwargs):
+        self.sheet.request('write')
+        self.sheet.append(values)
+
+    def append_row(self, values: list, value_input_option: str = 'RAW', **kwargs):
+        self.append_rows([values], value_input_option)
+
+
+class FakeSpreadsheet:
+    def __init__(self, sheet: FakeSheet, spreadsheet_id: str = 'fake'):
+        self.id = spreadsheet_id
+        self.sheet1 = FakeWorksheet(sheet, self)
+
+    @property
+    def lastUpdateTime(self) -> str:
+        return time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(self.sheet1.sheet.updated)) + \
+            f".{int(self.sheet1.sheet.updated * 1000) % 1000:03d}Z"
+
+    def worksheet(self, title: str) -> FakeWorksheet:
+        return self.sheet1
+
+
+class FakeClient:
+    """Замена gspread.authorize(creds): open_by_key возвращает лист в памяти"""
+
+    def __init__(self, sheet: FakeSheet):
+        self.sheet = sheet
+
+    def open_by_key(self, key: str) -> FakeSpreadsheet:
+        return FakeSpreadsheet(self.sheet, key)
+
+
+# ---------- HTTP-сервер (часть Sheets API v4) ----------
+
+class SheetsAPIHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    sheet = None  # задается в make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, status: int, data: dict):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        if status == 429:
+            self.send_header('Retry-After', '1')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, code: int, message: str):
+        status = {429: 'RESOURCE_EXHAUSTED', 503: 'UNAVAILABLE', 400: 'INVALID_ARGUMENT'}.get(code, 'UNKNOWN')
+        self.send_json(code, {'error': {'code': code, 'message': message, 'status': status}})
+
+    def read_json(self) -> dict:
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+    def route(self, method: str):
+        parts = urlsplit(self.path)
+        match = re.fullmatch(r'/v4/spreadsheets/([^/]+)/values(?:/(.+)|:(batchGet|batchUpdate))', parts.path)
+        if not match:
+            self.send_error_json(404, 'Not found')
+            return
+        _, a1, action = match.groups()
+        a1 = unquote(a1) if a1 else None
+        query = parse_qs(parts.query)
+        body = self.read_json() if method in ('PUT', 'POST') else {}
+        kind = 'read' if method == 'GET' else 'write'
+
+        try:
+            self.sheet.request(kind)
+            if action == 'batchGet':
+                ranges = query.get('ranges', [])
+                self.send_json(200, {'valueRanges': [
+                    {'range': r, 'majorDimension': 'ROWS', 'values': self.sheet.get(r)} for r in ranges
+                ]})
+            elif action == 'batchUpdate':
+                cells = sum(self.sheet.set(item['range'], item.get('values', [])) for item in body.get('data', []))
+                self.send_json(200, {'totalUpdatedCells': cells, 'totalUpdatedRanges': len(body.get('data', []))})
+            elif a1.endswith(':append') and method == 'POST':
+                updated = self.sheet.append(body.get('values', []))
+                self.send_json(200, {'updates': {'updatedRange': updated}})
+            elif method == 'PUT':
+                cells = self.sheet.set(a1, body.get('values', []))
+                self.send_json(200, {'updatedRange': a1, 'updatedCells': cells})
+            else:
+                self.send_json(200, {'range': a1, 'majorDimension': 'ROWS', 'values': self.sheet.get(a1)})
+        except FakeAPIError as e:
+            self.send_error_json(e.code, str(e))
+        except (ValueError, KeyError) as e:
+            self.send_error_json(400, str(e))
+
+    def do_GET(self):
+        self.route('GET')
+
+    def do_PUT(self):
+        self.route('PUT')
+
+    def do_POST(self):
+        self.route('POST')
+
+
+def make_server(sheet: FakeSheet, port: int = DEFAULT_PORT, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Сервер для листа (адрес для SHEETS_API_URL: http://host:port)"""
+    handler = type('BoundSheetsAPIHandler', (SheetsAPIHandler,), {'sheet': sheet})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def run_server(sheet: FakeSheet, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """Запускает сервер в фоновом потоке"""
+    server = make_server(sheet, port)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 10000
+    sheet = FakeSheet(generate_rows(rows))
+    print(f"🧪 Локальный Sheets API: http://127.0.0.1:{port} ({rows} строк)")
+    print(f"💡 export SHEETS_API_URL=http://127.0.0.1:{port}")
+    with make_server(sheet, port) as server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\n⏹️ Сервер остановлен")
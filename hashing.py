@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Хеш содержимого файлов
+
+Один помощник для хранилища изображений, сборки сайта и синхронизации
+деплоя. Только стандартная библиотека: модуль импортируют и API-сервер,
+и деплой, которым Pillow не нужен.
+"""
+
+import hashlib
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 содержимого файла (читается кусками по 1 МБ)"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Индекс изображений товаров (img/product_{id} и web/img/product_{id})
+
+Папки сканируются один раз, дальше ответы идут из памяти. Изменения
+отслеживаются по mtime папок (не чаще раза в POLL_INTERVAL секунд):
+перечитываются только папки, которые изменились.
+"""
+
+import os
+import re
+import time
+import threading
+
+from image_pipeline import is_variant_path
+
+IMAGE_ROOTS = ('img', 'web/img')  # по порядку приоритета
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp')
+POLL_INTERVAL = 2.0
+PRODUCT_DIR_RE = re.compile(r'^product_(.+)$')
+
+
+class ImageIndex:
+    def __init__(self, roots=IMAGE_ROOTS, poll_interval: float = POLL_INTERVAL):
+        self.roots = roots
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._dirs = {}  # папка -> (mtime, [пути изображений])
+        self._root_mtimes = {}
+        self._by_id = {}  # ID -> [пути] из первой по приоритету папки с изображениями
+        self._paths = set()
+        self._checked_at = 0.0
+        self.scans = 0
+        self.refresh(force=True)
+
+    @staticmethod
+    def _mtime(path: str):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def _list_dir(self, folder: str) -> list:
+        try:
+            names = sorted(os.listdir(folder))
+        except OSError:
+            return []
+        self.scans += 1
+        return [
+            f"{folder}/{name}" for name in names
+            if name.lower().endswith(IMAGE_EXTENSIONS) and not is_variant_path(name)
+        ]
+
+    def refresh(self, force: bool = False):
+        """Перечитывает изменившиеся папки (не чаще poll_interval, если не force)"""
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.poll_interval:
+            return
+        with self._lock:
+            self._checked_at = now
+            changed = False
+            dirs = {}
+            for root in self.roots:
+                root_mtime = self._mtime(root)
+                if root_mtime is None:
+                    self._root_mtimes.pop(root, None)
+                    continue
+                if force or self._root_mtimes.get(root) != root_mtime:
+                    names = os.listdir(root)
+                    self._root_mtimes[root] = root_mtime
+                    changed = True
+                else:
+                    names = [os.path.basename(d) for d in self._dirs if os.path.dirname(d) == root]
+                for name in names:
+                    if PRODUCT_DIR_RE.match(name):
+                        dirs[f"{root}/{name}"] = None
+
+            for folder in dirs:
+                mtime = self._mtime(folder)
+                cached = self._dirs.get(folder)
+                if mtime is None:
+                    changed = True
+                    continue
+                if force or cached is None or cached[0] != mtime:
+                    dirs[folder] = (mtime, self._list_dir(folder))
+                    changed = True
+                else:
+                    dirs[folder] = cached
+            dirs = {folder: entry for folder, entry in dirs.items() if entry is not None}
+
+            if changed or len(dirs) != len(self._dirs):
+                self._dirs = dirs
+                self._rebuild()
+
+    def _rebuild(self):
+        by_id = {}
+        for root in self.roots:
+            for folder, (_, paths) in self._dirs.items():
+                if os.path.dirname(folder) != root or not paths:
+                    continue
+                product_id = PRODUCT_DIR_RE.match(os.path.basename(folder)).group(1)
+                by_id.setdefault(product_id, paths)
+        self._by_id = by_id
+        self._paths = {path for _, paths in self._dirs.values() for path in paths}
+
+    def invalidate(self):
+        """Проверить изменения при следующем обращении (например, после добавления товара)"""
+        self._checked_at = 0.0
+
+    def images(self, product_id) -> list:
+        """Изображения товара (из img/, иначе из web/img/)"""
+        self.refresh()
+        return self._by_id.get(str(product_id).strip(), [])
+
+    def first_image(self, product_id):
+        images = self.images(product_id)
+        return images[0] if images else None
+
+    def has(self, path: str) -> bool:
+        """Есть ли файл в индексе (вместо os.path.exists)"""
+        self.refresh()
+        return path in self._paths
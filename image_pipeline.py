@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Параллельная обработка изображений товаров
+
+Декодирование, уменьшение, кодирование и запись каждого файла выполняются
+в отдельном процессе, чтобы не блокировать интерфейс менеджера.
+"""
+
+import os
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from PIL import Image
+
+try:
+    import pillow_avif  # noqa: F401 - плагин AVIF для Pillow < 11.3
+except ImportError:
+    pass
+
+# Ширины адаптивных копий для srcset (основной файл остается самым большим)
+VARIANT_WIDTHS = (320, 640, 1024)
+
+# Современные форматы рядом с JPEG: формат -> параметры кодирования
+MODERN_FORMATS = {
+    'avif': {'quality': 55, 'speed': 6},
+    'webp': {'quality': 80, 'method': 5},
+}
+
+
+def supported_formats() -> tuple:
+    """Современные форматы, которые умеет кодировать установленный Pillow"""
+    Image.init()
+    return tuple(fmt for fmt in MODERN_FORMATS if fmt.upper() in Image.SAVE)
+
+
+def format_path(path: str, fmt: str) -> str:
+    """product_2_1.jpg -> product_2_1.webp"""
+    return f"{os.path.splitext(path)[0]}.{fmt}"
+
+
+def save_web_formats(img, jpeg_path: str, quality: int = 85, formats=None) -> list:
+    """Сохраняет JPEG (запасной вариант) и копии в WebP/AVIF рядом с ним"""
+    img.save(jpeg_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+    written = []
+    for fmt in (supported_formats() if formats is None else formats):
+        try:
+            img.save(format_path(jpeg_path, fmt), fmt.upper(), **MODERN_FORMATS[fmt])
+            written.append(fmt)
+        except Exception as e:
+            print(f"⚠️ Не удалось сохранить {fmt.upper()} для {os.path.basename(jpeg_path)}: {e}")
+    return written
+
+
+def variant_path(path: str, width: int) -> str:
+    """product_2_1.jpg -> product_2_1-320w.jpg"""
+    base, ext = os.path.splitext(path)
+    return f"{base}-{width}w{ext}"
+
+
+def is_variant_path(path: str) -> bool:
+    """Является ли файл адаптивной копией (…-320w.jpg)"""
+    base = os.path.splitext(os.path.basename(path))[0]
+    suffix = base.rsplit('-', 1)[-1]
+    return '-' in base and suffix.endswith('w') and suffix[:-1].isdigit()
+
+
+def write_width_variants(img, output_path: str, widths=VARIANT_WIDTHS, quality: int = 85, formats=None) -> dict:
+    """
+    Сохраняет уменьшенные по ширине копии (во всех форматах) рядом с
+    основным файлом. Ширины не меньше ширины исходника пропускаются:
+    копия не была бы уже основного файла, а дескриптор Nw в srcset
+    оказался бы неверным. Возвращает {ширина: записанные форматы}.
+    """
+    written = {}
+    for width in sorted(widths, reverse=True):
+        if img.width <= width:
+            continue
+        height = max(1, round(img.height * width / img.width))
+        img = img.resize((width, height), Image.Resampling.LANCZOS)
+        written[width] = save_web_formats(img, variant_path(output_path, width), quality, formats)
+    return written
+
+
+def product_image_fields(results: list) -> dict:
+    """
+    Поля товара по результатам compress_image для всех его фото:
+    widths - копии, которые есть у каждого фото, formats - форматы,
+    записанные для всех файлов, width - ширины основных файлов через
+    запятую в порядке фото (дескрипторы в srcset).
+    """
+    if not any(results):
+        return {}
+    # Ширина по фото в их порядке: у несжатого фото - пусто
+    width = ','.join(str(r['width']) if r else '' for r in results)
+    results = [r for r in results if r]
+    widths = set.intersection(*(set(r['widths']) for r in results))
+    formats = set.intersection(*(set(r.get('formats', ())) for r in results))
+    return {
+        'width': width,
+        'widths': ','.join(str(w) for w in sorted(widths)),
+        'formats': ','.join(fmt for fmt in MODERN_FORMATS if fmt in formats),
+    }
+
+
+def compress_image(input_path: str, output_path: str, max_size: int = 2000, quality: int = 85,
+                   widths=VARIANT_WIDTHS, formats=None):
+    """
+    Сжатие изображения (по старому рецепту) + адаптивные копии и WebP/AVIF.
+    Возвращает {'width': ширина основного файла, 'widths': записанные
+    копии, 'formats': форматы, которые удалось записать для всех файлов}
+    или None при ошибке.
+    """
+    try:
+        with Image.open(input_path) as img:
+            # Для JPEG просим декодер сразу уменьшить картинку (DCT scaling)
+            img.draft('RGB', (max_size, max_size))
+
+            # Конвертируем в RGB если нужно
+            if img.mode in ('RGBA', 'LA', 'P'):
+                img = img.convert('RGB')
+
+            # Изменяем размер если нужно
+            if max(img.size) > max_size:
+                ratio = max_size / max(img.size)
+                new_size = tuple(int(dim * ratio) for dim in img.size)
+                img = img.resize(new_size, Image.Resampling.LANCZOS)
+
+            # Сохраняем сжатое изображение (JPEG + WebP/AVIF)
+            written_formats = set(save_web_formats(img, output_path, quality, formats))
+
+            # Копии меньшей ширины (каждая уменьшается из предыдущей)
+            variants = write_width_variants(img, output_path, widths, quality, formats) if widths else {}
+            for variant_formats in variants.values():
+                written_formats &= set(variant_formats)
+            result = {
+                'width': img.width,
+                'widths': sorted(variants),
+                'formats': [fmt for fmt in MODERN_FORMATS if fmt in written_formats],
+            }
+
+        print(f"✅ Изображение сжато: {os.path.basename(input_path)} -> {os.path.basename(output_path)}")
+        return result
+
+    except Exception as e:
+        print(f"❌ Ошибка сжатия изображения {input_path}: {e}")
+        return None
+
+
+def plan_product_images(files: list, product_id: str, folder_path: str) -> list:
+    """Список задач (источник, путь результата, имя) с именами product_{id}_{n}.jpg"""
+    jobs = []
+    for i, img_path in enumerate(files, 1):
+        ext = os.path.splitext(img_path)[1].lower()
+        if ext not in ['.jpg', '.jpeg']:
+            ext = '.jpg'
+
+        new_name = f"product_{product_id}_{i}{ext}"
+        jobs.append((img_path, os.path.join(folder_path, new_name), new_name))
+    return jobs
+
+
+def prepare_stored_job(store, src: str, dst: str, params: dict) -> tuple:
+    """
+    Оригинал в хранилище и проверка дубликата для одного файла.
+    Возвращает (путь к оригиналу, ключ кодирования, результат дубликата
+    или None, если файл нужно кодировать). Хеширует и копирует файлы,
+    поэтому вызывается в потоке, а не в цикле событий.
+    """
+    blob = store.put_original(dst, source=src)
+    key = store.encode_key(dst, params)
+    duplicate = store.find_output(key, params, exclude=dst)
+    if duplicate:
+        store.copy_outputs(duplicate, dst, params)
+        result = store.output_result(duplicate)
+        store.record_output(dst, key, result)
+        return blob, key, result
+    store.detach_outputs(dst, params)
+    return blob, key, None
+
+
+async def ingest_product_images(files: list, product_id: str, folder_path: str,
+                                on_progress=None, max_workers: int = None,
+                                store=None, params: dict = None) -> tuple:
+    """
+    Параллельно сжимает выбранные файлы товара в пуле процессов.
+
+    on_progress(done, total, name, ok) вызывается в цикле событий после
+    каждого готового файла. Возвращает (имена успешно обработанных файлов
+    в исходном порядке выбора, поля товара по product_image_fields).
+
+    Если передано хранилище (image_store.ImageStore) и параметры
+    кодирования, оригиналы сначала копируются в него, кодирование идет из
+    неизменной копии, а уже закодированные дубликаты получают ссылки на
+    готовые файлы. Хеширование и копирование тоже идут в потоке, чтобы
+    не останавливать цикл событий интерфейса.
+    """
+    jobs = plan_product_images(files, product_id, folder_path)
+    if not jobs:
+        return [], {}
+
+    os.makedirs(folder_path, exist_ok=True)
+    loop = asyncio.get_running_loop()
+    encoder_kwargs = {k: params[k] for k in ('max_size', 'quality', 'widths', 'formats')} if params else {}
+
+    results = {}
+    keys = {}
+    pending = []
+    done = 0
+    for src, dst, name in jobs:
+        if store is not None and params:
+            src, keys[dst], deduped = await loop.run_in_executor(
+                None, prepare_stored_job, store, src, dst, params)
+            if deduped:
+                results[name] = deduped
+                done += 1
+                if on_progress:
+                    on_progress(done, len(jobs), name, True)
+                continue
+        pending.append((src, dst, name))
+
+    if pending:
+        workers = max_workers or min(len(pending), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            async def run_job(src, dst, name):
+                ok = await loop.run_in_executor(pool, partial(compress_image, src, dst, **encoder_kwargs))
+                return dst, name, ok
+
+            for task in asyncio.as_completed([run_job(*job) for job in pending]):
+                dst, name, ok = await task
+                results[name] = ok
+                if ok and dst in keys:
+                    store.record_output(dst, keys[dst], ok)
+                done += 1
+                if on_progress:
+                    on_progress(done, len(jobs), name, ok)
+
+    if store is not None and params:
+        await loop.run_in_executor(None, store.save)
+
+    names = [name for _, _, name in jobs if results.get(name)]
+    return names, product_image_fields([results[name] for name in names])
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Хранилище оригиналов изображений с адресацией по содержимому
+
+Оригиналы лежат в img_originals/<sha256[:2]>/<sha256>.<ext> и никогда не
+перезаписываются. Манифест image_manifest.json связывает файлы в img/ с
+их оригиналами и с ключом кодирования (хеш оригинала + параметры), чтобы
+оптимизатор не пережимал уже готовые файлы и не кодировал дубликаты
+дважды (дубликат получает жесткие ссылки на уже готовые файлы).
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from datetime import datetime
+
+from hashing import file_hash
+from image_pipeline import VARIANT_WIDTHS, format_path, supported_formats, variant_path
+
+# Хранилище и манифест лежат в папке проекта, откуда бы ни запускали скрипт
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.path.join(PROJECT_DIR, "img_originals")
+MANIFEST_FILE = os.path.join(PROJECT_DIR, "image_manifest.json")
+
+
+def encode_params(max_size: int = 2000, quality: int = 85, widths=VARIANT_WIDTHS, formats=None) -> dict:
+    """Параметры кодирования, входящие в ключ"""
+    return {
+        'max_size': max_size,
+        'quality': quality,
+        'widths': list(widths or ()),
+        'formats': list(supported_formats() if formats is None else formats),
+    }
+
+
+def output_files(path: str, params: dict, result: dict = None) -> list:
+    """
+    Все файлы, которые кодировщик пишет для path: JPEG, копии по ширине и
+    WebP/AVIF. result - что он записал на самом деле (узкому исходнику
+    широкие копии не нужны, формат мог не записаться); без него - все
+    из params.
+    """
+    widths = params['widths'] if result is None else result.get('widths', [])
+    formats = params['formats'] if result is None else result.get('formats', params['formats'])
+    jpegs = [path] + [variant_path(path, w) for w in widths]
+    return jpegs + [format_path(p, fmt) for p in jpegs for fmt in formats]
+
+
+class ImageStore:
+    def __init__(self, store_dir: str = STORE_DIR, manifest_path: str = MANIFEST_FILE):
+        self.store_dir = store_dir
+        self.manifest_path = manifest_path
+        self.manifest = {'originals': {}, 'outputs': {}}
+        self._by_key = {}  # ключ кодирования -> файлы в img/ с этим ключом
+        self.load()
+
+    def load(self):
+        """Загрузка манифеста"""
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    self.manifest = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Манифест {self.manifest_path} поврежден, начинаем заново: {e}")
+        self.manifest.setdefault('originals', {})
+        self.manifest.setdefault('outputs', {})
+        self._by_key = {}
+        for path, output in self.manifest['outputs'].items():
+            self._by_key.setdefault(output.get('key'), set()).add(path)
+
+    def save(self):
+        """Сохранение манифеста (атомарно через временный файл)"""
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def blob_path(self, sha: str, ext: str) -> str:
+        """Путь к оригиналу в хранилище"""
+        return os.path.join(self.store_dir, sha[:2], f"{sha}{ext.lower()}")
+
+    def put_original(self, path: str, source: str = None) -> str:
+        """
+        Кладет оригинал в хранилище и привязывает его к path.
+        source - откуда брать байты (по умолчанию сам path).
+        Одинаковые фото хранятся один раз.
+        """
+        source = source or path
+        sha = file_hash(source)
+        blob = self.blob_path(sha, os.path.splitext(source)[1] or '.jpg')
+        if not os.path.exists(blob):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            shutil.copy2(source, blob)
+            os.chmod(blob, 0o444)  # оригиналы только для чтения
+        self.manifest['originals'][path] = {'sha256': sha, 'blob': blob}
+        return blob
+
+    def original_for(self, path: str) -> str:
+        """
+        Оригинал для файла в img/. Если файл еще не известен хранилищу или
+        был заменен вручную после оптимизации, он сам становится оригиналом.
+        """
+        entry = self.manifest['originals'].get(path)
+        output = self.manifest['outputs'].get(path)
+        if entry and os.path.exists(entry['blob']) and (not output or self._unchanged(path, output)):
+            return entry['blob']
+        return self.put_original(path)
+
+    def encode_key(self, path: str, params: dict) -> str:
+        """Ключ кодирования: хеш оригинала + параметры"""
+        sha = self.manifest['originals'][path]['sha256']
+        raw = json.dumps({'source': sha, 'params': params}, sort_keys=True)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _unchanged(self, path: str, output: dict) -> bool:
+        """Файл в img/ совпадает с тем, что записал оптимизатор (по размеру и mtime)"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return st.st_size == output.get('size') and int(st.st_mtime) == output.get('mtime')
+
+    def is_current(self, path: str, key: str, params: dict) -> bool:
+        """Готовы ли выходные файлы для path с этим ключом"""
+        output = self.manifest['outputs'].get(path)
+        return (
+            output is not None
+            and output.get('key') == key
+            and self._unchanged(path, output)
+            and all(os.path.exists(p) for p in output_files(path, params, output.get('result')))
+        )
+
+    def find_output(self, key: str, params: dict, exclude: str = None):
+        """Другой файл с тем же ключом (дубликат фото), у которого все выходы на месте"""
+        for other in sorted(self._by_key.get(key, ())):
+            if other != exclude and self.output_result(other) and self.is_current(other, key, params):
+                return other
+        return None
+
+    def output_result(self, path: str) -> dict:
+        """Что кодировщик записал для path (результат compress_image)"""
+        return self.manifest['outputs'].get(path, {}).get('result')
+
+    def copy_outputs(self, src_path: str, dst_path: str, params: dict):
+        """
+        Выходы дубликата под именами dst_path: жесткие ссылки на те же
+        файлы (место на диске не тратится), а где ссылки невозможны
+        (другой диск, FAT) - копии.
+        """
+        result = self.output_result(src_path)
+        for src, dst in zip(output_files(src_path, params, result), output_files(dst_path, params, result)):
+            os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+            if os.path.lexists(dst):
+                os.remove(dst)
+            try:
+                os.link(src, dst)
+            except OSError:
+                shutil.copy2(src, dst)
+
+    def detach_outputs(self, path: str, params: dict):
+        """
+        Удаляет выходы path, которые являются жесткими ссылками на файлы
+        дубликата: кодировщик пишет поверх файла, и без этого изменились
+        бы и фото другого товара.
+        """
+        for p in output_files(path, params, None) + output_files(path, params, self.output_result(path)):
+            try:
+                if os.stat(p).st_nlink > 1:
+                    os.remove(p)
+            except FileNotFoundError:
+                pass
+
+    def record_output(self, path: str, key: str, result: dict = None):
+        """Запоминает, что path закодирован с ключом key (и что при этом записано)"""
+        st = os.stat(path)
+        previous = self.manifest['outputs'].get(path)
+        if previous:
+            self._by_key.get(previous.get('key'), set()).discard(path)
+        self._by_key.setdefault(key, set()).add(path)
+        self.manifest['outputs'][path] = {
+            'key': key,
+            'size': st.st_size,
+            'mtime': int(st.st_mtime),
+            'result': result if isinstance(result, dict) else None,
+            'updated': datetime.now().isoformat(),
+        }
+
+    def optimize(self, path: str, params: dict, encoder) -> str:
+        """
+        Кодирует path из его неизменного оригинала.
+        Возвращает 'skipped', 'deduped', 'encoded' или 'failed'.
+        """
+        blob = self.original_for(path)
+        key = self.encode_key(path, params)
+
+        if self.is_current(path, key, params):
+            return 'skipped'
+
+        duplicate = self.find_output(key, params, exclude=path)
+        if duplicate:
+            self.copy_outputs(duplicate, path, params)
+            self.record_output(path, key, self.output_result(duplicate))
+            return 'deduped'
+
+        self.detach_outputs(path, params)
+        result = encoder(blob, path, max_size=params['max_size'], quality=params['quality'],
+                         widths=params['widths'], formats=params['formats'])
+        if not result:
+            return 'failed'
+        self.record_output(path, key, result)
+        return 'encoded'
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Инкрементальная синхронизация папок для деплоя
+
+Вместо rmtree + copytree копирует только новые и измененные файлы и
+удаляет лишние. Манифест .deploy_sync.json хранит размер, mtime и хеш
+каждого файла, поэтому неизмененные файлы не перечитываются.
+"""
+
+import os
+import json
+import shutil
+
+from hashing import file_hash
+
+MANIFEST_FILE = ".deploy_sync.json"
+IGNORED_FILES = {'.DS_Store', 'Thumbs.db'}
+
+
+def list_files(root: str) -> dict:
+    """Относительный путь -> os.stat для всех файлов папки"""
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for name in filenames:
+            if name in IGNORED_FILES:
+                continue
+            full = os.path.join(dirpath, name)
+            files[os.path.relpath(full, root).replace(os.sep, '/')] = os.stat(full)
+    return files
+
+
+def load_manifest(manifest_path: str) -> dict:
+    """Загрузка манифеста синхронизации"""
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"⚠️ Манифест {manifest_path} поврежден, сверяем по хешам: {e}")
+    return {}
+
+
+def save_manifest(manifest_path: str, manifest: dict):
+    """Сохранение манифеста (атомарно через временный файл)"""
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def sync_directory(src: str, dst: str, manifest_path: str = MANIFEST_FILE, delete: bool = True) -> dict:
+    """
+    Синхронизирует dst с src: копирует новые и измененные файлы,
+    удаляет файлы, которых нет в src. Возвращает отчет о разнице.
+    """
+    report = {'added': [], 'updated': [], 'deleted': [], 'unchanged': 0, 'bytes_copied': 0}
+
+    manifest = load_manifest(manifest_path)
+    key = os.path.abspath(dst)
+    known = manifest.get(key, {})
+    entries = {}
+
+    src_files = list_files(src)
+    dst_files = list_files(dst) if os.path.isdir(dst) else {}
+
+    for rel, st in sorted(src_files.items()):
+        src_path = os.path.join(src, rel)
+        dst_path = os.path.join(dst, rel)
+        entry = known.get(rel)
+        dst_st = dst_files.get(rel)
+
+        if dst_st is not None:
+            # Быстрая проверка: источник и копия не менялись с прошлой синхронизации
+            if (entry and entry['size'] == st.st_size and entry['mtime'] == st.st_mtime_ns
+                    and dst_st.st_size == st.st_size and entry.get('dst_mtime') == dst_st.st_mtime_ns):
+                entries[rel] = entry
+                report['unchanged'] += 1
+                continue
+
+            # Размер совпадает - сверяем содержимое
+            if dst_st.st_size == st.st_size:
+                sha = entry['sha256'] if entry and entry['mtime'] == st.st_mtime_ns else file_hash(src_path)
+                if file_hash(dst_path) == sha:
+                    entries[rel] = {'size': st.st_size, 'mtime': st.st_mtime_ns, 'sha256': sha,
+                                    'dst_mtime': dst_st.st_mtime_ns}
+                    report['unchanged'] += 1
+                    continue
+
+        os.makedirs(os.path.dirname(dst_path) or '.', exist_ok=True)
+        shutil.copy2(src_path, dst_path)
+        entries[rel] = {'size': st.st_size, 'mtime': st.st_mtime_ns, 'sha256': file_hash(src_path),
+                        'dst_mtime': os.stat(dst_path).st_mtime_ns}
+        report['updated' if dst_st is not None else 'added'].append(rel)
+        report['bytes_copied'] += st.st_size
+
+    # Удаляем файлы, которых больше нет в источнике
+    if delete:
+        for rel in sorted(set(dst_files) - set(src_files)):
+            os.remove(os.path.join(dst, rel))
+            report['deleted'].append(rel)
+        for dirpath, dirnames, filenames in os.walk(dst, topdown=False):
+            if dirpath != dst and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+
+    manifest[key] = entries
+    save_manifest(manifest_path, manifest)
+    return report
+
+
+def print_report(report: dict, label: str = "Файлы"):
+    """Вывод отчета о синхронизации"""
+    changed = len(report['added']) + len(report['updated']) + len(report['deleted'])
+    if not changed:
+        print(f"✅ {label}: без изменений ({report['unchanged']} файлов)")
+        return
+    print(f"✅ {label}: +{len(report['added'])} ~{len(report['updated'])} -{len(report['deleted'])} "
+          f"(без изменений: {report['unchanged']}, скопировано {report['bytes_copied'] / 1024 / 1024:.1f} МБ)")
+    for rel in report['added']:
+        print(f"   ➕ {rel}")
+    for rel in report['updated']:
+        print(f"   🔄 {rel}")
+    for rel in report['deleted']:
+        print(f"   🗑️ {rel}")
@@ -2,35 +2,88 @@
 # -*- coding: utf-8 -*-
 
 import os
+import json
 import subprocess
-from PIL import Image
 import glob
 
-def optimize_image(image_path, max_size=(800, 800), quality=85):
-    """Оптимизирует изображение для веба"""
+from PIL import Image
+
+from image_pipeline import VARIANT_WIDTHS, compress_image, format_path, is_variant_path, supported_formats, variant_path
+from image_store import ImageStore, encode_params
+
+def optimize_image(image_path, store, max_size=2000, quality=85, widths=VARIANT_WIDTHS):
+    """
+    Оптимизирует изображение для веба из его неизменного оригинала.
+    Уже готовые файлы (тот же оригинал и параметры) пропускаются,
+    одинаковые фото кодируются один раз.
+    """
+    params = encode_params(max_size, quality, widths)
     try:
-        with Image.open(image_path) as img:
-            # Конвертируем в RGB если нужно
-            if img.mode in ('RGBA', 'LA', 'P'):
-                img = img.convert('RGB')
-            
-            # Изменяем размер если изображение слишком большое
-            if img.size[0] > max_size[0] or img.size[1] > max_size[1]:
-                img.thumbnail(max_size, Image.Resampling.LANCZOS)
-            
-            # Сохраняем с оптимизацией
-            img.save(image_path, 'JPEG', quality=quality, optimize=True)
-            print(f"✅ Оптимизировано: {image_path}")
-            
+        result = store.optimize(image_path, params, compress_image)
     except Exception as e:
         print(f"❌ Ошибка оптимизации {image_path}: {e}")
+        return 'failed'
+    
+    icons = {'encoded': '✅ Оптимизировано', 'deduped': '♻️ Дубликат', 'skipped': '⏭️ Без изменений', 'failed': '❌ Ошибка'}
+    print(f"{icons[result]}: {image_path}")
+    return result
+
+def image_width(path):
+    """Ширина изображения (читается только заголовок файла)"""
+    with Image.open(path) as img:
+        return img.width
+
+def record_image_variants(products_file="products.json", widths=VARIANT_WIDTHS, formats=None):
+    """Записывает в товары доступные ширины (widths) и форматы (formats)"""
+    if not os.path.exists(products_file):
+        return
+    
+    if formats is None:
+        formats = supported_formats()
+    
+    with open(products_file, 'r', encoding='utf-8') as f:
+        products = json.load(f)
+    
+    for product in products:
+        paths = [os.path.join('img', img.strip()) for img in product.get('images', '').split(',') if img.strip()]
+        images = [img for img in paths if os.path.exists(img)]
+        
+        # Ширина считается доступной, только если копия есть у всех фото
+        # (узким исходникам широкие копии не пишутся)
+        available_widths = [w for w in widths if images and all(os.path.exists(variant_path(img, w)) for img in images)]
+        if available_widths:
+            product['widths'] = ','.join(str(w) for w in available_widths)
+        else:
+            product.pop('widths', None)
+        
+        # Дескриптор основного файла в srcset - своя ширина у каждого фото
+        # (список в порядке images, у отсутствующих файлов - пусто)
+        if images:
+            product['width'] = ','.join(str(image_width(p)) if p in images else '' for p in paths)
+        else:
+            product.pop('width', None)
+        
+        # Формат считается доступным, только если он есть у всех копий всех фото
+        copies = [
+            path for img in images
+            for path in [img] + [variant_path(img, w) for w in available_widths]
+        ]
+        available = [fmt for fmt in formats if copies and all(os.path.exists(format_path(p, fmt)) for p in copies)]
+        if available:
+            product['formats'] = ','.join(available)
+        else:
+            product.pop('formats', None)
+    
+    with open(products_file, 'w', encoding='utf-8') as f:
+        json.dump(products, f, ensure_ascii=False, indent=2)
+    print(f"📝 Ширины и форматы изображений записаны в {products_file}")
 
 def main():
     """Основная функция оптимизации"""
     print("🖼️ Начинаем оптимизацию изображений...")
     
-    # Находим все JPG файлы в папке img
-    img_files = glob.glob("img/**/*.jpg", recursive=True)
+    # Находим все JPG файлы в папке img (кроме уже созданных копий)
+    img_files = [f for f in glob.glob("img/**/*.jpg", recursive=True) if not is_variant_path(f)]
     
     if not img_files:
         print("❌ Изображения не найдены")
@@ -38,9 +91,17 @@ def main():
     
     print(f"📸 Найдено {len(img_files)} изображений")
     
-    # Оптимизируем каждое изображение
+    # Оптимизируем каждое изображение (оригиналы хранятся в img_originals/)
+    store = ImageStore()
+    stats = {'encoded': 0, 'deduped': 0, 'skipped': 0, 'failed': 0}
     for img_file in img_files:
-        optimize_image(img_file)
+        stats[optimize_image(img_file, store)] += 1
+    store.save()
+    
+    print(f"📊 Закодировано: {stats['encoded']}, дубликатов: {stats['deduped']}, "
+          f"без изменений: {stats['skipped']}, ошибок: {stats['failed']}")
+    
+    record_image_variants()
     
     print("🎉 Оптимизация завершена!")
 
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Точка входа для команд сайта
+
+Использование:
+    python platforma.py build [--out dist] [--no-cache] [--optimize-images] [--inline-critical]
+"""
+
+import sys
+
+from site_build import DIST_DIR, build
+
+USAGE = "Использование: python platforma.py build [--out dist] [--no-cache] [--optimize-images] [--inline-critical]"
+
+
+def cmd_build(args: list) -> bool:
+    """Сборка сайта в dist/"""
+    dist_dir = DIST_DIR
+    options = {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg == '--out' and i + 1 < len(args):
+            dist_dir = args[i + 1]
+            i += 1
+        elif arg == '--no-cache':
+            options['use_cache'] = False
+        elif arg == '--optimize-images':
+            options['optimize_images'] = True
+        elif arg == '--inline-critical':
+            options['inline_critical'] = True
+        else:
+            print(f"❌ Неизвестный аргумент: {arg}")
+            print(USAGE)
+            return False
+        i += 1
+    return build(dist_dir, **options)
+
+
+COMMANDS = {
+    'build': cmd_build,
+}
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in COMMANDS:
+        print(USAGE)
+        sys.exit(1)
+    ok = COMMANDS[sys.argv[1]](sys.argv[2:])
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
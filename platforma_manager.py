@@ -37,9 +37,17 @@ import gspread
 from google.oauth2.credentials import Credentials
 import sys
 import locale
+import math
 import asyncio
-import base64
 from typing import List, Dict, Optional
+from image_pipeline import compress_image, ingest_product_images
+from image_store import ImageStore, encode_params
+from sheets_queue import PermanentWriteError, SheetsWriteQueue
+from sheets_reader import iter_products
+from image_index import ImageIndex
+from thumb_cache import DataUriCache, ThumbnailCache
+from ui_reconcile import KeyedList, RenderWindow, scroll_position, viewport_capacity
+from sheets_sync import SheetsDeltaSync, open_worksheet, print_report as print_sync_report
 from flet import (
     ElevatedButton, OutlinedButton, Row, Icon, Text,
     ButtonStyle, RoundedRectangleBorder,
@@ -64,6 +72,10 @@ else:
         except:
             pass
 
+# Размеры элементов списков для подсчета, сколько их помещается на экране
+TABLE_ROW_HEIGHT = 32  # строка таблицы товаров: текст + отступы 6px
+PREVIEW_TILE_EXTENT = 220  # max_extent плитки в сетке просмотра
+
 class PlatformaManagerFinal:
     def __init__(self):
         self.products = []
@@ -77,6 +89,33 @@ class PlatformaManagerFinal:
         self.edit_button = ft.Ref[ElevatedButton]()
         self.delete_button = ft.Ref[ElevatedButton]()
         self.preview_grid_ref = ft.Ref[ft.GridView]()
+        self.sheets_queue_text = ft.Ref[ft.Text]()
+        
+        # Изменения для Google Sheets уходят в фоне (журнал .sheets_queue.jsonl)
+        self.sheets_queue = SheetsWriteQueue(self.write_sheets_batch, on_change=self.on_sheets_queue_change)
+        
+        # Миниатюры 200px для сетки просмотра (дисковый кэш .thumb_cache/)
+        self.thumbs = ThumbnailCache()
+        self.data_uris = DataUriCache()
+        
+        # Изображения товаров: папки сканируются один раз, дальше - из памяти
+        self.image_index = ImageIndex()
+        
+        # Строки таблицы и плитки просмотра сверяются по ID, а не строятся заново
+        self.table_rows = KeyedList(
+            build=lambda p: self.create_product_table_row(p, 0),
+            signature=self.product_row_signature,
+            update=self.update_product_table_row,
+        )
+        self.preview_tiles = KeyedList(
+            build=self.create_preview_tile,
+            signature=self.preview_tile_signature,
+            update=self.update_preview_tile,
+        )
+        
+        # Контролы строятся только для видимой части списков (дорисовка при прокрутке)
+        self.table_window = RenderWindow(page_size=100)
+        self.preview_window = RenderWindow(page_size=48)
         
         # Для управления порядком в просмотре
         self.selected_preview_product = None
@@ -235,6 +274,9 @@ class PlatformaManagerFinal:
         
         # Создаем интерфейс
         await self.setup_ui()
+        
+        # Фоновая отправка изменений в Google Sheets (в т.ч. оставшихся с прошлого запуска)
+        self.sheets_queue.start()
 
     async def load_products_from_json(self):
         """Загрузка товаров из JSON файла"""
@@ -402,7 +444,9 @@ class PlatformaManagerFinal:
                 tight=True,
                 controls=[
                     ft.Text("Статистика", size=12, weight=ft.FontWeight.W_600, color=self.colors['on_surface_variant']),
-                    ft.Text(f"Товаров: {len(self.products)}", size=11, color=self.colors['on_surface_variant'])
+                    ft.Text(f"Товаров: {len(self.products)}", size=11, color=self.colors['on_surface_variant']),
+                    ft.Text(self.sheets_queue.status_text(), size=11, color=self.colors['on_surface_variant'],
+                            ref=self.sheets_queue_text),
                 ]
             )
         ])
@@ -457,6 +501,7 @@ class PlatformaManagerFinal:
 
     def create_products_table(self):
         """Создание таблицы товаров"""
+        self.table_window.reset()
         self.products_table = ft.Column([
             # Заголовки таблицы
             ft.Container(
@@ -489,6 +534,8 @@ class PlatformaManagerFinal:
                     spacing=0,
                     expand=True,
                     height=200,
+                    on_scroll=self.on_products_table_scroll,
+                    on_scroll_interval=100,
                 ),
                 expand=True,
                 bgcolor=self.colors['surface'],
@@ -500,154 +547,64 @@ class PlatformaManagerFinal:
 
     def create_product_table_row(self, product: Dict, index: int):
         """Создание строки таблицы товара"""
+        def cell_text(value):
+            return ft.Text(str(value), size=12, color="black")
+        
+        texts = (
+            cell_text(product.get('order', 'N/A')),
+            cell_text(product.get('id', index + 1)),
+            cell_text(product.get('title', 'Без названия')),
+            cell_text(product.get('price', '0')),
+        )
         return ft.Container(
             content=ft.Row([
                 # Порядок
-                ft.Container(
-                    content=ft.Text(
-                        str(product.get('order', 'N/A')), 
-                        size=12,
-                        color="black",
-                    ),
-                    width=80,
-                    padding=ft.padding.all(6),
-                ),
-                
+                ft.Container(content=texts[0], width=80, padding=ft.padding.all(6)),
                 # ID
-                ft.Container(
-                    content=ft.Text(
-                        str(product.get('id', index + 1)), 
-                        size=12,
-                        color="black",
-                    ),
-                    width=60,
-                    padding=ft.padding.all(6),
-                ),
-                
+                ft.Container(content=texts[1], width=60, padding=ft.padding.all(6)),
                 # Название
-                ft.Container(
-                    content=ft.Text(
-                        str(product.get('title', 'Без названия')),
-                        size=12,
-                        color="black",
-                    ),
-                    expand=True,
-                    padding=ft.padding.all(6),
-                ),
-                
+                ft.Container(content=texts[2], expand=True, padding=ft.padding.all(6)),
                 # Цена
-                ft.Container(
-                    content=ft.Text(
-                        str(product.get('price', '0')),
-                        size=12,
-                        color="black",
-                    ),
-                    width=100,
-                    padding=ft.padding.all(6),
-                ),
-                
-
+                ft.Container(content=texts[3], width=100, padding=ft.padding.all(6)),
             ]),
             border=ft.border.only(bottom=ft.border.BorderSide(1, "lightgray")),
-            on_click=lambda e: self.select_product(product),
+            # Товар берется из data строки: после обновления на месте он актуален
+            on_click=lambda e: self.select_product(e.control.data['product']),
+            data={'product': product, 'texts': texts},
         )
 
+    def product_row_signature(self, product: Dict):
+        """То, что видно в строке таблицы (и сам объект товара для клика)"""
+        return (id(product),) + tuple(str(product.get(f, '')) for f in ('order', 'id', 'title', 'price'))
+
+    def update_product_table_row(self, row, product: Dict):
+        """Обновление строки таблицы на месте"""
+        order_text, id_text, title_text, price_text = row.data['texts']
+        order_text.value = str(product.get('order', 'N/A'))
+        id_text.value = str(product.get('id', ''))
+        title_text.value = str(product.get('title', 'Без названия'))
+        price_text.value = str(product.get('price', '0'))
+        row.data['product'] = product
+
     def product_first_image_src(self, p: dict) -> str | None:
         """
         Возвращает путь к первому фото товара для GridView.
-        Использует изображения из локальной папки img/.
+        Сначала img/ (локальные изображения), затем web/img/ (последний деплой).
         """
-        product_id = p.get("id", "")
-        if not product_id:
-            return None
-        
-        # Сначала проверяем в img/ (локальные изображения)
-        img_path = f"img/product_{product_id}"
-        if os.path.exists(img_path):
-            for file in sorted(os.listdir(img_path)):
-                if file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
-                    full_path = f"{img_path}/{file}"
-                    print(f"Найдено изображение для товара {product_id}: {full_path}")
-                    # Возвращаем относительный путь для Flet
-                    return f"/{full_path}"
-        
-        # Если нет в img/, проверяем в web/img/ (последний деплой)
-        web_img_path = f"web/img/product_{product_id}"
-        if os.path.exists(web_img_path):
-            # Ищем первое изображение
-            for file in sorted(os.listdir(web_img_path)):
-                if file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
-                    full_path = f"{web_img_path}/{file}"
-                    print(f"Найдено изображение для товара {product_id}: {full_path}")
-                    # Возвращаем относительный путь для Flet
-                    return f"/{full_path}"
-        
-        print(f"Изображение не найдено для товара {product_id}")
-        return None
+        path = self.image_index.first_image(p.get("id", ""))
+        # Возвращаем относительный путь для Flet
+        return f"/{path}" if path else None
 
     def get_product_image_base64(self, p: dict) -> str | None:
         """
-        Возвращает изображение товара в формате base64 для Flet.
+        Возвращает уменьшенное изображение товара в формате base64 (data URI) для Flet.
+        Результат кэшируется по хешу файла, объем кэша ограничен.
         """
-        product_id = p.get("id", "")
-        if not product_id:
-            return None
-        
-        # Сначала проверяем в img/ (локальные изображения)
-        img_path = f"img/product_{product_id}"
-        if os.path.exists(img_path):
-            for file in sorted(os.listdir(img_path)):
-                if file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
-                    full_path = f"{img_path}/{file}"
-                    try:
-                        with open(full_path, 'rb') as img_file:
-                            img_data = img_file.read()
-                            img_base64 = base64.b64encode(img_data).decode('utf-8')
-                            # Определяем MIME тип
-                            if file.lower().endswith('.png'):
-                                mime_type = 'image/png'
-                            elif file.lower().endswith('.jpg') or file.lower().endswith('.jpeg'):
-                                mime_type = 'image/jpeg'
-                            elif file.lower().endswith('.gif'):
-                                mime_type = 'image/gif'
-                            elif file.lower().endswith('.webp'):
-                                mime_type = 'image/webp'
-                            else:
-                                mime_type = 'image/jpeg'
-                            
-                            return f"data:{mime_type};base64,{img_base64}"
-                    except Exception as e:
-                        print(f"Ошибка чтения изображения {full_path}: {e}")
-                        continue
-        
-        # Если нет в img/, проверяем в web/img/ (последний деплой)
-        web_img_path = f"web/img/product_{product_id}"
-        if os.path.exists(web_img_path):
-            # Ищем первое изображение
-            for file in sorted(os.listdir(web_img_path)):
-                if file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
-                    full_path = f"{web_img_path}/{file}"
-                    try:
-                        with open(full_path, 'rb') as img_file:
-                            img_data = img_file.read()
-                            img_base64 = base64.b64encode(img_data).decode('utf-8')
-                            # Определяем MIME тип
-                            if file.lower().endswith('.png'):
-                                mime_type = 'image/png'
-                            elif file.lower().endswith('.jpg') or file.lower().endswith('.jpeg'):
-                                mime_type = 'image/jpeg'
-                            elif file.lower().endswith('.gif'):
-                                mime_type = 'image/gif'
-                            elif file.lower().endswith('.webp'):
-                                mime_type = 'image/webp'
-                            else:
-                                mime_type = 'image/jpeg'
-                            
-                            return f"data:{mime_type};base64,{img_base64}"
-                    except Exception as e:
-                        print(f"Ошибка чтения изображения {full_path}: {e}")
-                        continue
-        
+        for full_path in self.image_index.images(p.get("id", "")):
+            try:
+                return self.data_uris.get(full_path)
+            except Exception as e:
+                print(f"Ошибка чтения изображения {full_path}: {e}")
         return None
 
     def create_product_thumbnail(self, p: dict):
@@ -666,11 +623,12 @@ class PlatformaManagerFinal:
             width=200, height=200,
         )
 
-        if img and os.path.exists(img):
-            # Используем абсолютный путь - это работало!
-            abs_path = os.path.abspath(img)
+        if not img or not os.path.exists(img):
+            return placeholder
+
+        def thumbnail_image(path):
             return ft.Image(
-                src=abs_path,
+                src=os.path.abspath(path),
                 fit=ft.ImageFit.COVER,
                 width=200,
                 height=200,
@@ -678,12 +636,32 @@ class PlatformaManagerFinal:
                 error_content=placeholder,
             )
 
-        return placeholder
+        # Готовая миниатюра из кэша - сразу, без декодирования исходника
+        thumb = self.thumbs.get(img)
+        if thumb:
+            return thumbnail_image(thumb)
+
+        # Иначе плейсхолдер, который заменится, когда миниатюра будет построена в фоне
+        slot = ft.Container(content=placeholder, width=200, height=200)
+
+        def show_thumbnail(path):
+            # Миниатюру построить не удалось - показываем сам исходник
+            # (если и он не откроется, ft.Image покажет плейсхолдер)
+            slot.content = thumbnail_image(path or img)
+            if slot.page:
+                slot.update()
+
+        def on_ready(path):
+            # Колбэк приходит из потока пула - плитку обновляем в цикле событий страницы
+            self.run_on_ui(show_thumbnail, path)
+
+        self.thumbs.request(img, on_ready)
+        return slot
 
     def first_image_path_by_id(self, product: dict) -> str | None:
         """
         Возвращает путь к ПЕРВОЙ картинке товара по его id.
-        Ищет по порядку:
+        Сначала первое фото из поля images, затем
           img/product_{id}/..., затем web/img/product_{id}/...
         Подходит для превью/сеток.
         """
@@ -694,61 +672,25 @@ class PlatformaManagerFinal:
         # 0) если в JSON есть images="product_2/product_2_1.jpg|...", возьмем первое
         images_field = (product.get("images") or "").strip()
         if images_field:
-            first = images_field.split("|")[0].strip()
+            first = re.split(r"[|,]", images_field)[0].strip()
             if first:
                 candidate = first if first.startswith("img/") else f"img/{first}"
-                if os.path.exists(candidate):
+                if self.image_index.has(candidate):
                     return candidate
 
-        exts = (".png", ".jpg", ".jpeg", ".webp", ".gif")
-        folders = [f"img/product_{pid}", f"web/img/product_{pid}"]
-
-        for folder in folders:
-            if os.path.isdir(folder):
-                # сначала пробуем типичные имена
-                candidates = [
-                    f"{folder}/cover.jpg",
-                    f"{folder}/{pid}_1.jpg",
-                    f"{folder}/product_{pid}_1.jpg",
-                    f"{folder}/1.jpg",
-                ]
-                for c in candidates:
-                    if os.path.exists(c):
-                        return c
-                # иначе берём первый попавшийся файл по алфавиту
-                for name in sorted(os.listdir(folder)):
-                    if name.lower().endswith(exts):
-                        return f"{folder}/{name}"
-        return None
+        images = self.image_index.images(pid)
+        if not images:
+            return None
+        # сначала пробуем типичные имена, иначе первый файл по алфавиту
+        folder = os.path.dirname(images[0])
+        for name in ("cover.jpg", f"{pid}_1.jpg", f"product_{pid}_1.jpg", "1.jpg"):
+            if f"{folder}/{name}" in images:
+                return f"{folder}/{name}"
+        return images[0]
 
     def get_product_image_path(self, product: Dict) -> Optional[str]:
         """Получение пути к первому изображению товара"""
-        try:
-            product_id = product.get('id', '')
-            if not product_id:
-                return None
-            
-            # Проверяем разные пути к изображениям
-            possible_paths = [
-                f"img/product_{product_id}",
-                f"web/img/product_{product_id}",
-            ]
-            
-            for image_dir in possible_paths:
-                if os.path.exists(image_dir):
-                    # Ищем первое изображение
-                    for file in sorted(os.listdir(image_dir)):
-                        if file.lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.webp')):
-                            # Используем относительный путь для веб-отображения
-                            relative_path = f"{image_dir}/{file}"
-                            print(f"Найдено изображение для товара {product_id}: {relative_path}")
-                            return relative_path
-            
-            print(f"Изображение не найдено для товара {product_id}")
-            return None
-        except Exception as e:
-            print(f"Ошибка поиска изображения для товара {product.get('id')}: {e}")
-            return None
+        return self.image_index.first_image(product.get('id', ''))
 
     def create_preview_card(self, product: Dict):
         """Создание карточки товара для просмотра"""
@@ -969,6 +911,7 @@ class PlatformaManagerFinal:
 
     def create_preview_view(self):
         """Создание представления предварительного просмотра - ПЛИТКА ДЛЯ ПЕРЕТАСКИВАНИЯ"""
+        self.preview_window.reset()
         return ft.Container(
             content=ft.Column([
                 ft.Text(
@@ -1006,11 +949,13 @@ class PlatformaManagerFinal:
                     content=ft.GridView(
                         expand=True,
                         runs_count=4,
-                        max_extent=220,
+                        max_extent=PREVIEW_TILE_EXTENT,
                         child_aspect_ratio=1.0,
                         spacing=15,
                         run_spacing=15,
                         ref=self.preview_grid_ref,
+                        on_scroll=self.on_preview_grid_scroll,
+                        on_scroll_interval=100,
                     ),
                     expand=True,
                     padding=ft.padding.all(20),
@@ -1243,61 +1188,65 @@ class PlatformaManagerFinal:
 
     def compress_image(self, input_path: str, output_path: str, max_size: int = 2000, quality: int = 85) -> bool:
         """Сжатие изображения (по старому рецепту)"""
-        try:
-            from PIL import Image
-            
-            # Открываем изображение
-            with Image.open(input_path) as img:
-                # Конвертируем в RGB если нужно
-                if img.mode in ('RGBA', 'LA', 'P'):
-                    img = img.convert('RGB')
-                
-                # Изменяем размер если нужно
-                if max(img.size) > max_size:
-                    ratio = max_size / max(img.size)
-                    new_size = tuple(int(dim * ratio) for dim in img.size)
-                    img = img.resize(new_size, Image.Resampling.LANCZOS)
-                
-                # Сохраняем сжатое изображение
-                img.save(output_path, 'JPEG', quality=quality, optimize=True)
-                
-            print(f"✅ Изображение сжато: {os.path.basename(input_path)} -> {os.path.basename(output_path)}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Ошибка сжатия изображения {input_path}: {e}")
-            return False
+        return compress_image(input_path, output_path, max_size=max_size, quality=quality) is not None
+
+    def on_images_progress(self, done: int, total: int, name: str, ok: bool):
+        """Прогресс параллельной обработки изображений"""
+        status = "✅" if ok else "❌"
+        print(f"{status} [{done}/{total}] {name}")
+        if hasattr(self, 'add_files_text') and self.add_files_text.current:
+            self.add_files_text.current.value = f"Обработка изображений: {done}/{total}"
+            self.page.update()
 
     async def add_product_to_sheets(self, product: dict):
-        """Добавление товара в Google Sheets"""
-        try:
-            from scripts.google_sheets_api import GoogleSheetsAPI
-            
-            sheets_api = GoogleSheetsAPI()
-            
-            # Подготавливаем данные для добавления
-            row_data = [
-                product.get('id', ''),
-                product.get('order', ''),
-                product.get('section', ''),
-                product.get('title', ''),
-                product.get('price', ''),
-                product.get('desc', ''),
-                product.get('meta', ''),
-                product.get('status', ''),
-                product.get('images', ''),
-                product.get('link', ''),
-                product.get('updated', '')
-            ]
-            
-            # Добавляем новую строку в Google Sheets
-            await sheets_api.add_product_row(row_data)
-            
-            print(f"✅ Товар '{product.get('title')}' добавлен в Google Sheets")
-            
-        except Exception as e:
-            print(f"❌ Ошибка добавления в Google Sheets: {e}")
-            # Не прерываем выполнение, если Google Sheets недоступен
+        """Добавление товара в Google Sheets (через фоновую очередь, без ожидания сети)"""
+        row_data = [
+            product.get('id', ''),
+            product.get('order', ''),
+            product.get('section', ''),
+            product.get('title', ''),
+            product.get('price', ''),
+            product.get('desc', ''),
+            product.get('meta', ''),
+            product.get('status', ''),
+            product.get('images', ''),
+            product.get('link', ''),
+            product.get('updated', '')
+        ]
+        self.sheets_queue.enqueue_append(row_data)
+        print(f"📒 Товар '{product.get('title')}' поставлен в очередь для Google Sheets")
+
+    def write_sheets_batch(self, kind: str, data) -> bool:
+        """Отправка части пачки из очереди (выполняется в фоновом потоке очереди)"""
+        if not os.path.exists("google_api_config.json"):
+            # Повтор не поможет: очередь останавливается, изменения остаются в журнале
+            raise PermanentWriteError("Google API конфигурация не найдена (google_api_config.json)")
+        
+        from scripts.google_sheets_api import GoogleSheetsAPI
+        
+        sheets_api = GoogleSheetsAPI()
+        sheets_api.load_config()
+        
+        if kind == 'append':
+            return sheets_api.add_product_rows(data)
+        # Товары, которых нет в таблице, повторять бессмысленно - они пропускаются
+        return sheets_api.update_products_order(data) is not None
+
+    def run_on_ui(self, func, *args):
+        """Вызов func(*args) из фонового потока в цикле событий страницы"""
+        async def call():
+            func(*args)
+        self.page.run_task(call())
+
+    def on_sheets_queue_change(self, queue: SheetsWriteQueue):
+        """Счетчик неотправленных изменений в сайдбаре (вызывается из потока очереди)"""
+        if self.page is None or not self.sheets_queue_text.current:
+            return
+        self.run_on_ui(self.show_sheets_queue_status, queue.status_text())
+
+    def show_sheets_queue_status(self, text: str):
+        self.sheets_queue_text.current.value = text
+        self.page.update()
 
     async def save_products_to_json(self):
         """Сохранение товаров в JSON файл"""
@@ -1323,9 +1272,8 @@ class PlatformaManagerFinal:
             return
         
         try:
-            # Очищаем содержимое таблицы (кроме заголовков)
+            # Содержимое таблицы (кроме заголовков)
             table_content = self.products_table.controls[1].content
-            table_content.controls.clear()
             
             # Фильтруем товары по разделу
             filtered_products = [
@@ -1336,21 +1284,27 @@ class PlatformaManagerFinal:
             # Сортируем по порядку (order) - сначала по order как число, потом по id
             filtered_products.sort(key=lambda x: (int(x.get('order', 999)), int(x.get('id', 999))))
             
-            print(f"Отображаем {len(filtered_products)} товаров для раздела '{self.current_section}'")
-            
-            # Добавляем строки товаров
-            for index, product in enumerate(filtered_products):
-                print(f"Добавляем товар: {product.get('title', 'Без названия')} (порядок: {product.get('order', 999)})")
-                table_row = self.create_product_table_row(product, index)
-                table_content.controls.append(table_row)
+            # Строки только для видимой части, переиспользуются по ID
+            visible = self.table_window.visible(filtered_products, key=self.current_section,
+                                                capacity=viewport_capacity(self.page.height, TABLE_ROW_HEIGHT))
+            stats = self.table_rows.reconcile(table_content.controls, visible)
+            print(f"Отображаем {len(visible)} из {len(filtered_products)} товаров для раздела "
+                  f"'{self.current_section}' (новых строк {stats['built']}, обновлено {stats['updated']})")
             
             self.page.update()
+            if self.data_uris.misses:
+                print(self.data_uris.report())
             
         except Exception as e:
             print(f"Ошибка обновления таблицы: {e}")
             import traceback
             traceback.print_exc()
 
+    def on_products_table_scroll(self, e):
+        """Дорисовка следующей страницы строк при прокрутке к концу таблицы"""
+        if self.table_window.grow(scroll_position(e)):
+            self.page.run_task(self.refresh_products_table())
+
     async def sync_products(self, e=None):
         """Отправка данных в Google Sheets"""
         try:
@@ -1541,18 +1495,15 @@ class PlatformaManagerFinal:
             folder_path = os.path.join('img', folder_name)
             os.makedirs(folder_path, exist_ok=True)
             
-            # Обрабатываем и сжимаем изображения
-            image_names = []
-            for i, img_path in enumerate(self.selected_files, 1):
-                ext = os.path.splitext(img_path)[1].lower()
-                if ext not in ['.jpg', '.jpeg']:
-                    ext = '.jpg'
-                
-                new_name = f"product_{new_id}_{i}{ext}"
-                new_path = os.path.join(folder_path, new_name)
-                
-                if self.compress_image(img_path, new_path):
-                    image_names.append(new_name)
+            # Обрабатываем и сжимаем изображения параллельно (в пуле процессов)
+            # Оригиналы сохраняются в хранилище img_originals/ без изменений
+            image_names, image_fields = await ingest_product_images(
+                self.selected_files, new_id, folder_path,
+                on_progress=self.on_images_progress,
+                store=ImageStore(), params=encode_params(),
+            )
+            
+            self.image_index.invalidate()
             
             # Формируем строку изображений для JSON
             images_str = '|'.join(image_names) if image_names else ''
@@ -1573,6 +1524,9 @@ class PlatformaManagerFinal:
                 'order': '1',  # Новый товар получает порядковый номер 1
                 'status': 'active',
                 'images': images_str,  # Строка с изображениями
+                'width': image_fields.get('width', ''),  # Ширины основных файлов по фото (дескрипторы в srcset)
+                'widths': image_fields.get('widths', ''),  # Адаптивные копии, записанные для всех фото
+                'formats': image_fields.get('formats', ''),  # WebP/AVIF, записанные для всех фото
                 'meta': meta,
                 'link': '',
                 'updated': datetime.now().isoformat()
@@ -1584,7 +1538,7 @@ class PlatformaManagerFinal:
             # Сохраняем в JSON
             await self.save_products_to_json()
             
-            # Синхронизируем с Google Sheets (только новый товар)
+            # Ставим новый товар в очередь для Google Sheets (интерфейс не ждет сеть)
             await self.add_product_to_sheets(new_product)
             
             # Обновляем интерфейс
@@ -1646,12 +1600,11 @@ class PlatformaManagerFinal:
             self.page.update()
 
     def refresh_preview_grid_sync(self):
-        """Синхронное обновление сетки предварительного просмотра"""
+        """Синхронное обновление сетки предварительного просмотра (page.update() - за вызывающим)"""
         if not self.preview_grid_ref.current:
             return
 
         grid = self.preview_grid_ref.current
-        grid.controls.clear()
 
         section = getattr(self, "preview_section", "home")
         items = [p for p in self.products if (p.get("section") or "").lower() == section]
@@ -1664,52 +1617,75 @@ class PlatformaManagerFinal:
         # Сохраняем список товаров для управления порядком
         self.preview_products = items.copy()
         
-        print(f"Отображаем {len(items)} товаров в просмотре для раздела '{section}'")
+        # Плитки только для видимой части (миниатюры заказываются по мере прокрутки),
+        # переиспользуются по ID: перестановка двигает две плитки, выделение меняет рамку
+        per_row = math.ceil((self.page.width or 0) / PREVIEW_TILE_EXTENT)
+        visible = self.preview_window.visible(
+            items, key=section, capacity=viewport_capacity(self.page.height, PREVIEW_TILE_EXTENT, per_row))
+        stats = self.preview_tiles.reconcile(grid.controls, visible)
+        print(f"Отображаем {len(visible)} из {len(items)} товаров в просмотре для раздела '{section}' "
+              f"(новых плиток {stats['built']}, обновлено {stats['updated']})")
+
+    def on_preview_grid_scroll(self, e):
+        """Дорисовка следующей страницы плиток при прокрутке к концу сетки"""
+        if self.preview_window.grow(scroll_position(e)):
+            self.refresh_preview_grid_sync()
+            self.page.update()
 
-        for p in items:
-            # Проверяем, выбран ли этот товар
-            is_selected = (self.selected_preview_product and 
-                          self.selected_preview_product.get('id') == p.get('id'))
-            print(f"Товар {p.get('id')} - {p.get('title')} выбран: {is_selected}")
-
-            # Создаем миниатюру товара
-            thumbnail = self.create_product_thumbnail(p)
-
-            # карточка плитки
-            tile = ft.Container(
-                bgcolor=self.colors["surface"],
-                border=ft.border.all(
-                    3 if is_selected else 1, 
-                    self.colors["primary"] if is_selected else self.colors["outline"]
-                ),
-                border_radius=12,
-                clip_behavior=ft.ClipBehavior.HARD_EDGE,
-                content=ft.Column(
-                    [
-                        # миниатюра товара (занимает большую часть)
-                        ft.Container(
-                            content=thumbnail,
-                            expand=True,
-                        ),
-                        # подпись внизу
-                        ft.Container(
-                            content=ft.Text(
-                                p.get("title", ""), 
-                                size=12, 
-                                weight=ft.FontWeight.W_600, 
-                                color=self.colors['on_surface'],
-                                text_align=ft.TextAlign.CENTER,
-                            ),
-                            padding=ft.padding.all(8),
-                            bgcolor=self.colors['surface'],
-                        ),
-                    ],
-                    expand=True,
-                ),
-                on_click=lambda e, pid=p.get("id"): self.on_preview_tile_click(pid),
-            )
+    def is_preview_selected(self, p: dict) -> bool:
+        return bool(self.selected_preview_product and
+                    self.selected_preview_product.get('id') == p.get('id'))
 
-            grid.controls.append(tile)
+    def preview_tile_signature(self, p: dict):
+        """То, что видно на плитке"""
+        return (p.get("title", ""), self.first_image_path_by_id(p), self.is_preview_selected(p))
+
+    def tile_border(self, is_selected: bool):
+        return ft.border.all(
+            3 if is_selected else 1, 
+            self.colors["primary"] if is_selected else self.colors["outline"]
+        )
+
+    def create_preview_tile(self, p: dict):
+        """Плитка товара в сетке просмотра"""
+        # миниатюра товара (занимает большую часть)
+        thumb = ft.Container(content=self.create_product_thumbnail(p), expand=True)
+        # подпись внизу
+        title = ft.Text(
+            p.get("title", ""), 
+            size=12, 
+            weight=ft.FontWeight.W_600, 
+            color=self.colors['on_surface'],
+            text_align=ft.TextAlign.CENTER,
+        )
+        return ft.Container(
+            bgcolor=self.colors["surface"],
+            border=self.tile_border(self.is_preview_selected(p)),
+            border_radius=12,
+            clip_behavior=ft.ClipBehavior.HARD_EDGE,
+            content=ft.Column(
+                [
+                    thumb,
+                    ft.Container(
+                        content=title,
+                        padding=ft.padding.all(8),
+                        bgcolor=self.colors['surface'],
+                    ),
+                ],
+                expand=True,
+            ),
+            on_click=lambda e, pid=p.get("id"): self.on_preview_tile_click(pid),
+            data={'thumb': thumb, 'title': title, 'image': self.first_image_path_by_id(p)},
+        )
+
+    def update_preview_tile(self, tile, p: dict):
+        """Обновление плитки на месте: рамка, подпись и (если сменилось фото) миниатюра"""
+        tile.border = self.tile_border(self.is_preview_selected(p))
+        tile.data['title'].value = p.get("title", "")
+        image = self.first_image_path_by_id(p)
+        if image != tile.data['image']:
+            tile.data['thumb'].content = self.create_product_thumbnail(p)
+            tile.data['image'] = image
 
     async def select_preview_product(self, product: Dict):
         """Выбор товара в просмотре"""
@@ -1859,19 +1835,17 @@ class PlatformaManagerFinal:
             snack_bar.open = True
             self.page.update()
             
-            # Загружаем данные из Google Sheets
-            new_products = await self.load_products_from_sheets()
+            # Разностная синхронизация с Google Sheets (только изменившиеся строки)
+            report = await self.sync_products_with_sheets()
             
-            if new_products:
-                # Умное обновление товаров
-                await self.smart_update_products(new_products)
-                
+            if report is not None:
                 # Обновляем таблицу
                 await self.refresh_products_table()
                 
                 # Показываем успех
                 snack_bar = ft.SnackBar(
-                    content=ft.Text(f"✅ Загружено {len(new_products)} товаров с Google Sheets"),
+                    content=ft.Text(f"✅ Синхронизировано с Google Sheets: из таблицы {len(report['pulled'])}, "
+                                    f"в таблицу {len(report['pushed']) + len(report['appended'])}"),
                     action="OK",
                     bgcolor=self.colors['success'],
                 )
@@ -1903,10 +1877,6 @@ class PlatformaManagerFinal:
     async def load_products_from_sheets(self):
         """Загрузка товаров из Google Sheets через OAuth2"""
         try:
-            import gspread
-            from google.oauth2.credentials import Credentials
-            import json
-            
             # Загружаем конфигурацию Google Sheets
             try:
                 with open('google_api_config.json', 'r') as f:
@@ -1927,86 +1897,12 @@ class PlatformaManagerFinal:
             
             print(f"📥 Загрузка данных из Google Sheets через OAuth2 (ID: {spreadsheet_id})...")
             
-            # Настройки Google Sheets API
-            SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-            CREDENTIALS_FILE = 'token.json'
-            
-            # Получаем клиент для работы с Google Sheets
-            creds = Credentials.from_authorized_user_file(CREDENTIALS_FILE, scopes=SCOPES)
-            client = gspread.authorize(creds)
-            
-            # Открываем таблицу
-            spreadsheet = client.open_by_key(spreadsheet_id)
-            worksheet = spreadsheet.sheet1
-            
-            # Получаем все данные
-            all_values = worksheet.get_all_values()
-            if not all_values:
-                print("❌ Таблица пуста!")
-                return []
-            
-            headers = all_values[0]
-            data = all_values[1:]
-            
-            print(f"📋 Заголовки: {headers}")
-            print(f"📊 Найдено строк данных: {len(data)}")
-            
+            # Только колонки товара, страницами, без чтения всего листа в память
             products = []
-            
-            # Обрабатываем строки данных
-            for i, row in enumerate(data, 1):
-                if not row or len(row) < 4:  # Минимум ID, Order, Section, Title
-                    continue
-                
-                # Очищаем данные
-                def clean_text(text):
-                    if not text:
-                        return ''
-                    # Убираем лишние пробелы и переносы строк
-                    text = str(text).strip().replace('\n', ' ').replace('\r', ' ')
-                    # Убираем множественные пробелы
-                    while '  ' in text:
-                        text = text.replace('  ', ' ')
-                    return text
-                
-                try:
-                    # Парсим данные согласно структуре
-                    product_id = clean_text(row[0]) if len(row) > 0 else ""
-                    order = clean_text(row[1]) if len(row) > 1 else ""
-                    section = clean_text(row[2]) if len(row) > 2 else ""
-                    title = clean_text(row[3]) if len(row) > 3 else ""
-                    price = clean_text(row[4]) if len(row) > 4 else ""
-                    desc = clean_text(row[5]) if len(row) > 5 else ""
-                    meta = clean_text(row[6]) if len(row) > 6 else ""
-                    status = clean_text(row[7]) if len(row) > 7 else ""
-                    images = clean_text(row[8]) if len(row) > 8 else ""
-                    link = clean_text(row[9]) if len(row) > 9 else ""
-                    
-                    # Пропускаем строки без названия
-                    if not title:
-                        continue
-                    
-                    # Создаем объект товара
-                    product = {
-                        'id': product_id,
-                        'order': order,
-                        'section': section,
-                        'title': title,
-                        'price': price,
-                        'desc': desc,
-                        'meta': meta,
-                        'status': status,
-                        'images': images,
-                        'link': link,
-                        'updated': datetime.now().isoformat()
-                    }
-                    
-                    products.append(product)
-                    print(f"✅ Загружен товар: {title} (ID: {product_id}, Order: {order}, Section: {section})")
-                    
-                except Exception as e:
-                    print(f"❌ Ошибка парсинга строки {i}: {e}")
-                    continue
+            for product in iter_products(open_worksheet()):
+                products.append(product)
+                if len(products) % 1000 == 0:
+                    print(f"📊 Загружено строк: {len(products)}...")
             
             print(f"✅ Загружено товаров: {len(products)}")
             return products
@@ -2015,6 +1911,33 @@ class PlatformaManagerFinal:
             print(f"❌ Ошибка загрузки из Google Sheets: {e}")
             return []
 
+    async def sync_products_with_sheets(self):
+        """
+        Двусторонняя синхронизация с Google Sheets по хешам строк:
+        читаются и применяются только изменения, запись - одним пакетом.
+        """
+        try:
+            if not os.path.exists('google_api_config.json') or not os.path.exists('token.json'):
+                print("❌ Файлы OAuth2 не найдены (google_api_config.json, token.json)")
+                return None
+            
+            # Новые товары из очереди записи добавит очередь, а не синхронизация
+            products, report = SheetsDeltaSync(open_worksheet(),
+                                               pending_ids=self.sheets_queue.pending_append_ids()
+                                               ).sync(self.products)
+            print_sync_report(report)
+            if report['aborted']:
+                return None
+            
+            if report['pulled'] or report['removed']:
+                self.products = products
+                await self.save_products()
+            return report
+            
+        except Exception as e:
+            print(f"❌ Ошибка синхронизации с Google Sheets: {e}")
+            return None
+
     async def smart_update_products(self, new_products):
         """Умное обновление товаров с сопоставлением по ID"""
         try:
@@ -2152,7 +2075,7 @@ class PlatformaManagerFinal:
             # Обновляем таблицу товаров
             await self.refresh_products_table()
             
-            self.show_notification("✅ Порядок товаров сохранен в файл и Google Sheets", "success")
+            self.show_notification("✅ Порядок товаров сохранен, Google Sheets обновится в фоне", "success")
             
         except Exception as e:
             print(f"Ошибка сохранения порядка: {e}")
@@ -2176,39 +2099,18 @@ class PlatformaManagerFinal:
             print(f"Ошибка обновления порядка: {e}")
 
     async def update_sheets_order(self):
-        """Обновить порядок товаров в Google Sheets"""
-        try:
-            # Проверяем наличие конфигурации Google API
-            if not os.path.exists("google_api_config.json"):
-                print("⚠️ Google API конфигурация не найдена")
-                return
-            
-            # Импортируем модуль для работы с Google Sheets
-            try:
-                from scripts.google_sheets_api import GoogleSheetsAPI
-            except ImportError:
-                print("⚠️ Модуль Google Sheets API не найден")
-                return
-            
-            # Создаем экземпляр API
-            sheets_api = GoogleSheetsAPI()
-            
-            # Обновляем порядок в Sheets
-            for i, preview_product in enumerate(self.preview_products):
-                product_id = preview_product.get('id')
-                new_order = i + 1
-                
-                # Находим товар в основном списке
-                for product in self.products:
-                    if product.get('id') == product_id:
-                        # Обновляем порядок в Sheets
-                        await sheets_api.update_product_order(product_id, new_order)
-                        break
-            
-            print(f"✅ Обновлен порядок в Google Sheets для {len(self.preview_products)} товаров")
-            
-        except Exception as e:
-            print(f"❌ Ошибка обновления порядка в Google Sheets: {e}")
+        """Поставить новый порядок товаров в очередь для Google Sheets"""
+        # Новый порядок для товаров, которые есть в основном списке
+        known_ids = {product.get('id') for product in self.products}
+        orders = {
+            preview_product.get('id'): i + 1
+            for i, preview_product in enumerate(self.preview_products)
+            if preview_product.get('id') in known_ids
+        }
+        
+        # Отправит фоновая очередь: одно чтение и одна пакетная запись на всю пачку
+        self.sheets_queue.enqueue_order(orders)
+        print(f"📒 Порядок {len(orders)} товаров поставлен в очередь для Google Sheets")
 
     def show_notification(self, message: str, type: str = "info"):
         """Показать уведомление"""
@@ -2296,68 +2198,7 @@ class PlatformaManagerFinal:
         """Обновление сетки предварительного просмотра"""
         if not self.preview_grid_ref.current:
             return
-
-        grid = self.preview_grid_ref.current
-        grid.controls.clear()
-
-        section = getattr(self, "preview_section", "home")
-        items = [p for p in self.products if (p.get("section") or "").lower() == section]
-        # сортировка по order
-        def to_int(v): 
-            try: return int(str(v))
-            except: return 0
-        items.sort(key=lambda x: to_int(x.get("order", 0)))
-
-        # Сохраняем список товаров для управления порядком
-        self.preview_products = items.copy()
-        
-        print(f"Отображаем {len(items)} товаров в просмотре для раздела '{section}'")
-
-        for p in items:
-            # Проверяем, выбран ли этот товар
-            is_selected = (self.selected_preview_product and 
-                          self.selected_preview_product.get('id') == p.get('id'))
-            print(f"Товар {p.get('id')} - {p.get('title')} выбран: {is_selected}")
-
-            # Создаем миниатюру товара
-            thumbnail = self.create_product_thumbnail(p)
-
-            # карточка плитки
-            tile = ft.Container(
-                bgcolor=self.colors["surface"],
-                border=ft.border.all(
-                    3 if is_selected else 1, 
-                    self.colors["primary"] if is_selected else self.colors["outline"]
-                ),
-                border_radius=12,
-                clip_behavior=ft.ClipBehavior.HARD_EDGE,
-                content=ft.Column(
-                    [
-                        # миниатюра товара (занимает большую часть)
-                        ft.Container(
-                            content=thumbnail,
-                            expand=True,
-                        ),
-                        # подпись внизу
-                        ft.Container(
-                            content=ft.Text(
-                                p.get("title", ""), 
-                                size=12, 
-                                weight=ft.FontWeight.W_600, 
-                                color=self.colors['on_surface'],
-                                text_align=ft.TextAlign.CENTER,
-                            ),
-                            padding=ft.padding.all(8),
-                            bgcolor=self.colors['surface'],
-                        ),
-                    ],
-                    expand=True,
-                ),
-                on_click=lambda e, pid=p.get("id"): self.on_preview_tile_click(pid),
-            )
-
-            grid.controls.append(tile)
-
+        self.refresh_preview_grid_sync()
         self.page.update()
 
 def main():
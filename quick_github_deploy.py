@@ -11,6 +11,8 @@ import sys
 import subprocess
 from datetime import datetime
 
+from incremental_sync import print_report, sync_directory
+
 def main():
     print("🐙 Quick GitHub Deploy")
     print("=" * 30)
@@ -34,15 +36,12 @@ def main():
             shutil.copy2('products.json', 'web_combined_working/products.json')
             print("✅ products.json обновлен")
         
-        # 2. Обновляем изображения
+        # 2. Обновляем изображения (только изменившиеся файлы)
         print("🖼️ Обновляем изображения...")
         if os.path.exists('img'):
             web_img_dir = os.path.join('web_combined_working', 'img')
-            if os.path.exists(web_img_dir):
-                import shutil
-                shutil.rmtree(web_img_dir)
-            shutil.copytree('img', web_img_dir)
-            print("✅ Изображения обновлены")
+            report = sync_directory('img', web_img_dir)
+            print_report(report, "Изображения")
         
         # 3. Проверяем изменения
         print("🔍 Проверяем изменения...")
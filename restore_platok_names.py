@@ -6,6 +6,8 @@ import gspread
 from google.oauth2.credentials import Credentials
 from datetime import datetime
 
+from sheets_client import SheetsClient
+
 def restore_platok_names():
     """Восстановление оригинальных названий платков с уникальными ID"""
     print("🔄 Восстановление названий платков...")
@@ -64,42 +66,49 @@ def update_google_sheets(products):
         creds = Credentials.from_authorized_user_file(CREDENTIALS_FILE, scopes=SCOPES)
         client = gspread.authorize(creds)
         
-        # Открываем таблицу
-        sheet = client.open_by_key('1FLlyjpSd9EBOxZC8f0B6-iKRpKCMxcTRqWOHlgUpFoQ').sheet1
+        # Открываем таблицу (вызовы - с ограничением частоты и повторами на 429/5xx)
+        sheets = SheetsClient(client.open_by_key('1FLlyjpSd9EBOxZC8f0B6-iKRpKCMxcTRqWOHlgUpFoQ').sheet1)
+        sheet = sheets.wrap()
         
-        # Получаем заголовки
-        headers = sheet.row_values(1)
+        # Читаем лист один раз вместо поиска каждого товара
+        values = sheet.get_all_values()
+        headers = values[0] if values else []
         print(f"📋 Заголовки: {headers}")
         
         # Находим индексы колонок
         title_idx = headers.index('Title') if 'Title' in headers else -1
+        id_idx = headers.index('ID') if 'ID' in headers else 0
         
         if title_idx == -1:
             print("❌ Не найдена колонка Title в таблице")
             return False
         
-        # Обновляем названия в таблице
-        updated_rows = 0
+        rows_by_id = {}
+        for row_num, row in enumerate(values[1:], start=2):
+            if len(row) > id_idx and row[id_idx].strip():
+                rows_by_id.setdefault(row[id_idx].strip(), row_num)
+        
+        # Ставим названия в очередь и отправляем одним пакетным запросом
+        queued = []
         
         for product in products:
             title = product.get('title', '')
-            product_id = product.get('id', '')
+            product_id = str(product.get('id', ''))
             
-            # Ищем строку с этим товаром по ID
-            try:
-                cell = sheet.find(product_id)
-                row_num = cell.row
-                
-                # Обновляем название
-                sheet.update_cell(row_num, title_idx + 1, title)
-                
-                updated_rows += 1
-                print(f"✅ Обновлена строка {row_num}: ID {product_id} → {title}")
-                
-            except gspread.exceptions.CellNotFound:
+            row_num = rows_by_id.get(product_id)
+            if row_num is None:
                 print(f"⚠️ Товар с ID {product_id} не найден в таблице")
+                continue
+            
+            sheets.queue(row_num, title_idx, title)
+            queued.append((row_num, product_id, title))
         
-        print(f"✅ Обновлено строк в Google Sheets: {updated_rows}")
+        # Успех печатаем только после записи: если flush упадет, строки не обновлены
+        cells = sheets.flush()
+        for row_num, product_id, title in queued:
+            print(f"✅ Обновлена строка {row_num}: ID {product_id} → {title}")
+        print(f"📝 Записано ячеек одним запросом: {cells}")
+        print(f"✅ Обновлено строк в Google Sheets: {len(queued)}")
         return True
         
     except Exception as e:
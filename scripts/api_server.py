@@ -4,15 +4,34 @@
 """
 
 import os
+import sys
 import json
 import hashlib
+import mimetypes
 from datetime import datetime
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory
 from flask_cors import CORS
 from cryptography.fernet import Fernet
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 
+# Общие модули проекта лежат в корне репозитория
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from site_build import COMPRESSIBLE_EXTENSIONS, cache_control
+from stale_cache import StaleWhileRevalidateCache
+from static_files import precompressed_path, site_dir
+
+# Последние удачно загруженные товары (сервер отвечает сразу после перезапуска)
+PRODUCTS_SNAPSHOT = os.path.join(PROJECT_DIR, '.api_products_snapshot.json')
+
+# Через сколько секунд повторить запрос, пока товары не загружены (503)
+UNAVAILABLE_RETRY_AFTER = 5
+
+# Собранный сайт (dist/), а если сборки нет - исходники web/
+SITE_DIR = site_dir(PROJECT_DIR)
+
 app = Flask(__name__)
 CORS(app)  # Разрешаем CORS для веб-сайта
 
@@ -21,8 +40,12 @@ class SecureAPI:
         self.sheets_id = "1FLlyjpSd9EBOxZC8f0B6-iKRpKCMxcTRqWOHlgUpFoQ"
         self.encryption_key = self._get_encryption_key()
         self.cipher_suite = Fernet(self.encryption_key)
-        self.cache = {}
         self.cache_timeout = 300  # 5 минут
+        # Обновление из Sheets идет в фоне, запросы получают последние данные сразу
+        self.cache = StaleWhileRevalidateCache(self.fetch_products_from_sheets, ttl=self.cache_timeout,
+                                               snapshot_path=PRODUCTS_SNAPSHOT, name='products')
+        # Готовый ответ /api/products для текущей версии данных: (версия, тело, ETag)
+        self._products_response = (None, b'', '')
         
     def _get_encryption_key(self):
         """Получение ключа шифрования"""
@@ -37,81 +60,124 @@ class SecureAPI:
             data = data.encode()
         return hashlib.sha256(data).hexdigest()
     
-    def load_products_from_sheets(self):
-        """Загрузка данных из Google Sheets"""
-        try:
-            # Проверяем кэш
-            cache_key = 'products'
-            if cache_key in self.cache:
-                cache_time, cache_data = self.cache[cache_key]
-                if (datetime.now() - cache_time).seconds < self.cache_timeout:
-                    return cache_data
-            
-            # Настройка Google Sheets API
-            scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
-            creds = ServiceAccountCredentials.from_json_keyfile_name('google_api_config.json', scope)
-            client = gspread.authorize(creds)
-            
-            # Открываем таблицу
-            sheet = client.open_by_key(self.sheets_id).sheet1
-            data = sheet.get_all_records()
-            
-            products = []
-            for row in data:
-                # Проверяем целостность данных
-                row_hash = row.get('Hash', '')
-                row_data = {k: v for k, v in row.items() if k != 'Hash'}
-                
-                # Создаем хеш для проверки
-                calculated_hash = self._create_data_hash(json.dumps(row_data, sort_keys=True))
-                
-                if row_hash and row_hash != calculated_hash:
-                    print(f"⚠️ Нарушена целостность данных для товара ID: {row.get('ID', 'Unknown')}")
-                    continue
-                
-                products.append(row_data)
+    def fetch_products_from_sheets(self):
+        """Загрузка данных из Google Sheets (ошибки пробрасываются в кэш)"""
+        # Настройка Google Sheets API
+        scope = ['https://spreadsheets.google.com/feeds', 'https://www.googleapis.com/auth/drive']
+        creds = ServiceAccountCredentials.from_json_keyfile_name('google_api_config.json', scope)
+        client = gspread.authorize(creds)
+        
+        # Открываем таблицу
+        sheet = client.open_by_key(self.sheets_id).sheet1
+        data = sheet.get_all_records()
+        
+        products = []
+        for row in data:
+            # Проверяем целостность данных
+            row_hash = row.get('Hash', '')
+            row_data = {k: v for k, v in row.items() if k != 'Hash'}
             
-            # Сохраняем в кэш
-            self.cache[cache_key] = (datetime.now(), products)
+            # Создаем хеш для проверки
+            calculated_hash = self._create_data_hash(json.dumps(row_data, sort_keys=True))
             
-            return products
+            if row_hash and row_hash != calculated_hash:
+                print(f"⚠️ Нарушена целостность данных для товара ID: {row.get('ID', 'Unknown')}")
+                continue
             
-        except Exception as e:
-            print(f"❌ Ошибка загрузки из Google Sheets: {e}")
-            return []
+            products.append(row_data)
+        
+        print(f"✅ Загружено товаров из Google Sheets: {len(products)}")
+        return products
+    
+    def load_products_from_sheets(self):
+        """
+        Товары из кэша (без ожидания Google Sheets, кроме самого первого
+        запуска). None - данных еще нет: первая загрузка не удалась.
+        """
+        return self.cache.get()
+    
+    def products_response(self):
+        """
+        Тело ответа /api/products и его ETag (хеш самого тела). Сериализуются
+        один раз на версию данных, а не на каждый запрос. (None, None) -
+        данных еще нет.
+        """
+        if self.load_products_from_sheets() is None:
+            return None, None
+        # Данные, версия и время изменения - из одного состояния кэша:
+        # обновление между чтениями не должно попасть в ответ под чужой версией
+        products, version, changed_at = self.cache.current()
+        cached_version, body, etag = self._products_response
+        if cached_version == version and body:
+            return body, etag
+        
+        products_json = json.dumps(products, ensure_ascii=False, sort_keys=True)
+        changed_at = datetime.fromtimestamp(changed_at) if changed_at else datetime.now()
+        body = json.dumps({
+            'success': True,
+            'products': products,
+            'hash': self._create_data_hash(products_json),
+            'timestamp': changed_at.isoformat(),
+            'count': len(products)
+        }, ensure_ascii=False).encode('utf-8')
+        # ETag - от точных байтов ответа (в нем есть и timestamp)
+        etag = self._create_data_hash(body)
+        
+        self._products_response = (version, body, etag)
+        return body, etag
 
 # Инициализируем API
 api = SecureAPI()
 
+def send_static(filename):
+    """Отдает файл сайта, а если клиент принимает - его сжатую копию (.br/.gz)"""
+    path = os.path.join(SITE_DIR, filename)
+    file_path, encoding = precompressed_path(path, request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        response = send_from_directory(SITE_DIR, filename)
+    else:
+        response = send_from_directory(SITE_DIR, os.path.relpath(file_path, SITE_DIR),
+                                       mimetype=mimetypes.guess_type(path)[0])
+        response.headers['Content-Encoding'] = encoding
+    if filename.endswith(COMPRESSIBLE_EXTENSIONS):
+        # Только у текстовых файлов бывают .br/.gz - картинкам Vary лишь дробит кэши
+        response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = cache_control(filename)
+    return response
+
 @app.route('/')
 def index():
     """Главная страница"""
-    return send_from_directory('../web', 'index.html')
+    return send_static('index.html')
 
 @app.route('/<path:filename>')
 def serve_static(filename):
     """Обслуживание статических файлов"""
-    return send_from_directory('../web', filename)
+    return send_static(filename)
 
 @app.route('/api/products')
 def get_products():
-    """API для получения товаров"""
+    """API для получения товаров (ETag = хеш тела ответа, 304 если не изменилось)"""
     try:
-        products = api.load_products_from_sheets()
+        body, etag = api.products_response()
+        if body is None:
+            # Холодный старт без снимка и без связи с Sheets: не отдаем пустой каталог
+            response = jsonify({
+                'success': False,
+                'error': 'Товары еще не загружены из Google Sheets',
+                'timestamp': datetime.now().isoformat()
+            })
+            response.status_code = 503
+            response.headers['Retry-After'] = str(UNAVAILABLE_RETRY_AFTER)
+            return response
         
-        # Создаем хеш данных
-        products_json = json.dumps(products, ensure_ascii=False, sort_keys=True)
-        data_hash = api._create_data_hash(products_json)
-        
-        response = {
-            'success': True,
-            'products': products,
-            'hash': data_hash,
-            'timestamp': datetime.now().isoformat(),
-            'count': len(products)
-        }
-        
-        return jsonify(response)
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, mimetype='application/json')
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
         
     except Exception as e:
         return jsonify({
@@ -151,14 +217,16 @@ def decrypt_data():
 def get_status():
     """API для проверки статуса"""
     try:
-        products = api.load_products_from_sheets()
+        # Только состояние кэша - статус не загружает данные из Sheets
+        cache_status = api.cache.status()
         
         return jsonify({
             'success': True,
             'status': 'online',
-            'products_count': len(products),
-            'last_update': datetime.now().isoformat(),
-            'cache_status': 'active' if 'products' in api.cache else 'empty'
+            'products_count': len(api.cache.value or []),
+            'last_update': cache_status['last_update'],
+            'cache_status': 'active' if api.cache.value is not None else 'empty',
+            'cache': cache_status
         })
         
     except Exception as e:
@@ -187,4 +255,7 @@ if __name__ == '__main__':
     print("   - GET  /api/status   - статус сервера")
     print("   - GET  /api/health   - проверка здоровья")
     
-    app.run(host='0.0.0.0', port=5001, debug=False)
+    # Фоновое обновление товаров до истечения кэша
+    api.cache.start()
+    
+    app.run(host='0.0.0.0', port=5001, debug=False, threaded=True)
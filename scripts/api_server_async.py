@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Асинхронный вариант API сервера товаров (aiohttp)
+
+Один долгоживущий HTTP-сеанс с пулом соединений и один объект учетных
+данных для Google Sheets на все время работы. Обработчики не блокируются:
+данные отдаются из кэша, а обновление из Sheets идет фоновой задачей.
+
+Запуск: python scripts/api_server_async.py [порт]
+"""
+
+import os
+import sys
+import json
+import asyncio
+import hashlib
+from datetime import datetime
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, web
+from google.auth.transport.requests import Request as GoogleAuthRequest
+from google.oauth2.service_account import Credentials
+
+# Общие модули проекта лежат в корне репозитория
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from stale_cache import StaleWhileRevalidateCache
+
+SHEETS_ID = "1FLlyjpSd9EBOxZC8f0B6-iKRpKCMxcTRqWOHlgUpFoQ"
+CREDENTIALS_FILE = 'google_api_config.json'
+SCOPES = ['https://www.googleapis.com/auth/spreadsheets.readonly']
+SHEETS_API_URL = os.environ.get('SHEETS_API_URL', 'https://sheets.googleapis.com').rstrip('/')  # см. fake_sheets.py
+SHEETS_URL = SHEETS_API_URL + "/v4/spreadsheets/{sheet_id}/values/{range}"
+SHEET_RANGE = 'A1:Z'
+
+# Тот же снимок, что у scripts/api_server.py: оба сервера стартуют с последних данных
+PRODUCTS_SNAPSHOT = os.path.join(PROJECT_DIR, '.api_products_snapshot.json')
+CACHE_TIMEOUT = 300  # 5 минут
+UNAVAILABLE_RETRY_AFTER = 5  # секунд до повтора, пока товары не загружены (503)
+DEFAULT_PORT = 5002
+
+
+def numericise(value):
+    """Как gspread.get_all_records: числа из ячеек становятся int/float"""
+    if not isinstance(value, str) or value == '':
+        return value
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def rows_to_records(rows: list) -> list:
+    """Первая строка - заголовки, остальные - записи (как get_all_records)"""
+    if not rows:
+        return []
+    headers = rows[0]
+    return [
+        {header: numericise(row[i]) if i < len(row) else '' for i, header in enumerate(headers)}
+        for row in rows[1:]
+    ]
+
+
+def data_hash(data: str) -> str:
+    """Хеш данных (как SecureAPI._create_data_hash)"""
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+class SheetsBackend:
+    """Чтение таблицы через общий сеанс aiohttp и общие учетные данные"""
+
+    def __init__(self, sheet_id: str = SHEETS_ID, credentials_file: str = CREDENTIALS_FILE):
+        self.sheet_id = sheet_id
+        self.credentials = Credentials.from_service_account_file(credentials_file, scopes=SCOPES)
+        self.session = None
+        self._token_lock = asyncio.Lock()
+
+    async def start(self):
+        connector = TCPConnector(limit=10, keepalive_timeout=60)
+        self.session = ClientSession(connector=connector, timeout=ClientTimeout(total=30))
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+    async def token(self) -> str:
+        """Токен доступа; обновляется (в пуле потоков) только когда истек"""
+        async with self._token_lock:
+            if not self.credentials.valid:
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self.credentials.refresh, GoogleAuthRequest())
+        return self.credentials.token
+
+    async def fetch_products(self) -> list:
+        """Загрузка товаров с проверкой целостности строк (как в api_server.py)"""
+        url = SHEETS_URL.format(sheet_id=self.sheet_id, range=SHEET_RANGE)
+        headers = {'Authorization': f"Bearer {await self.token()}"}
+        async with self.session.get(url, headers=headers) as response:
+            response.raise_for_status()
+            payload = await response.json()
+
+        products = []
+        for row in rows_to_records(payload.get('values', [])):
+            row_hash = row.get('Hash', '')
+            row_data = {k: v for k, v in row.items() if k != 'Hash'}
+            if row_hash and row_hash != data_hash(json.dumps(row_data, sort_keys=True)):
+                print(f"⚠️ Нарушена целостность данных для товара ID: {row.get('ID', 'Unknown')}")
+                continue
+            products.append(row_data)
+
+        print(f"✅ Загружено товаров из Google Sheets: {len(products)}")
+        return products
+
+
+class AsyncProductsAPI:
+    """Кэш товаров с фоновым обновлением и готовым телом ответа на версию данных"""
+
+    def __init__(self, backend: SheetsBackend):
+        self.backend = backend
+        self.cache = StaleWhileRevalidateCache(None, ttl=CACHE_TIMEOUT, snapshot_path=PRODUCTS_SNAPSHOT,
+                                               name='products')
+        self._refresh_task = None
+        self._refresher = None
+        self._response = (None, b'', '')
+
+    async def _refresh(self):
+        try:
+            products = await self.backend.fetch_products()
+            # Сравнение с прежними данными и запись снимка на диск (весь каталог) -
+            # в пуле потоков, чтобы не останавливать обработку запросов
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.cache.set_value, products)
+        except Exception as e:
+            self.cache.set_error(e)
+
+    def refresh(self) -> asyncio.Task:
+        """Одно обновление на всех (single-flight): повторные вызовы получают ту же задачу"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh())
+        return self._refresh_task
+
+    async def refresh_loop(self):
+        """Обновление до истечения кэша, чтобы запросы не видели устаревания"""
+        while True:
+            if self.cache.age() >= self.cache.refresh_after:
+                await self.refresh()
+            await asyncio.sleep(max(1.0, self.cache.refresh_after / 4))
+
+    async def products(self):
+        """Товары из кэша; None - данных еще нет (первая загрузка не удалась)"""
+        if self.cache.value is None:
+            # Самый первый запуск без снимка: ждем общую загрузку
+            await asyncio.shield(self.refresh())
+        elif self.cache.age() >= self.cache.refresh_after:
+            self.refresh()
+        return self.cache.value
+
+    async def products_response(self):
+        """
+        (тело, ETag) для /api/products, сериализуются один раз на версию
+        данных; ETag - хеш самого тела. (None, None) - данных нет.
+        """
+        if await self.products() is None:
+            return None, None
+        # Данные, версия и время изменения - из одного состояния кэша
+        products, version, changed_at = self.cache.current()
+        cached_version, body, etag = self._response
+        if cached_version == version and body:
+            return body, etag
+
+        products_hash = data_hash(json.dumps(products, ensure_ascii=False, sort_keys=True))
+        changed_at = datetime.fromtimestamp(changed_at) if changed_at else datetime.now()
+        body = json.dumps({
+            'success': True,
+            'products': products,
+            'hash': products_hash,
+            'timestamp': changed_at.isoformat(),
+            'count': len(products)
+        }, ensure_ascii=False).encode('utf-8')
+        etag = hashlib.sha256(body).hexdigest()  # от точных байтов ответа (в нем есть и timestamp)
+        self._response = (version, body, etag)
+        return body, etag
+
+    async def stop(self):
+        """
+        Отмена фоновых задач, включая обновление в полете: они пользуются
+        сеансом backend, поэтому их нужно дождаться до его закрытия.
+        """
+        tasks = [task for task in (self._refresher, self._refresh_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def status(self) -> dict:
+        status = self.cache.status()
+        status['refreshing'] = self._refresh_task is not None and not self._refresh_task.done()
+        return status
+
+
+routes = web.RouteTableDef()
+
+
+@routes.get('/api/products')
+async def get_products(request):
+    """API для получения товаров (ETag = хеш тела ответа, 304 если не изменилось)"""
+    api = request.app['api']
+    try:
+        body, body_hash = await api.products_response()
+        if body is None:
+            # Холодный старт без снимка и без связи с Sheets: не отдаем пустой каталог
+            return web.json_response({
+                'success': False,
+                'error': 'Товары еще не загружены из Google Sheets',
+                'timestamp': datetime.now().isoformat()
+            }, status=503, headers={'Retry-After': str(UNAVAILABLE_RETRY_AFTER)})
+        etag = f'"{body_hash}"'
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            return web.Response(status=304, headers=headers)
+        return web.Response(body=body, content_type='application/json', headers=headers)
+    except Exception as e:
+        return web.json_response({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }, status=500)
+
+
+@routes.get('/api/status')
+async def get_status(request):
+    """API для проверки статуса (без загрузки данных из Sheets)"""
+    api = request.app['api']
+    cache_status = api.status()
+    return web.json_response({
+        'success': True,
+        'status': 'online',
+        'products_count': len(api.cache.value or []),
+        'last_update': cache_status['last_update'],
+        'cache_status': 'active' if api.cache.value is not None else 'empty',
+        'cache': cache_status
+    })
+
+
+@routes.get('/api/health')
+async def health_check(request):
+    """Проверка здоровья сервера"""
+    return web.json_response({
+        'status': 'healthy',
+        'timestamp': datetime.now().isoformat(),
+        'version': '1.0.0'
+    })
+
+
+async def on_startup(app):
+    await app['backend'].start()
+    app['api']._refresher = asyncio.create_task(app['api'].refresh_loop())
+
+
+async def on_cleanup(app):
+    await app['api'].stop()
+    await app['backend'].close()
+
+
+def create_app(backend=None) -> web.Application:
+    """Приложение; backend - источник товаров (по умолчанию Google Sheets)"""
+    backend = backend or SheetsBackend()
+    app = web.Application()
+    app['backend'] = backend
+    app['api'] = AsyncProductsAPI(backend)
+    app.add_routes(routes)
+    app.on_startup.append(on_startup)
+    app.on_cleanup.append(on_cleanup)
+    return app
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    print("🚀 Запуск асинхронного API сервера...")
+    print(f"🔒 API доступен на http://localhost:{port}")
+    print("📊 Endpoints:")
+    print("   - GET  /api/products - получение товаров")
+    print("   - GET  /api/status   - статус сервера")
+    print("   - GET  /api/health   - проверка здоровья")
+
+    web.run_app(create_app(), host='0.0.0.0', port=port, access_log=None)
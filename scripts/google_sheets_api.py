@@ -3,8 +3,18 @@
 
 import json
 import os
+import sys
+import asyncio
 from datetime import datetime
-import requests
+
+# Общие модули проекта лежат в корне репозитория
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+
+from sheets_client import SheetsClient
+
+# Адрес Sheets API (для офлайн-проверок: SHEETS_API_URL=http://127.0.0.1:8089, см. fake_sheets.py)
+SHEETS_API_URL = os.environ.get('SHEETS_API_URL', 'https://sheets.googleapis.com').rstrip('/')
 
 class GoogleSheetsAPI:
     def __init__(self):
@@ -12,6 +22,8 @@ class GoogleSheetsAPI:
         self.spreadsheet_id = "1RGdW7QcHV6BgZHJnSMzXKkmsXDYZulMojN312tgvI6PK86H8dRjReYUOHI2l_aVYzLg2NIjAcir89g"
         self.api_key = None
         self.access_token = None
+        # Ограничение частоты, повторы на 429/5xx и склейка записей
+        self.client = SheetsClient()
         
     def setup_api_key(self):
         """Настройка API ключа"""
@@ -148,7 +160,7 @@ class GoogleSheetsAPI:
                 values.append(row)
             
             # URL для обновления
-            url = f"https://sheets.googleapis.com/v4/spreadsheets/{self.spreadsheet_id}/values/A1:Z1000?valueInputOption=RAW&key={self.api_key}"
+            url = f"{SHEETS_API_URL}/v4/spreadsheets/{self.spreadsheet_id}/values/A1:Z1000?valueInputOption=RAW&key={self.api_key}"
             
             # Данные для отправки
             data = {
@@ -156,7 +168,7 @@ class GoogleSheetsAPI:
             }
             
             # Отправляем запрос
-            response = requests.put(url, json=data)
+            response = self.client.request('PUT', url, json=data)
             
             if response.status_code == 200:
                 print("✅ Google Sheets обновлен успешно!")
@@ -171,82 +183,104 @@ class GoogleSheetsAPI:
             print(f"❌ Ошибка: {e}")
             return False
 
+    def batch_update(self, data: list):
+        """Один запрос values:batchUpdate (для SheetsClient.flush)"""
+        url = f"{SHEETS_API_URL}/v4/spreadsheets/{self.spreadsheet_id}/values:batchUpdate?key={self.api_key}"
+        response = self.client.request('POST', url, json={"valueInputOption": "RAW", "data": data})
+        if response.status_code != 200:
+            raise RuntimeError(f"values:batchUpdate вернул {response.status_code}: {response.text}")
+
     async def update_product_order(self, product_id: str, new_order: int):
-        """Обновить порядок товара в Google Sheets"""
+        """Обновить порядок товара в Google Sheets (запрос - в отдельном потоке)"""
+        result = await asyncio.to_thread(self.update_products_order, {product_id: new_order})
+        return result is not None and not result['missing']
+
+    def update_products_order(self, orders: dict):
+        """
+        Обновить порядок сразу нескольких товаров: {ID: порядок}.
+        Таблица читается один раз, а изменившиеся ячейки отправляются
+        одним запросом values:batchUpdate. Вызов блокирующий (ограничение
+        частоты и паузы между повторами ждут в текущем потоке).
+
+        Возвращает {'updated': изменено ячеек, 'missing': [ID, которых нет
+        в таблице]} - остальные товары при этом записаны - или None,
+        если запись не удалась (тогда имеет смысл повторить).
+        """
         try:
             if not self.api_key:
-                print(f"❌ API ключ не настроен для обновления порядка товара {product_id}")
-                return False
+                print("❌ API ключ не настроен для обновления порядка товаров")
+                return None
             
-            # Загружаем текущие данные из Sheets
-            url = f"https://sheets.googleapis.com/v4/spreadsheets/{self.spreadsheet_id}/values/A1:Z1000?key={self.api_key}"
-            response = requests.get(url)
+            # Загружаем текущие данные из Sheets (один раз на все товары)
+            url = f"{SHEETS_API_URL}/v4/spreadsheets/{self.spreadsheet_id}/values/A1:Z?key={self.api_key}"
+            response = self.client.request('GET', url)
             
             if response.status_code != 200:
                 print(f"❌ Ошибка получения данных из Sheets: {response.status_code}")
-                return False
-            
-            data = response.json()
-            values = data.get('values', [])
+                return None
             
+            values = response.json().get('values', [])
             if not values:
                 print("❌ Данные в таблице не найдены")
-                return False
+                return None
             
-            # Ищем строку с товаром по ID
-            target_row = None
-            for i, row in enumerate(values):
-                if len(row) > 0 and str(product_id) in str(row):
-                    target_row = i
-                    break
+            # Колонки ID и порядка по заголовкам (по умолчанию A и B)
+            headers = [str(h).strip().lower() for h in values[0]]
+            id_col = headers.index('id') if 'id' in headers else 0
+            order_col = next((headers.index(h) for h in ('order', 'порядок') if h in headers), 1)
             
-            if target_row is None:
-                print(f"❌ Товар с ID {product_id} не найден в таблице")
-                return False
-            
-            # Обновляем порядок в найденной строке
-            # Предполагаем, что порядок находится в определенной колонке
-            # Нужно добавить колонку order если её нет
-            if len(values[target_row]) < 9:  # Если нет колонки order
-                values[target_row].append(str(new_order))
-            else:
-                values[target_row][8] = str(new_order)  # Колонка I (индекс 8)
+            # Ставим в очередь только изменившиеся ячейки
+            wanted = {str(pid): str(order) for pid, order in orders.items()}
+            found = set()
+            for row_index, row in enumerate(values[1:], start=2):
+                product_id = str(row[id_col]).strip() if len(row) > id_col else ''
+                if product_id not in wanted:
+                    continue
+                found.add(product_id)
+                current = str(row[order_col]).strip() if len(row) > order_col else ''
+                if current != wanted[product_id]:
+                    self.client.queue(row_index, order_col, wanted[product_id])
             
-            # Отправляем обновленные данные
-            update_url = f"https://sheets.googleapis.com/v4/spreadsheets/{self.spreadsheet_id}/values/A1:Z1000?valueInputOption=RAW&key={self.api_key}"
-            update_data = {"values": values}
+            missing = sorted(set(wanted) - found)
+            for product_id in missing:
+                print(f"⚠️ Товар с ID {product_id} не найден в таблице - порядок не записан")
             
-            update_response = requests.put(update_url, json=update_data)
+            if not self.client.pending:
+                print("✅ Порядок товаров в Sheets уже актуален")
+                return {'updated': 0, 'missing': missing}
             
-            if update_response.status_code == 200:
-                print(f"✅ Порядок товара {product_id} обновлен в Sheets: {new_order}")
-                return True
-            else:
-                print(f"❌ Ошибка обновления порядка: {update_response.status_code}")
-                return False
+            # Одна запись на все изменения
+            cells = self.client.flush(self.batch_update)
+            print(f"✅ Порядок обновлен в Sheets: изменено ячеек {cells} из {len(wanted)} товаров")
+            return {'updated': cells, 'missing': missing}
                 
         except Exception as e:
-            print(f"❌ Ошибка обновления порядка товара {product_id}: {e}")
-            return False
+            self.client.pending = {}  # при повторе очередь соберется заново из таблицы
+            print(f"❌ Ошибка обновления порядка товаров: {e}")
+            return None
 
     async def add_product_row(self, row_data: list):
-        """Добавить новую строку с товаром в Google Sheets"""
+        """Добавить новую строку с товаром в Google Sheets (запрос - в отдельном потоке)"""
+        return await asyncio.to_thread(self.add_product_rows, [row_data])
+
+    def add_product_rows(self, rows: list):
+        """Добавить несколько строк с товарами одним запросом (вызов блокирующий)"""
         try:
             if not self.api_key:
-                print(f"❌ API ключ не настроен для добавления товара")
+                print("❌ API ключ не настроен для добавления товара")
                 return False
             
-            # Добавляем новую строку в конец таблицы
-            url = f"https://sheets.googleapis.com/v4/spreadsheets/{self.spreadsheet_id}/values/A:Z:append?valueInputOption=RAW&key={self.api_key}"
+            # Добавляем новые строки в конец таблицы
+            url = f"{SHEETS_API_URL}/v4/spreadsheets/{self.spreadsheet_id}/values/A:Z:append?valueInputOption=RAW&key={self.api_key}"
             
             data = {
-                "values": [row_data]
+                "values": rows
             }
             
-            response = requests.post(url, json=data)
+            response = self.client.request('POST', url, json=data)
             
             if response.status_code == 200:
-                print(f"✅ Товар добавлен в Google Sheets")
+                print(f"✅ Добавлено товаров в Google Sheets: {len(rows)}")
                 return True
             else:
                 print(f"❌ Ошибка добавления товара: {response.status_code}")
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Общий клиент Google Sheets с учетом квот
+
+- ограничитель запросов (token bucket), общий на весь процесс: не больше
+  QUOTA_PER_MINUTE запросов в минуту, включая первоначальный «залп»;
+- повтор с экспоненциальной задержкой на 429 и 5xx (с учетом Retry-After);
+- склейка записей: ячейки, поставленные в очередь, собираются по строкам
+  (соседние колонки - в один диапазон), повторная запись в ту же ячейку
+  заменяет прежнюю, и все уходит одним batch_update.
+
+Работает и с листом gspread (wrap / call), и с REST-запросами (request).
+"""
+
+import time
+import random
+import threading
+
+QUOTA_PER_MINUTE = 60  # квота Sheets API на пользователя
+BURST = 10
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 6
+BASE_DELAY = 1.0
+MAX_DELAY = 32.0
+
+# Методы листа gspread, которые ходят в API (остальные - локальные, квоту не тратят)
+REQUEST_METHOD_PREFIXES = (
+    'get', 'batch_', 'update', 'append', 'insert', 'delete', 'clear', 'add_', 'resize',
+    'format', 'find', 'sort', 'acell', 'cell', 'col_values', 'row_values', 'range',
+    'freeze', 'merge', 'unmerge', 'copy', 'duplicate', 'hide', 'unhide', 'show',
+)
+
+
+def column_letter(index: int) -> str:
+    """Номер колонки (с 0) -> буква: 0 -> A, 26 -> AA"""
+    letters = ''
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(ord('A') + rem) + letters
+    return letters
+
+
+def error_status(error) -> int:
+    """HTTP-код ошибки gspread/requests (или None)"""
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        return code
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def retry_after(source) -> float:
+    """Retry-After из ответа или ошибки (секунды), если сервер его прислал"""
+    response = getattr(source, 'response', source)
+    headers = getattr(response, 'headers', None) or {}
+    try:
+        return float(headers.get('Retry-After', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int, clock=time.monotonic, sleep=time.sleep):
+        """rate - запросов в секунду, capacity - сколько можно отправить подряд"""
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self.lock = threading.Lock()
+        self.waited = 0.0
+
+    def acquire(self):
+        """Забирает один токен, при необходимости ждет"""
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1 - 1e-9:  # погрешность float не должна зациклить ожидание
+                    self.tokens = max(0.0, self.tokens - 1)
+                    return
+                delay = (1 - self.tokens) / self.rate
+            self.waited += delay
+            self.sleep(delay)
+
+
+def quota_bucket(clock=time.monotonic, sleep=time.sleep) -> TokenBucket:
+    """Ведро под квоту: BURST сразу + остаток квоты равномерно за минуту"""
+    return TokenBucket((QUOTA_PER_MINUTE - BURST) / 60, BURST, clock, sleep)
+
+
+_shared_bucket = quota_bucket()
+
+
+class SheetsClient:
+    def __init__(self, worksheet=None, bucket: TokenBucket = None, max_retries: int = MAX_RETRIES,
+                 seed: int = None):
+        """
+        worksheet - лист gspread (для call/flush), bucket - ограничитель
+        (по умолчанию общий на процесс), seed - для повторяемой случайной добавки к задержке.
+        """
+        self.worksheet = worksheet
+        self.bucket = bucket or _shared_bucket
+        self.max_retries = max_retries
+        self.rng = random.Random(seed)
+        self.pending = {}  # строка -> {колонка (с 0): значение}
+        self.stats = {'requests': 0, 'retries': 0, 'coalesced': 0}
+
+    def backoff(self, attempt: int, source=None) -> float:
+        """Задержка перед повтором: 1, 2, 4... (не больше MAX_DELAY) + случайная добавка"""
+        delay = min(MAX_DELAY, BASE_DELAY * 2 ** attempt) + self.rng.uniform(0, 1)
+        return max(delay, retry_after(source)) if source is not None else delay
+
+    def call(self, func, *args, **kwargs):
+        """Вызов API с ограничением частоты и повторами на 429/5xx"""
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            self.stats['requests'] += 1
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                status = error_status(e)
+                if status not in RETRY_STATUSES or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt, e)
+                print(f"⏳ Sheets API ответил {status}, повтор через {delay:.1f} с")
+                self.stats['retries'] += 1
+                self.bucket.sleep(delay)
+                attempt += 1
+
+    def request(self, method: str, url: str, **kwargs):
+        """
+        REST-запрос через requests с теми же ограничением и повторами.
+        Блокирующий (ожидание квоты и пауз - time.sleep): из асинхронного
+        кода вызывать через asyncio.to_thread.
+        """
+        import requests
+
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            self.stats['requests'] += 1
+            response = requests.request(method, url, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                return response
+            delay = self.backoff(attempt, response)
+            print(f"⏳ Sheets API ответил {response.status_code}, повтор через {delay:.1f} с")
+            self.stats['retries'] += 1
+            self.bucket.sleep(delay)
+            attempt += 1
+
+    def wrap(self, worksheet=None):
+        """Лист, все вызовы методов которого идут через call()"""
+        return RateLimitedWorksheet(worksheet or self.worksheet, self)
+
+    # ---------- склейка записей ----------
+
+    def queue(self, row: int, col: int, value):
+        """Ставит запись ячейки в очередь (row с 1, col с 0)"""
+        cells = self.pending.setdefault(row, {})
+        if col in cells:
+            self.stats['coalesced'] += 1
+        cells[col] = '' if value is None else str(value)
+
+    def pending_count(self) -> int:
+        return sum(len(cells) for cells in self.pending.values())
+
+    def batch_data(self) -> list:
+        """Очередь -> диапазоны для batch_update (соседние ячейки строки - один диапазон)"""
+        data = []
+        for row in sorted(self.pending):
+            cols = sorted(self.pending[row])
+            start = prev = cols[0]
+            for col in cols[1:] + [None]:
+                if col is not None and col == prev + 1:
+                    prev = col
+                    continue
+                a1 = f"{column_letter(start)}{row}"
+                if prev != start:
+                    a1 += f":{column_letter(prev)}{row}"
+                data.append({'range': a1, 'values': [[self.pending[row][c] for c in range(start, prev + 1)]]})
+                if col is not None:
+                    start = prev = col
+        return data
+
+    def flush(self, write=None) -> int:
+        """
+        Отправляет очередь одним запросом. write(data) - своя запись
+        (например, REST values:batchUpdate), иначе worksheet.batch_update.
+        Возвращает число записанных ячеек; при ошибке очередь сохраняется.
+        """
+        if not self.pending:
+            return 0
+        data = self.batch_data()
+        cells = self.pending_count()
+        if write is not None:
+            write(data)
+        else:
+            self.call(self.worksheet.batch_update, data, value_input_option='RAW')
+        self.pending = {}
+        return cells
+
+
+class RateLimitedWorksheet:
+    """Обертка листа gspread: методы, делающие запросы, вызываются через SheetsClient.call"""
+
+    def __init__(self, worksheet, client: SheetsClient):
+        self._worksheet = worksheet
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._worksheet, name)
+        if not callable(attr) or not name.startswith(REQUEST_METHOD_PREFIXES):
+            return attr
+
+        def limited(*args, **kwargs):
+            return self._client.call(attr, *args, **kwargs)
+        return limited
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Отложенная запись в Google Sheets (write-behind)
+
+Изменения из интерфейса сначала сохраняются локально и в журнал на диске
+(.sheets_queue.jsonl), а фоновый поток отправляет их в таблицу пачками:
+- новые строки - одним добавлением;
+- порядок товаров - одной пакетной записью (последнее значение побеждает).
+
+Пока запись не подтверждена, операции остаются в журнале и после
+перезапуска отправляются снова. Новые строки подтверждаются отдельно от
+порядка: если добавление прошло, а запись порядка - нет, строки уже не
+отправятся повторно (иначе каждый повтор дублировал бы их в таблице).
+При ошибке - повтор с растущей паузой. Ошибка, которую повтор не
+исправит (нет google_api_config.json), останавливает отправку: операции
+остаются в журнале до перезапуска менеджера или resume().
+"""
+
+import os
+import json
+import time
+import uuid
+import threading
+
+JOURNAL_FILE = ".sheets_queue.jsonl"
+BATCH_DELAY = 2.0  # сколько ждать, собирая пачку
+MAX_RETRY_DELAY = 300.0
+
+
+class PermanentWriteError(Exception):
+    """Ошибка writer, которую повтор не исправит (например, нет настроек API)"""
+
+
+def append_ids(ops: list) -> set:
+    """ID товаров, строки которых ждут добавления"""
+    return {str(op['data'][0]) for op in ops if op.get('type') == 'append' and op.get('data')}
+
+
+def journal_append_ids(journal_path: str = JOURNAL_FILE) -> set:
+    """ID из журнала на диске (для синхронизации вне менеджера, где очереди в памяти нет)"""
+    if not os.path.exists(journal_path):
+        return set()
+    ops = []
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                ops.append(json.loads(line))
+            except ValueError:
+                pass  # обрыв при записи
+    return append_ids(ops)
+
+
+class SheetsWriteQueue:
+    def __init__(self, writer, journal_path: str = JOURNAL_FILE, delay: float = BATCH_DELAY, on_change=None):
+        """
+        writer(kind, data) -> bool отправляет часть пачки: kind 'append' -
+        data список новых строк таблицы, kind 'order' - data {ID: порядок}.
+        False или исключение - повторить позже; то, что повторять бессмысленно
+        (например, ID нет в таблице), writer пропускает и возвращает True.
+        PermanentWriteError - отправка останавливается (см. parked).
+        on_change(очередь) вызывается при изменении числа ожидающих
+        операций или состояния (из фонового потока).
+        """
+        self.writer = writer
+        self.journal_path = journal_path
+        self.delay = delay
+        self.on_change = on_change
+
+        self.ops = []
+        self.last_error = None
+        self.sending = False
+        self.parked = False  # отправка остановлена постоянной ошибкой
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.load_journal()
+
+    # ---------- журнал ----------
+
+    def load_journal(self):
+        """Неотправленные операции с прошлого запуска"""
+        if not os.path.exists(self.journal_path):
+            return
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    self.ops.append(json.loads(line))
+                except ValueError:
+                    print("⚠️ Журнал Sheets: пропущена неполная запись")  # обрыв при записи
+        if self.ops:
+            print(f"📒 Журнал Sheets: к отправке {len(self.ops)} операций с прошлого запуска")
+
+    def _append_journal(self, op: dict):
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(op, ensure_ascii=False) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rewrite_journal(self):
+        """Журнал = оставшиеся операции (атомарно через временный файл)"""
+        if not self.ops:
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            return
+        tmp_path = f"{self.journal_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for op in self.ops:
+                f.write(json.dumps(op, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, self.journal_path)
+
+    # ---------- операции ----------
+
+    def _enqueue(self, kind: str, data):
+        op = {'id': uuid.uuid4().hex, 'type': kind, 'data': data, 'queued_at': time.time()}
+        with self._lock:
+            self._append_journal(op)
+            self.ops.append(op)
+        self._wake.set()
+        self._notify()
+
+    def enqueue_order(self, orders: dict):
+        """Новый порядок товаров {ID: порядок}"""
+        self._enqueue('order', {str(k): str(v) for k, v in orders.items()})
+
+    def enqueue_append(self, row: list):
+        """Новая строка таблицы"""
+        self._enqueue('append', [str(v) for v in row])
+
+    def pending_count(self) -> int:
+        return len(self.ops)
+
+    def pending_append_ids(self) -> set:
+        """ID новых товаров, чьи строки еще не добавлены в таблицу"""
+        with self._lock:
+            return append_ids(self.ops)
+
+    def status_text(self) -> str:
+        """Строка состояния для интерфейса"""
+        count = self.pending_count()
+        if not count:
+            return "Sheets: все изменения отправлены"
+        if self.sending:
+            return f"Sheets: отправка ({count})..."
+        if self.parked:
+            return f"Sheets: в очереди {count}, отправка остановлена: {self.last_error}"
+        if self.last_error:
+            return f"Sheets: в очереди {count}, повтор после ошибки"
+        return f"Sheets: в очереди {count}"
+
+    def _notify(self):
+        if self.on_change:
+            try:
+                self.on_change(self)
+            except Exception as e:
+                print(f"⚠️ Очередь Sheets: ошибка обновления интерфейса: {e}")
+
+    @staticmethod
+    def merge(ops: list) -> tuple:
+        """Пачка операций -> (orders, rows): повторные правки склеиваются"""
+        orders, rows = {}, {}
+        for op in ops:
+            if op['type'] == 'order':
+                orders.update(op['data'])
+            elif op['type'] == 'append':
+                rows[op['data'][0] if op['data'] else op['id']] = op['data']  # по ID, последняя версия
+        return orders, list(rows.values())
+
+    def _ack(self, ops: list):
+        """Подтвержденные операции убираются из очереди и журнала"""
+        sent = {op['id'] for op in ops}
+        with self._lock:
+            self.ops = [op for op in self.ops if op['id'] not in sent]
+            self._rewrite_journal()
+
+    def flush(self) -> bool:
+        """
+        Отправляет все ожидающие операции: сначала новые строки, затем
+        порядок (он может касаться только что добавленных). Каждая часть
+        подтверждается сразу после успешной записи.
+        """
+        with self._lock:
+            batch = list(self.ops)
+        if not batch:
+            return True
+        if self.parked:
+            return False
+
+        orders, rows = self.merge(batch)
+        self.sending = True
+        self.last_error = None
+        self._notify()
+        ok = True
+        for kind, data in (('append', rows), ('order', orders)):
+            ops = [op for op in batch if op['type'] == kind]
+            if not ops:
+                continue
+            try:
+                sent = self.writer(kind, data)
+                error = None if sent else "запись не подтверждена"
+            except PermanentWriteError as e:
+                sent, error = False, str(e)
+                self.parked = True
+            except Exception as e:
+                sent, error = False, str(e)
+            if not sent:
+                ok = False
+                self.last_error = error
+                break
+            self._ack(ops)
+        self.sending = False
+
+        if ok:
+            print(f"✅ Очередь Sheets: отправлено операций {len(batch)} "
+                  f"(строк {len(rows)}, порядок {len(orders)})")
+        elif self.parked:
+            print(f"❌ Очередь Sheets: отправка остановлена, изменения сохранены в журнале "
+                  f"{self.journal_path}: {self.last_error}")
+        else:
+            print(f"❌ Очередь Sheets: отправка не удалась, повторим позже: {self.last_error}")
+        self._notify()
+        return ok
+
+    # ---------- фоновый поток ----------
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if self.ops:
+            self._wake.set()
+
+        def loop():
+            retry_delay = self.delay
+            while not self._stop.is_set():
+                self._wake.wait()
+                self._wake.clear()
+                # Ждем, пока подтянутся соседние правки, чтобы отправить одной пачкой
+                if self._stop.wait(self.delay):
+                    break
+                if self.flush() or self.parked:
+                    # После постоянной ошибки не повторяем - ждем resume()
+                    retry_delay = self.delay
+                    continue
+                retry_delay = min(MAX_RETRY_DELAY, retry_delay * 2)
+                if self._stop.wait(retry_delay):
+                    break
+                self._wake.set()
+
+        self._thread = threading.Thread(target=loop, name="sheets-queue", daemon=True)
+        self._thread.start()
+
+    def resume(self):
+        """Снова отправлять после постоянной ошибки (например, настройки API появились)"""
+        self.parked = False
+        self.last_error = None
+        self._wake.set()
+        self._notify()
+
+    def stop(self):
+        """Останавливает поток; неотправленное остается в журнале"""
+        self._stop.set()
+        self._wake.set()
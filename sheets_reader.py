@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Потоковое чтение товаров из Google Sheets
+
+Вместо get_all_values() (весь лист, все колонки сразу в памяти):
+- заголовок читается один раз, по нему выбираются только нужные колонки;
+- строки читаются страницами по PAGE_SIZE одним batch_get на страницу
+  (соседние колонки - один диапазон);
+- товары отдаются генератором, так что в памяти держится одна страница.
+
+API обрезает пустые строки в конце каждого диапазона, поэтому короткая
+страница еще не значит конец данных: чтение идет до конца сетки листа
+(row_count, без запроса), а если он неизвестен - до первой полностью
+пустой страницы.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterator, List, Tuple
+
+from sheets_client import column_letter
+from sheets_sync import SHEET_FIELDS, clean_text, header_columns
+
+PAGE_SIZE = 2000  # строк за запрос: меньше запросов к квоте, память - одна страница
+
+
+def column_runs(columns: List[int]) -> List[Tuple[int, int]]:
+    """Номера колонок -> непрерывные отрезки (начало, конец) включительно"""
+    runs = []
+    for col in sorted(set(columns)):
+        if runs and col == runs[-1][1] + 1:
+            runs[-1] = (runs[-1][0], col)
+        else:
+            runs.append((col, col))
+    return runs
+
+
+def read_columns(worksheet, fields=SHEET_FIELDS) -> Dict[str, int]:
+    """Поле -> номер колонки по строке заголовков (только запрошенные поля)"""
+    header = worksheet.get_values('1:1')
+    columns = header_columns(header[0] if header else [])
+    return {field: col for field, col in columns.items() if field in fields}
+
+
+def iter_rows(worksheet, fields=SHEET_FIELDS, page_size: int = PAGE_SIZE,
+              columns: Dict[str, int] = None) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    (номер строки, {поле: очищенное значение}) для каждой строки данных.
+    Читаются только колонки fields, по page_size строк за запрос.
+    """
+    columns = columns if columns is not None else read_columns(worksheet, fields)
+    runs = column_runs(list(columns.values()))
+    if not runs:
+        return
+
+    row_count = getattr(worksheet, 'row_count', None)  # размер сетки (из свойств листа)
+    if not isinstance(row_count, int):
+        row_count = None
+    start = 2
+    while True:
+        end = start + page_size - 1
+        ranges = [f"{column_letter(a)}{start}:{column_letter(b)}{end}" for a, b in runs]
+        blocks = worksheet.batch_get(ranges)
+
+        longest = max((len(block) for block in blocks), default=0)
+        for offset in range(longest):
+            cells = {}
+            for (first, _), block in zip(runs, blocks):
+                row = block[offset] if offset < len(block) else []
+                for i, value in enumerate(row):
+                    cells[first + i] = value
+            yield start + offset, {
+                field: clean_text(cells.get(columns[field], '')) if field in columns else ''
+                for field in fields
+            }
+
+        if row_count is None:
+            if not longest:
+                return
+        elif end >= row_count and longest < page_size:
+            return  # дальше сетка листа кончается
+        start = end + 1
+
+
+def iter_products(worksheet, fields=SHEET_FIELDS, page_size: int = PAGE_SIZE) -> Iterator[Dict[str, str]]:
+    """Товары products.json (строки без названия пропускаются)"""
+    updated = datetime.now().isoformat()
+    for _, record in iter_rows(worksheet, fields, page_size):
+        if not record.get('title'):
+            continue
+        record['updated'] = updated
+        yield record
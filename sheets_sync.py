@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Двусторонняя разностная синхронизация products.json <-> Google Sheets
+
+Для каждой строки хранится хеш содержимого (как
+setup_sheets_security._create_row_hash) на момент последней
+синхронизации. Сравнение трех хешей (локальный, в таблице, прошлый)
+по ID показывает, что и где изменилось:
+
+- изменилось только в таблице - обновляем товар локально;
+- изменилось только локально - отправляем в таблицу только
+  изменившиеся ячейки одним пакетным запросом;
+- изменилось и там, и там - побеждает сторона prefer ('remote' по умолчанию);
+- товар удален локально - строка удаляется из таблицы (ID остается в
+  состоянии, пока чтение листа не подтвердит удаление);
+- строка удалена из таблицы - товар удаляется локально, но только если
+  строки с этим ID действительно нет (пустое название - не удаление).
+
+Если в таблице нет ни одной строки с ID (лист пустой или очищен),
+синхронизация останавливается и ничего не меняет.
+
+Новые товары, строки которых еще ждут отправки в очереди записи
+(sheets_queue, журнал .sheets_queue.jsonl), синхронизация не добавляет:
+их добавит очередь, иначе в таблице появились бы две строки с одним ID.
+
+Если таблица не менялась с прошлой синхронизации (время изменения
+файла из Drive), она вообще не читается.
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+
+from sheets_client import SheetsClient, column_letter
+from sheets_queue import journal_append_ids
+
+STATE_FILE = ".sheets_sync_state.json"
+
+# Колонки таблицы A..J (как в load_products_from_sheets)
+SHEET_FIELDS = ['id', 'order', 'section', 'title', 'price', 'desc', 'meta', 'status', 'images', 'link']
+
+
+def clean_text(text) -> str:
+    """Убирает лишние пробелы и переносы строк"""
+    if not text:
+        return ''
+    text = str(text).strip().replace('\n', ' ').replace('\r', ' ')
+    while '  ' in text:
+        text = text.replace('  ', ' ')
+    return text
+
+
+def row_hash(record: dict) -> str:
+    """Хеш содержимого строки (только колонки таблицы)"""
+    data = {field: clean_text(record.get(field, '')) for field in SHEET_FIELDS}
+    data_string = json.dumps(data, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(data_string.encode()).hexdigest()
+
+
+def header_columns(headers: list) -> dict:
+    """Поле -> номер колонки по заголовкам (если заголовков нет - по порядку A..J)"""
+    names = [str(h).strip().lower() for h in headers]
+    columns = {field: names.index(field) for field in SHEET_FIELDS if field in names}
+    if 'id' not in columns:
+        return {field: i for i, field in enumerate(SHEET_FIELDS)}
+    return columns
+
+
+def parse_rows(values: list) -> tuple:
+    """
+    Значения листа -> (колонки, {ID: (номер строки, запись)}).
+    Строки без ID пропускаются; строки без названия остаются (их
+    товар в таблице есть, хоть и не заполнен).
+    """
+    if not values:
+        return header_columns(SHEET_FIELDS), {}
+    columns = header_columns(values[0])
+    rows = {}
+    for row_number, row in enumerate(values[1:], start=2):
+        record = {
+            field: clean_text(row[col]) if col < len(row) else ''
+            for field, col in columns.items()
+        }
+        if record.get('id'):
+            rows[record['id']] = (row_number, record)
+    return columns, rows
+
+
+class SheetsDeltaSync:
+    def __init__(self, worksheet, state_path: str = STATE_FILE, prefer: str = 'remote', pending_ids=()):
+        """
+        worksheet - лист gspread (или совместимый объект),
+        pending_ids - ID новых товаров, которые еще в очереди записи.
+        """
+        self.worksheet = worksheet
+        self.state_path = state_path
+        self.prefer = prefer
+        self.pending_ids = {str(product_id) for product_id in pending_ids}
+        self.state = {'rows': {}, 'remote_updated': None}
+        self.load_state()
+
+    def load_state(self):
+        if os.path.exists(self.state_path):
+            try:
+                with open(self.state_path, 'r', encoding='utf-8') as f:
+                    self.state = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Состояние синхронизации {self.state_path} повреждено, сверяем заново: {e}")
+        self.state.setdefault('rows', {})
+        self.state.setdefault('remote_updated', None)
+
+    def save_state(self):
+        """Сохранение состояния (атомарно через временный файл)"""
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.state_path)
+
+    def remote_updated(self):
+        """Время последнего изменения таблицы (без чтения данных), если доступно"""
+        spreadsheet = getattr(self.worksheet, 'spreadsheet', None)
+        try:
+            if hasattr(spreadsheet, 'get_lastUpdateTime'):  # gspread 6
+                return spreadsheet.get_lastUpdateTime()
+            return getattr(spreadsheet, 'lastUpdateTime', None)  # gspread 5
+        except Exception:
+            return None
+
+    def plan(self, products: list, values: list) -> dict:
+        """
+        Сравнение локальных товаров и листа по ID.
+        Возвращает план: pull (ID -> запись из таблицы), push (ID -> товар),
+        append (новые локальные), remove_local (удалены из таблицы),
+        remove_remote (удалены локально), incomplete (строки без названия),
+        pending (новые, которые добавит очередь записи), conflicts.
+        """
+        columns, rows = parse_rows(values)
+        local = {str(p.get('id', '')): p for p in products if p.get('id')}
+        base = self.state['rows']
+        plan = {'columns': columns, 'rows': rows, 'pull': {}, 'push': {}, 'append': [],
+                'remove_local': [], 'remove_remote': [], 'incomplete': [], 'pending': [],
+                'conflicts': [], 'unchanged': 0}
+
+        for product_id, product in local.items():
+            local_hash = row_hash(product)
+            base_hash = base.get(product_id)
+            if product_id not in rows:
+                if product_id in self.pending_ids:
+                    plan['pending'].append(product_id)  # строку добавит очередь записи
+                elif base_hash is None:
+                    plan['append'].append(product)  # новый товар
+                else:
+                    plan['remove_local'].append(product_id)  # строку с этим ID удалили из таблицы
+                continue
+
+            remote = rows[product_id][1]
+            if not remote.get('title'):
+                plan['incomplete'].append(product_id)  # строка есть, но не заполнена - не трогаем
+                continue
+            remote_hash = row_hash(remote)
+            if local_hash == remote_hash:
+                plan['unchanged'] += 1
+            elif base_hash == local_hash:
+                plan['pull'][product_id] = remote
+            elif base_hash == remote_hash:
+                plan['push'][product_id] = product
+            else:
+                plan['conflicts'].append(product_id)
+                if self.prefer == 'local':
+                    plan['push'][product_id] = product
+                else:
+                    plan['pull'][product_id] = remote
+
+        for product_id, (_, remote) in rows.items():
+            if product_id in local or not remote.get('title'):
+                continue
+            if product_id not in base:
+                plan['pull'][product_id] = remote  # новая строка в таблице
+            elif base[product_id] == row_hash(remote):
+                plan['remove_remote'].append(product_id)  # товар удалили локально
+            else:
+                # Удален локально, но строку с тех пор правили в таблице
+                plan['conflicts'].append(product_id)
+                if self.prefer == 'local':
+                    plan['remove_remote'].append(product_id)
+                else:
+                    plan['pull'][product_id] = remote
+        return plan
+
+    def push(self, plan: dict) -> int:
+        """
+        Одна пакетная запись изменившихся ячеек, удаление строк (снизу вверх,
+        соседние - одним запросом) и одно добавление новых строк.
+        """
+        columns, rows = plan['columns'], plan['rows']
+        updates = []
+        for product_id, product in plan['push'].items():
+            row_number, remote = rows[product_id]
+            for field, col in columns.items():
+                value = clean_text(product.get(field, ''))
+                if value != remote.get(field, ''):
+                    updates.append({'range': f"{column_letter(col)}{row_number}", 'values': [[value]]})
+        if updates:
+            self.worksheet.batch_update(updates, value_input_option='RAW')
+
+        # Номера строк сдвигаются после удаления, поэтому удаляем после записи и снизу вверх
+        row_numbers = sorted((rows[product_id][0] for product_id in plan.get('remove_remote', [])), reverse=True)
+        while row_numbers:
+            end = start = row_numbers.pop(0)
+            while row_numbers and row_numbers[0] == start - 1:
+                start = row_numbers.pop(0)
+            self.worksheet.delete_rows(start, end)
+
+        if plan['append']:
+            width = max(columns.values()) + 1
+            new_rows = []
+            for product in plan['append']:
+                row = [''] * width
+                for field, col in columns.items():
+                    row[col] = clean_text(product.get(field, ''))
+                new_rows.append(row)
+            self.worksheet.append_rows(new_rows, value_input_option='RAW')
+        return len(updates)
+
+    def push_products(self, products: list, values: list = None) -> int:
+        """Отправляет указанные товары в таблицу (только изменившиеся ячейки, один запрос)"""
+        if values is None:
+            values = self.worksheet.get_all_values()
+        columns, rows = parse_rows(values)
+        plan = {
+            'columns': columns,
+            'rows': rows,
+            'push': {str(p.get('id', '')): p for p in products if str(p.get('id', '')) in rows},
+            'append': [],
+        }
+        return self.push(plan)
+
+    def sync(self, products: list) -> tuple:
+        """
+        Синхронизирует список товаров с листом в обе стороны.
+        Возвращает (новый список товаров, отчет).
+        """
+        report = {'pulled': [], 'pushed': [], 'appended': [], 'removed': [], 'removed_remote': [],
+                  'conflicts': [], 'cells_written': 0, 'skipped_read': False, 'aborted': False}
+
+        remote_updated = self.remote_updated()
+        local_hashes = {str(p.get('id', '')): row_hash(p) for p in products if p.get('id')}
+        if (remote_updated and remote_updated == self.state['remote_updated']
+                and local_hashes == self.state['rows']):
+            report['skipped_read'] = True
+            return products, report
+
+        values = self.worksheet.get_all_values()
+        plan = self.plan(products, values)
+        if not plan['rows']:
+            # Пустой или очищенный лист - не повод удалять весь каталог
+            print("❌ В таблице нет строк с ID товаров - синхронизация остановлена, products.json не изменен")
+            report['aborted'] = True
+            return products, report
+        report['cells_written'] = self.push(plan)
+
+        # Применяем изменения из таблицы, сохраняя локальные поля (widths, formats...)
+        now = datetime.now().isoformat()
+        result = []
+        for product in products:
+            product_id = str(product.get('id', ''))
+            if product_id in plan['remove_local']:
+                report['removed'].append(product_id)
+                continue
+            if product_id in plan['pull']:
+                product = {**product, **plan['pull'][product_id], 'updated': now}
+                report['pulled'].append(product_id)
+            result.append(product)
+        known = {str(p.get('id', '')) for p in products}
+        for product_id, remote in plan['pull'].items():
+            if product_id not in known:
+                result.append({**remote, 'updated': now})
+                report['pulled'].append(product_id)
+
+        report['pushed'] = list(plan['push'])
+        report['appended'] = [str(p.get('id', '')) for p in plan['append']]
+        report['removed_remote'] = plan['remove_remote']
+        report['conflicts'] = plan['conflicts']
+        report['pending'] = plan['pending']
+
+        # Новое общее состояние: после синхронизации обе стороны совпадают.
+        # Удаленные из таблицы ID остаются, пока следующее чтение листа не
+        # покажет, что строк больше нет (иначе строка вернется как «новая»)
+        rows = {str(p.get('id', '')): row_hash(p) for p in result if p.get('id')}
+        for product_id in plan['remove_remote']:
+            rows[product_id] = self.state['rows'][product_id]
+        # Строк из очереди в таблице еще нет - общим состоянием они не считаются
+        for product_id in plan['pending']:
+            rows.pop(product_id, None)
+        self.state['rows'] = rows
+        # После собственной записи время изменения не запоминаем: следующая
+        # синхронизация прочитает лист и не пропустит чужие правки
+        wrote = report['cells_written'] or plan['append'] or plan['remove_remote']
+        self.state['remote_updated'] = None if wrote else remote_updated
+        self.state['synced_at'] = now
+        self.save_state()
+        return result, report
+
+
+def print_report(report: dict):
+    """Вывод отчета о синхронизации"""
+    if report['skipped_read']:
+        print("✅ Таблица и products.json не менялись с прошлой синхронизации")
+        return
+    if report['aborted']:
+        return
+    print(f"✅ Синхронизация: из таблицы {len(report['pulled'])}, в таблицу {len(report['pushed'])} "
+          f"({report['cells_written']} ячеек), добавлено строк {len(report['appended'])}, "
+          f"удалено локально {len(report['removed'])}, удалено строк {len(report['removed_remote'])}")
+    for product_id in report['conflicts']:
+        print(f"   ⚠️ Конфликт по товару {product_id}: изменен и в таблице, и локально")
+    if report.get('pending'):
+        print(f"   📒 Ждут отправки в очереди записи: {', '.join(report['pending'])}")
+
+
+def open_worksheet(config_file: str = 'google_api_config.json', token_file: str = 'token.json'):
+    """
+    Первый лист таблицы через OAuth2 (token.json), как в остальных скриптах.
+    Вызовы идут через SheetsClient: с ограничением частоты и повторами на 429/5xx.
+    """
+    import gspread
+    from google.oauth2.credentials import Credentials
+
+    with open(config_file, 'r') as f:
+        spreadsheet_id = json.load(f).get('spreadsheet_id')
+    creds = Credentials.from_authorized_user_file(token_file, scopes=['https://www.googleapis.com/auth/spreadsheets'])
+    return SheetsClient().wrap(gspread.authorize(creds).open_by_key(spreadsheet_id).sheet1)
+
+
+def sync_products_file(products_file: str = 'products.json', worksheet=None, prefer: str = 'remote') -> dict:
+    """Синхронизирует products.json с таблицей и сохраняет результат"""
+    with open(products_file, 'r', encoding='utf-8') as f:
+        products = json.load(f)
+    # Новые строки из журнала очереди менеджера добавит сама очередь
+    products, report = SheetsDeltaSync(worksheet or open_worksheet(), prefer=prefer,
+                                       pending_ids=journal_append_ids()).sync(products)
+    if not report['skipped_read'] and (report['pulled'] or report['removed']):
+        with open(products_file, 'w', encoding='utf-8') as f:
+            json.dump(products, f, ensure_ascii=False, indent=2)
+    print_report(report)
+    return report
@@ -8,9 +8,13 @@ import json
 import os
 import subprocess
 import shutil
-import re
 from datetime import datetime
 
+from incremental_sync import print_report, sync_directory
+from site_build import DIST_DIR, SiteBuilder, print_report as print_build_report
+from static_files import server_command
+from ui_reconcile import RenderWindow
+
 class PlatformaManagerModern:
     def __init__(self, root):
         self.root = root
@@ -170,9 +174,11 @@ class PlatformaManagerModern:
         self.products_tree.column('Раздел', width=80)
         self.products_tree.column('Порядок', width=80)
         
-        # Скроллбар
+        # Скроллбар (строки дорисовываются страницами при прокрутке к концу)
         scrollbar = ttk.Scrollbar(main_area, orient=tk.VERTICAL, command=self.products_tree.yview)
-        self.products_tree.configure(yscrollcommand=scrollbar.set)
+        self.tree_window = RenderWindow(page_size=200)
+        self.tree_products = []
+        self.products_tree.configure(yscrollcommand=lambda first, last: self.on_tree_scroll(scrollbar, first, last))
         
         self.products_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -358,10 +364,6 @@ class PlatformaManagerModern:
     
     def refresh_products_list(self):
         """Обновить список товаров"""
-        # Очищаем список
-        for item in self.products_tree.get_children():
-            self.products_tree.delete(item)
-        
         # Если есть текущий раздел, показываем только товары этого раздела
         if hasattr(self, 'current_section') and self.current_section in ['home', 'nessffo']:
             self.filter_by_section(self.current_section)
@@ -380,57 +382,63 @@ class PlatformaManagerModern:
             else:
                 btn.configure(style='TButton')
         
-        # Очищаем список
-        for item in self.products_tree.get_children():
-            self.products_tree.delete(item)
-        
-        # Фильтруем и добавляем товары по разделу
+        # Фильтруем товары по разделу
         filtered_products = [p for p in self.products if p.get('section', 'home') == section]
         # Сортируем по порядку
         sorted_filtered_products = sorted(filtered_products, key=lambda x: int(x.get('order', '0')))
         
-        for product in sorted_filtered_products:
-            status_icon = "✅" if product.get('status') == 'stock' else "⏳"
-            images_str = product.get('images', '')
-            images_count = len(images_str.split(',')) if images_str else 0
-            
-            self.products_tree.insert('', 'end', values=(
-                product.get('id', ''),
-                product.get('title', ''),
-                product.get('price', ''),
-                f"{status_icon} {product.get('status', '')}",
-                f"{images_count} файлов",
-                product.get('section', 'home'),
-                product.get('order', '1')
-            ))
+        self.show_tree_products(sorted_filtered_products)
     
     def apply_search(self):
         """Применить поиск"""
         search_term = self.search_var.get().lower()
         
-        # Очищаем список
-        for item in self.products_tree.get_children():
-            self.products_tree.delete(item)
-        
-        # Фильтруем и добавляем товары
-        for product in self.products:
+        # Фильтруем товары
+        found = [
+            product for product in self.products
             if (search_term in product.get('title', '').lower() or 
                 search_term in product.get('desc', '').lower() or
-                search_term in product.get('id', '').lower()):
-                
-                status_icon = "✅" if product.get('status') == 'stock' else "⏳"
-                images_str = product.get('images', '')
-                images_count = len(images_str.split(',')) if images_str else 0
-                
-                self.products_tree.insert('', 'end', values=(
-                    product.get('id', ''),
-                    product.get('title', ''),
-                    product.get('price', ''),
-                    f"{status_icon} {product.get('status', '')}",
-                    f"{images_count} файлов",
-                    product.get('section', 'home'),
-                    product.get('order', '1')
-                ))
+                search_term in product.get('id', '').lower())
+        ]
+        self.show_tree_products(found)
+    
+    def product_tree_values(self, product):
+        """Значения строки Treeview для товара"""
+        status_icon = "✅" if product.get('status') == 'stock' else "⏳"
+        images_str = product.get('images', '')
+        images_count = len(images_str.split(',')) if images_str else 0
+        return (
+            product.get('id', ''),
+            product.get('title', ''),
+            product.get('price', ''),
+            f"{status_icon} {product.get('status', '')}",
+            f"{images_count} файлов",
+            product.get('section', 'home'),
+            product.get('order', '1')
+        )
+    
+    def show_tree_products(self, products):
+        """Показ товаров в Treeview: вставляется только первая страница, остальное - при прокрутке"""
+        self.products_tree.delete(*self.products_tree.get_children())
+        self.tree_products = products
+        self.tree_window.reset()
+        self.insert_tree_rows(0, len(self.tree_window.visible(products)))
+    
+    def insert_tree_rows(self, start, end, generation=None):
+        # Отложенная дорисовка для списка, который уже показан заново, не нужна
+        if generation is not None and generation != self.tree_window.generation:
+            return
+        for product in self.tree_products[start:end]:
+            self.products_tree.insert('', 'end', values=self.product_tree_values(product))
+    
+    def on_tree_scroll(self, scrollbar, first, last):
+        """Прокрутка Treeview: у конца списка дорисовываем следующую страницу"""
+        scrollbar.set(first, last)
+        shown = self.tree_window.limit
+        if self.tree_window.grow(float(last)):
+            # Не вставляем строки внутри обработчика прокрутки Tk
+            self.root.after_idle(self.insert_tree_rows, shown, self.tree_window.limit,
+                                 self.tree_window.generation)
     
     def edit_selected_product(self):
         """Редактировать выбранный товар"""
@@ -1020,45 +1028,21 @@ class PlatformaManagerModern:
         self.clear_images()
     
     def update_app_js(self):
-        """Обновить app.min.js с новыми данными"""
+        """Пересобрать сайт в dist/ (единый конвейер site_build)"""
         if not os.path.exists(self.web_dir):
             messagebox.showerror("Ошибка", f"Папка {self.web_dir} не найдена!")
             return
         
-        app_js_path = os.path.join(self.web_dir, "app.min.js")
-        if not os.path.exists(app_js_path):
-            messagebox.showerror("Ошибка", f"Файл {app_js_path} не найден!")
-            return
-        
         try:
-            # Читаем текущий файл
-            with open(app_js_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # Создаем новый массив товаров
-            products_json = json.dumps(self.products, ensure_ascii=False, indent=2)
-            
-            # Заменяем массив товаров
-            pattern = r'const products = \[.*?\];'
-            replacement = f'const products = {products_json};'
-            
-            if re.search(pattern, content, re.DOTALL):
-                new_content = re.sub(pattern, replacement, content, flags=re.DOTALL)
-                
-                # Создаем бэкап
-                backup_path = f"{app_js_path}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                shutil.copy2(app_js_path, backup_path)
-                
-                # Записываем новый файл
-                with open(app_js_path, 'w', encoding='utf-8') as f:
-                    f.write(new_content)
-                
-                messagebox.showinfo("Успех", f"app.min.js обновлен с {len(self.products)} товарами!")
-            else:
-                messagebox.showerror("Ошибка", "Не удалось найти массив товаров в app.min.js")
-            
+            # Данные сайт берет из products.json, поэтому сначала сохраняем их
+            self.save_products()
+            report = SiteBuilder(source_dir=self.web_dir, products_file=self.products_file,
+                                 images_dir=self.images_dir).run()
+            print_build_report(report)
+            messagebox.showinfo("Успех", f"Сайт собран в {DIST_DIR}/: {len(self.products)} товаров, "
+                                         f"обновлено файлов: {len(report['written'])}")
         except Exception as e:
-            messagebox.showerror("Ошибка", f"Ошибка обновления app.min.js: {e}")
+            messagebox.showerror("Ошибка", f"Ошибка сборки сайта: {e}")
     
     def update_data_local(self):
         """Обновление данных только локально (без деплоя)"""
@@ -1072,13 +1056,11 @@ class PlatformaManagerModern:
                 messagebox.showwarning("Предупреждение", f"Файл {self.products_file} не найден")
                 return
             
-            # Копируем изображения
+            # Синхронизируем изображения (копируются только изменения)
             if os.path.exists(self.images_dir):
                 web_img_dir = os.path.join(self.web_dir, 'img')
-                if os.path.exists(web_img_dir):
-                    shutil.rmtree(web_img_dir)
-                shutil.copytree(self.images_dir, web_img_dir)
-                print(f"✅ Изображения скопированы в {self.web_dir}")
+                report = sync_directory(self.images_dir, web_img_dir)
+                print_report(report, f"Изображения в {self.web_dir}")
             else:
                 messagebox.showwarning("Предупреждение", f"Папка {self.images_dir} не найдена")
             
@@ -1170,8 +1152,8 @@ class PlatformaManagerModern:
                 self.web_server = None
             
             # Запускаем новый сервер
-            self.web_server = subprocess.Popen(['python3', '-m', 'http.server', '8005'], 
-                                             cwd=self.web_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self.web_server = subprocess.Popen(server_command(8005, self.web_dir),
+                                             stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
             
             # Открываем браузер
             import webbrowser
@@ -1191,8 +1173,8 @@ class PlatformaManagerModern:
             # Запускаем сервер
             try:
                 port = self.server_port_var.get()
-                self.web_server = subprocess.Popen(['python3', '-m', 'http.server', port], 
-                                                 cwd=self.web_dir, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                self.web_server = subprocess.Popen(server_command(port, self.web_dir),
+                                                 stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                 self.server_button.configure(text="🛑 Остановить сервер")
                 self.status_label.configure(text=f"Сервер запущен на порту {port}")
             except Exception as e:
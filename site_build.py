@@ -0,0 +1,643 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Единая сборка сайта
+
+Этапы: загрузка каталога → проверка → изображения → данные →
+JS/CSS/HTML → отпечатки → запись в dist/.
+
+Каждый этап кэшируется в .build_cache/ по отпечатку своих входов
+(размер и mtime файлов), поэтому изменение цены пересобирает только
+products.json, а изображения и статика берутся из кэша.
+"""
+
+import os
+import re
+import json
+import gzip
+import time
+import hashlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # .br не пишутся, остаются только .gz
+
+from hashing import file_hash
+
+SOURCE_DIR = "web"
+PRODUCTS_FILE = "products.json"
+IMAGES_DIR = "img"
+DIST_DIR = "dist"
+CACHE_DIR = ".build_cache"
+MANIFEST_NAME = "build-manifest.json"
+
+# Статические файлы сайта из web/
+STATIC_FILES = [
+    'index.html',
+    'app.min.js',
+    'cache-bust.js',
+    'styles.min.css',
+    'mobile.overrides.css',
+    'card-titles.css',
+    'favicon.png',
+    'favicon-16x16.png',
+    'favicon-48x48.png',
+    'CNAME',
+]
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.avif')
+REQUIRED_FIELDS = ('id', 'title', 'section')
+
+# Точки входа без отпечатка (их адрес должен оставаться постоянным)
+ENTRY_FILES = {'index.html', 'CNAME'}
+# Файлы, которые кроме копии с отпечатком пишутся и под обычным именем
+# (products.json читают API и скрипты менеджера)
+PLAIN_COPIES = {'products.json'}
+# Карта ассетов товаров (фото и описания) - отдельный файл с отпечатком,
+# а в index.html встраиваются только ассеты оболочки и разделов
+ASSET_MAP_FILE = 'assets.json'
+# Сколько секунд файлы с отпечатками прошлой сборки остаются в dist/:
+# открытые страницы и закэшированный index.html еще ссылаются на них
+RETIRED_GRACE_SECONDS = 24 * 3600
+# Поля карточки в каталоге и поля, нужные только в модалке товара
+CARD_FIELDS = ('id', 'order', 'section', 'title', 'price', 'status', 'images', 'width', 'widths', 'formats')
+DETAIL_FIELDS = ('desc', 'meta', 'link')
+
+HASH_LENGTH = 10
+FINGERPRINT_RE = re.compile(r'\.[0-9a-f]{%d}\.[^./]+$' % HASH_LENGTH)
+# img/product_1/product_1_1-320w.webp -> img/product_1/product_1_1 (фото, к которому относится файл)
+IMAGE_ASSET_RE = re.compile(r'^(img/.+?)(?:-\d+w)?\.[^./]+$')
+
+# Встраивание в index.html (режим inline_critical): первый раздел витрины,
+# его баннер и первые карточки, которые видны без прокрутки
+FIRST_SECTION = 'home'
+HERO_IMAGES = {'home': 'bannerh.jpg', 'nessffo': 'banner.jpg'}
+CRITICAL_CARDS = 2
+CARD_SIZES = '(max-width: 1100px) 50vw, 400px'
+FULL_IMAGE_WIDTH = 2000  # дескриптор основного файла, если у товара нет поля width (max_size сжатия)
+IMAGE_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+# Текстовые файлы, для которых сборка пишет сжатые копии .br и .gz
+COMPRESSIBLE_EXTENSIONS = ('.html', '.js', '.css', '.json', '.svg', '.txt', '.xml')
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE = 'no-cache'
+
+
+def sha256_bytes(data: bytes) -> str:
+    """SHA-256 от байтов"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def stat_key(paths, extra: str = '') -> str:
+    """Отпечаток набора файлов по размеру и mtime (без чтения содержимого)"""
+    h = hashlib.sha256(extra.encode())
+    for path in sorted(paths):
+        try:
+            st = os.stat(path)
+            h.update(f"{path}:{st.st_size}:{st.st_mtime_ns}\n".encode())
+        except OSError:
+            h.update(f"{path}:missing\n".encode())
+    return h.hexdigest()
+
+
+def list_images(images_dir: str) -> list:
+    """Все изображения в папке (относительные пути через /)"""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(images_dir):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        for name in sorted(filenames):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                full = os.path.join(dirpath, name)
+                files.append(os.path.relpath(full, images_dir).replace(os.sep, '/'))
+    return files
+
+
+def order_key(product: dict) -> tuple:
+    """Сортировка товаров: раздел, затем порядок (order), затем ID"""
+    try:
+        order = int(str(product.get('order', 999)))
+    except ValueError:
+        order = 999
+    return (str(product.get('section', '')), order, str(product.get('id', '')))
+
+
+def to_json_bytes(data) -> bytes:
+    """Компактный JSON для сайта"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def fingerprint_name(rel: str, sha: str) -> str:
+    """app.min.js -> app.min.3f2a1b9c0d.js"""
+    base, ext = os.path.splitext(rel)
+    return f"{base}.{sha[:HASH_LENGTH]}{ext}"
+
+
+def is_fingerprinted(rel: str) -> bool:
+    """Есть ли в имени файла отпечаток содержимого"""
+    return bool(FINGERPRINT_RE.search(rel))
+
+
+def cache_control(rel: str) -> str:
+    """Заголовок Cache-Control: файлы с отпечатком не меняются никогда"""
+    return IMMUTABLE_CACHE if is_fingerprinted(rel) else REVALIDATE_CACHE
+
+
+def rewrite_html(html: str, assets: dict, head_extra: str = '', inline_assets: dict = None) -> str:
+    """
+    Заменяет ссылки href/src на файлы с отпечатками (старые ?v=... убираются)
+    и вставляет в <head> карту ассетов window.__ASSETS__ для app.min.js
+    (inline_assets, по умолчанию вся карта) и head_extra.
+    """
+    def replace(match):
+        attr, path = match.group(1), match.group(2)
+        if path not in assets:
+            return match.group(0)
+        return f'{attr}="{assets[path]}"'
+
+    html = re.sub(r'\b(href|src)="([^"?#]+)(\?[^"]*)?"', replace, html)
+    inline_assets = assets if inline_assets is None else inline_assets
+    assets_json = json.dumps(inline_assets, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+    script = f'<script>window.__ASSETS__={assets_json};</script>\n'
+    return html.replace('</head>', script + head_extra + '</head>', 1)
+
+
+def is_shell_asset(rel: str) -> bool:
+    """
+    Ассет оболочки (статика, баннеры, data/<раздел>.json) - его адрес
+    встраивается в index.html. Фото товаров (img/<папка>/...) и описания
+    (data/products/...) уходят в карту assets.json.
+    """
+    if rel.startswith('data/products/'):
+        return False
+    return not (rel.startswith('img/') and '/' in rel[len('img/'):])
+
+
+def compressed_source(rel: str) -> str:
+    """app.min.3f2a1b9c0d.js.br -> app.min.3f2a1b9c0d.js"""
+    for _, suffix in PRECOMPRESSED:
+        if rel.endswith(suffix):
+            return rel[:-len(suffix)]
+    return rel
+
+
+def card_image_preload(card: dict, assets: dict) -> str:
+    """<link rel=preload> для первого фото карточки в лучшем доступном формате"""
+    images = [img.strip() for img in str(card.get('images', '')).split(',') if img.strip()]
+    if not images:
+        return ''
+    base, ext = os.path.splitext(images[0])
+    formats = [f.strip() for f in str(card.get('formats', '')).split(',') if f.strip() in IMAGE_TYPES]
+    fmt = 'avif' if 'avif' in formats else (formats[0] if formats else None)
+    suffix = f".{fmt}" if fmt else ext
+
+    def url(rel):
+        return assets.get(f"img/{rel}", f"img/{rel}")
+
+    attrs = f'href="{url(base + suffix)}"'
+    widths = [w.strip() for w in str(card.get('widths', '')).split(',') if w.strip()]
+    if widths:
+        srcset = ', '.join(f"{url(f'{base}-{w}w{suffix}')} {w}w" for w in widths)
+        # Ширина первого фото: поле width - список по фото через запятую
+        full_width = str(card.get('width', '')).split(',')[0].strip() or FULL_IMAGE_WIDTH
+        attrs += f' imagesrcset="{srcset}, {url(base + suffix)} {full_width}w" imagesizes="{CARD_SIZES}"'
+    if fmt:
+        attrs += f' type="{IMAGE_TYPES[fmt]}"'
+    return f'<link rel="preload" as="image" {attrs}>\n'
+
+
+def card_image_assets(cards: list, assets: dict) -> dict:
+    """
+    Записи карты ассетов для всех фото карточек (основной файл, копии
+    по ширине и WebP/AVIF): встроенный раздел рисуется, не дожидаясь
+    assets.json.
+    """
+    by_image = {}
+    for rel, name in assets.items():
+        match = IMAGE_ASSET_RE.match(rel)
+        if match:
+            by_image.setdefault(match.group(1), {})[rel] = name
+
+    entries = {}
+    for card in cards:
+        for image in str(card.get('images', '')).split(','):
+            if image.strip():
+                entries.update(by_image.get(f"img/{os.path.splitext(image.strip())[0]}", {}))
+    return entries
+
+
+def critical_head(html: str, cards: list, assets: dict, section: str = FIRST_SECTION) -> str:
+    """
+    Разметка для встраивания: карточки первого раздела (без запроса
+    data/<раздел>.json), адреса их фото (без запроса assets.json) и
+    подсказки preload для баннера и первых фото.
+    """
+    hints = ''
+    hero = f"img/{HERO_IMAGES.get(section, '')}"
+    if hero in assets and f'href="{hero}"' not in html:
+        hints += f'<link rel="preload" as="image" href="{assets[hero]}" fetchpriority="high">\n'
+    for card in cards[:CRITICAL_CARDS]:
+        hints += card_image_preload(card, assets)
+
+    inline = json.dumps({section: cards}, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
+    images = json.dumps(card_image_assets(cards, assets), ensure_ascii=False, separators=(',', ':'),
+                        sort_keys=True).replace('</', '<\\/')
+    return hints + (f'<script>window.__INLINE_SECTIONS__={inline};'
+                    f'window.__INLINE_ASSETS__={images};</script>\n')
+
+
+class SiteBuilder:
+    STAGES = (
+        'load_catalog',
+        'validate',
+        'transform_images',
+        'emit_data',
+        'emit_assets',
+        'fingerprint',
+        'compress',
+        'write_dist',
+    )
+
+    def __init__(self, dist_dir: str = DIST_DIR, cache_dir: str = CACHE_DIR,
+                 source_dir: str = SOURCE_DIR, products_file: str = PRODUCTS_FILE,
+                 images_dir: str = IMAGES_DIR, optimize_images: bool = False,
+                 use_cache: bool = True, inline_critical: bool = False):
+        self.dist_dir = dist_dir
+        self.cache_dir = cache_dir
+        self.source_dir = source_dir
+        self.products_file = products_file
+        self.images_dir = images_dir
+        self.optimize_images = optimize_images
+        self.use_cache = use_cache
+        self.inline_critical = inline_critical
+
+        # Артефакт: путь в dist/ -> bytes (содержимое) или str (путь к исходному файлу)
+        self.artifacts = {}
+        self.catalog = []
+        self.hashes = {}
+        self.assets = {}
+        self.precompressed = {}
+        self.keys = {}
+        self.report = {'stages': {}, 'written': [], 'deleted': [], 'unchanged': 0}
+        self._stage_artifacts = {}
+        self._code_key = stat_key([os.path.abspath(__file__)])
+        self._hash_cache = self._read_json(os.path.join(cache_dir, 'file_hashes.json'), {})
+
+    # ---------- кэш этапов ----------
+
+    def _read_json(self, path: str, default):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def _write_json(self, path: str, data):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
+
+    def _object_path(self, sha: str) -> str:
+        return os.path.join(self.cache_dir, 'objects', sha[:2], sha)
+
+    def emit(self, rel: str, content):
+        """Регистрирует артефакт сборки (bytes или путь к файлу)"""
+        self.artifacts[rel] = content
+        self._stage_artifacts[rel] = content
+
+    def cached_stage(self, name: str, key: str, build):
+        """
+        Выполняет build() только если отпечаток входов изменился.
+        Результат и артефакты этапа сохраняются в .build_cache/.
+        """
+        # Изменение самого конвейера тоже делает кэш недействительным
+        key = sha256_bytes(f"{key}:{self._code_key}".encode())
+        self.keys[name] = key
+        cache_file = os.path.join(self.cache_dir, f"{name}.json")
+        entry = self._read_json(cache_file, None) if self.use_cache else None
+
+        if entry and entry.get('key') == key:
+            refs = entry.get('artifacts', {})
+            if all(ref.get('file') or os.path.exists(self._object_path(ref['sha'])) for ref in refs.values()):
+                for rel, ref in refs.items():
+                    if ref.get('file'):
+                        self.emit(rel, ref['file'])
+                    else:
+                        with open(self._object_path(ref['sha']), 'rb') as f:
+                            self.emit(rel, f.read())
+                return entry.get('result'), 'cached'
+
+        self._stage_artifacts = {}
+        result = build()
+        refs = {}
+        for rel, content in self._stage_artifacts.items():
+            if isinstance(content, bytes):
+                sha = sha256_bytes(content)
+                obj = self._object_path(sha)
+                if not os.path.exists(obj):
+                    os.makedirs(os.path.dirname(obj), exist_ok=True)
+                    with open(obj, 'wb') as f:
+                        f.write(content)
+                refs[rel] = {'sha': sha}
+            else:
+                refs[rel] = {'file': content}
+        self._write_json(cache_file, {'key': key, 'result': result, 'artifacts': refs})
+        return result, 'built'
+
+    def file_hash(self, path: str) -> str:
+        """SHA-256 файла с кэшем по размеру и mtime"""
+        st = os.stat(path)
+        sig = f"{st.st_size}:{st.st_mtime_ns}"
+        cached = self._hash_cache.get(path)
+        if cached and cached[0] == sig:
+            return cached[1]
+        digest = file_hash(path)
+        self._hash_cache[path] = [sig, digest]
+        return digest
+
+    def artifact_hash(self, rel: str) -> str:
+        content = self.artifacts[rel]
+        return sha256_bytes(content) if isinstance(content, bytes) else self.file_hash(content)
+
+    # ---------- этапы ----------
+
+    def stage_load_catalog(self):
+        """Загрузка каталога из products.json"""
+        def build():
+            with open(self.products_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+
+        self.catalog, status = self.cached_stage('load_catalog', stat_key([self.products_file]), build)
+        return status
+
+    def stage_validate(self):
+        """Проверка обязательных полей, уникальности ID и наличия фото"""
+        self.image_files = list_images(self.images_dir)
+        key = self.keys['load_catalog'] + stat_key([], extra='\n'.join(self.image_files))
+
+        def build():
+            errors, warnings = [], []
+            seen_ids = set()
+            known_images = set(self.image_files)
+            for i, product in enumerate(self.catalog, 1):
+                pid = str(product.get('id', '')).strip()
+                for field in REQUIRED_FIELDS:
+                    if not str(product.get(field, '')).strip():
+                        errors.append(f"товар #{i}: нет поля '{field}'")
+                if pid in seen_ids:
+                    errors.append(f"товар #{i}: повторяется ID {pid}")
+                seen_ids.add(pid)
+                for image in str(product.get('images', '')).split(','):
+                    image = image.strip()
+                    if image and image not in known_images:
+                        warnings.append(f"товар {pid}: нет файла img/{image}")
+            return {'errors': errors, 'warnings': warnings}
+
+        result, status = self.cached_stage('validate', key, build)
+        for warning in result['warnings']:
+            print(f"⚠️ {warning}")
+        if result['errors']:
+            raise ValueError("Каталог не прошел проверку:\n" + "\n".join(f"   ❌ {e}" for e in result['errors']))
+        return status
+
+    def stage_transform_images(self):
+        """Изображения: (опционально) оптимизация из хранилища оригиналов и регистрация файлов"""
+        paths = [os.path.join(self.images_dir, rel) for rel in self.image_files]
+        key = stat_key(paths, extra=f"optimize={self.optimize_images}")
+
+        def build():
+            if self.optimize_images:
+                from optimize_images import optimize_image
+                from image_pipeline import is_variant_path
+                from image_store import ImageStore
+
+                store = ImageStore()
+                for path in paths:
+                    if path.lower().endswith(('.jpg', '.jpeg')) and not is_variant_path(path):
+                        optimize_image(path, store)
+                store.save()
+                self.image_files = list_images(self.images_dir)
+
+            for rel in self.image_files:
+                self.emit(f"img/{rel}", os.path.join(self.images_dir, rel))
+            return {'count': len(self.image_files)}
+
+        _, status = self.cached_stage('transform_images', key, build)
+        return status
+
+    def stage_emit_data(self):
+        """
+        Данные каталога: полный products.json, а также для витрины
+        data/<раздел>.json (только поля карточек, уже отсортированные) и
+        data/products/<id>.json с описанием для модалки (грузится по клику).
+        """
+        def build():
+            products = sorted(self.catalog, key=order_key)
+            self.emit('products.json', to_json_bytes(products))
+
+            sections = {}
+            for product in products:
+                sections.setdefault(str(product.get('section', '')), []).append(
+                    {field: product[field] for field in CARD_FIELDS if field in product}
+                )
+                details = {field: product.get(field, '') for field in DETAIL_FIELDS}
+                self.emit(f"data/products/{product.get('id', '')}.json", to_json_bytes(details))
+            for section, cards in sections.items():
+                self.emit(f"data/{section}.json", to_json_bytes(cards))
+
+            return {'count': len(products), 'sections': sorted(sections)}
+
+        _, status = self.cached_stage('emit_data', self.keys['load_catalog'], build)
+        return status
+
+    def stage_emit_assets(self):
+        """JS/CSS/HTML и прочая статика из web/"""
+        paths = [os.path.join(self.source_dir, name) for name in STATIC_FILES]
+
+        def build():
+            count = 0
+            for name, path in zip(STATIC_FILES, paths):
+                if os.path.exists(path):
+                    with open(path, 'rb') as f:
+                        self.emit(name, f.read())
+                    count += 1
+            return {'count': count}
+
+        _, status = self.cached_stage('emit_assets', stat_key(paths), build)
+        return status
+
+    def stage_fingerprint(self):
+        """
+        Отпечатки содержимого: каждый файл (кроме точек входа) получает имя
+        с хешем, index.html переписывается на новые имена. Такие файлы можно
+        кэшировать навсегда - при изменении меняется и имя.
+        """
+        hashes = {rel: self.artifact_hash(rel) for rel in sorted(self.artifacts)}
+        self.assets = {
+            rel: fingerprint_name(rel, sha)
+            for rel, sha in hashes.items() if rel not in ENTRY_FILES
+        }
+
+        artifacts = {}
+        self.hashes = {}
+        for rel, content in self.artifacts.items():
+            if rel in self.assets:
+                artifacts[self.assets[rel]] = content
+                self.hashes[self.assets[rel]] = hashes[rel]
+            if rel not in self.assets or rel in PLAIN_COPIES:
+                artifacts[rel] = content
+                self.hashes[rel] = hashes[rel]
+
+        # Карта фото и описаний товаров: один файл с отпечатком, который
+        # кэшируется навсегда, вместо встраивания в некэшируемый index.html
+        shell = {rel: name for rel, name in self.assets.items() if is_shell_asset(rel)}
+        asset_map = to_json_bytes({rel: name for rel, name in sorted(self.assets.items()) if rel not in shell})
+        asset_map_sha = sha256_bytes(asset_map)
+        shell[ASSET_MAP_FILE] = fingerprint_name(ASSET_MAP_FILE, asset_map_sha)
+        artifacts[shell[ASSET_MAP_FILE]] = asset_map
+        self.hashes[shell[ASSET_MAP_FILE]] = asset_map_sha
+        self.assets[ASSET_MAP_FILE] = shell[ASSET_MAP_FILE]
+
+        if isinstance(artifacts.get('index.html'), bytes):
+            html = artifacts['index.html'].decode('utf-8')
+            head_extra = ''
+            section_file = f"data/{FIRST_SECTION}.json"
+            if self.inline_critical and isinstance(self.artifacts.get(section_file), bytes):
+                cards = json.loads(self.artifacts[section_file])
+                head_extra = critical_head(html, cards, self.assets)
+            html = rewrite_html(html, self.assets, head_extra, inline_assets=shell).encode('utf-8')
+            artifacts['index.html'] = html
+            self.hashes['index.html'] = sha256_bytes(html)
+
+        self.artifacts = artifacts
+        return 'built'
+
+    def compress_artifact(self, sha: str, content: bytes, encoding: str) -> bytes:
+        """Сжатие на максимальном уровне; результат кэшируется по хешу содержимого"""
+        path = os.path.join(self.cache_dir, 'compressed', sha[:2], f"{sha}.{encoding}")
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                return f.read()
+        if encoding == 'br':
+            data = brotli.compress(content, quality=11)
+        else:
+            data = gzip.compress(content, compresslevel=9, mtime=0)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return data
+
+    def stage_compress(self):
+        """
+        Сжатые копии текстовых файлов (.br и .gz рядом с оригиналом), чтобы
+        сервер отдавал их без сжатия на лету. Копия пишется, только если
+        она меньше оригинала.
+        """
+        if brotli is None:
+            print("⚠️ Модуль brotli не установлен - пишутся только .gz (pip install brotli)")
+        encodings = [(enc, suffix) for enc, suffix in PRECOMPRESSED if enc != 'br' or brotli]
+        for rel in sorted(self.artifacts):
+            content = self.artifacts[rel]
+            if not rel.endswith(COMPRESSIBLE_EXTENSIONS) or not isinstance(content, bytes):
+                continue
+            for encoding, suffix in encodings:
+                data = self.compress_artifact(self.hashes[rel], content, encoding)
+                if len(data) < len(content):
+                    self.artifacts[rel + suffix] = data
+                    self.hashes[rel + suffix] = sha256_bytes(data)
+                    self.precompressed.setdefault(rel, {})[encoding] = len(data)
+        return 'built'
+
+    def stage_write_dist(self):
+        """
+        Запись в dist/ только измененных файлов и удаление лишних. Файлы
+        с отпечатками из прошлых сборок удаляются не сразу, а через
+        RETIRED_GRACE_SECONDS: уже открытые страницы и index.html из кэша
+        браузера еще запрашивают старые имена.
+        """
+        manifest_path = os.path.join(self.dist_dir, MANIFEST_NAME)
+        manifest = self._read_json(manifest_path, {})
+        previous = manifest.get('files', {})
+        retired = {rel: entry for rel, entry in manifest.get('retired', {}).items() if rel not in self.artifacts}
+
+        for rel in sorted(self.artifacts):
+            dst = os.path.join(self.dist_dir, rel)
+            if previous.get(rel) == self.hashes[rel] and os.path.exists(dst):
+                self.report['unchanged'] += 1
+                continue
+            os.makedirs(os.path.dirname(dst) or '.', exist_ok=True)
+            content = self.artifacts[rel]
+            if isinstance(content, bytes):
+                with open(dst, 'wb') as f:
+                    f.write(content)
+            else:
+                with open(content, 'rb') as src, open(dst, 'wb') as f:
+                    f.write(src.read())
+            self.report['written'].append(rel)
+
+        now = time.time()
+        for rel in sorted(set(previous) - set(self.artifacts)):
+            if is_fingerprinted(compressed_source(rel)):
+                retired[rel] = {'sha': previous[rel], 'since': now}
+            else:
+                self._remove_dist_file(rel)
+
+        for rel, entry in sorted(retired.items()):
+            if now - entry.get('since', 0) >= RETIRED_GRACE_SECONDS:
+                self._remove_dist_file(rel)
+                del retired[rel]
+
+        self._write_json(manifest_path, {
+            'files': self.hashes,
+            'assets': self.assets,
+            'precompressed': self.precompressed,
+            'retired': retired,
+        })
+        self._write_json(os.path.join(self.cache_dir, 'file_hashes.json'), self._hash_cache)
+        return 'built'
+
+    def _remove_dist_file(self, rel: str):
+        dst = os.path.join(self.dist_dir, rel)
+        if os.path.exists(dst):
+            os.remove(dst)
+            self.report['deleted'].append(rel)
+
+    def run(self) -> dict:
+        """Запуск всех этапов по порядку"""
+        started = time.perf_counter()
+        for stage in self.STAGES:
+            stage_started = time.perf_counter()
+            status = getattr(self, f"stage_{stage}")()
+            self.report['stages'][stage] = (status, (time.perf_counter() - stage_started) * 1000)
+        self.report['total_ms'] = (time.perf_counter() - started) * 1000
+        return self.report
+
+
+def print_report(report: dict):
+    """Вывод отчета о сборке"""
+    for stage, (status, ms) in report['stages'].items():
+        icon = "⚡" if status == 'cached' else "🔨"
+        print(f"   {icon} {stage:<17} {status:<7} {ms:8.1f} мс")
+    print(f"📦 Записано: {len(report['written'])}, удалено: {len(report['deleted'])}, "
+          f"без изменений: {report['unchanged']} ({report['total_ms']:.0f} мс)")
+    for rel in report['written'][:20]:
+        print(f"   ✏️ {rel}")
+    if len(report['written']) > 20:
+        print(f"   ... и еще {len(report['written']) - 20} файлов")
+
+
+def build(dist_dir: str = DIST_DIR, **options) -> bool:
+    """Собрать сайт в dist/ (для вызова из других скриптов)"""
+    try:
+        print(f"🏗️ Сборка сайта в {dist_dir}/...")
+        report = SiteBuilder(dist_dir=dist_dir, **options).run()
+        print_report(report)
+        print("✅ Сборка завершена")
+        return True
+    except Exception as e:
+        print(f"❌ Ошибка сборки: {e}")
+        return False
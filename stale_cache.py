@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Кэш с фоновым обновлением (stale-while-revalidate)
+
+Запросы всегда получают последнее удачное значение и не ждут источник
+(Google Sheets): обновление идет в фоне незадолго до истечения срока,
+одновременные обновления склеиваются в одно, а последнее удачное значение
+сохраняется на диск, чтобы после перезапуска сервер сразу отвечал.
+"""
+
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+
+class StaleWhileRevalidateCache:
+    def __init__(self, loader, ttl: int = 300, refresh_ahead: float = 0.8,
+                 snapshot_path: str = None, name: str = 'cache'):
+        """
+        loader() возвращает свежие данные или бросает исключение.
+        ttl - через сколько секунд данные считаются устаревшими,
+        refresh_ahead - доля ttl, после которой начинается фоновое обновление.
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.refresh_after = ttl * refresh_ahead
+        self.snapshot_path = snapshot_path
+        self.name = name
+
+        self.value = None
+        self.version = 0
+        self.loaded_at = 0.0
+        self.changed_at = 0.0
+        self.source = None
+        self.last_error = None
+        self.refresh_count = 0
+
+        self._lock = threading.Lock()
+        self._refreshing = None  # threading.Event текущего обновления
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.load_snapshot()
+
+    # ---------- снимок на диске ----------
+
+    def load_snapshot(self):
+        """Последнее удачное значение с диска (холодный старт без ожидания)"""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                snapshot = json.load(f)
+            self.value = snapshot['data']
+            self.loaded_at = snapshot.get('saved_at', 0.0)
+            self.changed_at = snapshot.get('changed_at', self.loaded_at)
+            self.version = 1
+            self.source = 'snapshot'
+            print(f"💾 {self.name}: загружен снимок от {datetime.fromtimestamp(self.loaded_at):%Y-%m-%d %H:%M:%S}")
+        except Exception as e:
+            print(f"⚠️ {self.name}: снимок {self.snapshot_path} поврежден: {e}")
+
+    def save_snapshot(self):
+        """Сохранение значения на диск (атомарно через временный файл)"""
+        if not self.snapshot_path:
+            return
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'saved_at': self.loaded_at, 'changed_at': self.changed_at, 'data': self.value},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, self.snapshot_path)
+
+    # ---------- обновление ----------
+
+    def age(self) -> float:
+        """Возраст данных в секундах"""
+        return time.time() - self.loaded_at if self.loaded_at else float('inf')
+
+    def _claim(self):
+        """Текущее обновление (event, False) или новое, которое выполняет вызывающий (event, True)"""
+        with self._lock:
+            if self._refreshing is not None:
+                return self._refreshing, False
+            self._refreshing = threading.Event()
+            return self._refreshing, True
+
+    def set_value(self, value):
+        """Принимает свежие данные (версия растет, только если они изменились)"""
+        with self._lock:
+            self.loaded_at = time.time()
+            if value != self.value:
+                self.version += 1
+                self.changed_at = self.loaded_at
+            self.value = value
+            self.source = 'loader'
+            self.last_error = None
+            self.refresh_count += 1
+        self.save_snapshot()
+
+    def current(self) -> tuple:
+        """(значение, версия, время изменения) - согласованно, под одной блокировкой"""
+        with self._lock:
+            return self.value, self.version, self.changed_at
+
+    def set_error(self, error):
+        """Запоминает ошибку обновления; прежнее значение остается"""
+        self.last_error = str(error)
+        print(f"❌ {self.name}: ошибка обновления, отдаем прежние данные: {error}")
+
+    def _run(self, running) -> bool:
+        try:
+            self.set_value(self.loader())
+            return True
+        except Exception as e:
+            self.set_error(e)
+            return False
+        finally:
+            with self._lock:
+                self._refreshing = None
+            running.set()
+
+    def refresh(self) -> bool:
+        """
+        Загружает свежие данные. Если обновление уже идет, ждет его,
+        а не запускает второе (single-flight). При ошибке остается
+        прежнее значение.
+        """
+        running, owner = self._claim()
+        if not owner:
+            running.wait()
+            return self.last_error is None
+        return self._run(running)
+
+    def refresh_in_background(self):
+        """Запускает обновление в фоне (если оно еще не идет); возвращает его event"""
+        running, owner = self._claim()
+        if owner:
+            threading.Thread(target=self._run, args=(running,), daemon=True).start()
+        return running
+
+    def get(self, wait_timeout: float = 30):
+        """
+        Текущее значение без ожидания источника. Устаревающие данные
+        отдаются сразу, а обновление запускается в фоне. Ждать приходится
+        только при самом первом запуске без снимка на диске; если и эта
+        загрузка не удалась - None (данных нет, а не пустые данные).
+        """
+        if self.value is None:
+            self.refresh_in_background().wait(wait_timeout)
+            return self.value
+
+        if self.age() >= self.refresh_after:
+            self.refresh_in_background()
+        return self.value
+
+    # ---------- фоновый поток ----------
+
+    def start(self, interval: float = None):
+        """
+        Фоновый поток, который обновляет данные до истечения срока,
+        чтобы запросы вообще не видели устаревания.
+        """
+        if self._thread is not None:
+            return
+        interval = interval or max(1.0, self.refresh_after / 4)
+
+        def loop():
+            while not self._stop.is_set():
+                if self.age() >= self.refresh_after:
+                    self.refresh()
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, name=f"{self.name}-refresh", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self) -> dict:
+        """Состояние кэша для /api/status (без обращения к источнику)"""
+        age = self.age()
+        return {
+            'version': self.version,
+            'source': self.source,
+            'age_seconds': None if age == float('inf') else round(age, 1),
+            'stale': age >= self.ttl,
+            'refreshing': self._refreshing is not None,
+            'last_update': datetime.fromtimestamp(self.loaded_at).isoformat() if self.loaded_at else None,
+            'last_error': self.last_error,
+            'refresh_count': self.refresh_count,
+        }
@@ -17,4 +17,4 @@ echo "💡 Для остановки сервера нажмите Ctrl+C"
 echo "🌍 Сайт доступен по адресу: http://localhost:8000"
 echo ""
 
-python -m http.server 8000
+python ../static_files.py 8000 .
@@ -6,25 +6,23 @@
 
 import os
 import sys
-import subprocess
 import webbrowser
 from datetime import datetime
 
+from static_files import make_server, site_dir
+
 def start_server(port=8000):
     """Запуск локального сервера"""
     try:
         print("🌐 Запуск локального сервера...")
         
-        # Проверяем, что папка web существует
-        if not os.path.exists('web'):
-            print("❌ Папка web не найдена!")
+        # Собранный сайт (dist/) или исходники (web/)
+        folder = site_dir()
+        if not os.path.exists(folder):
+            print(f"❌ Папка {folder} не найдена!")
             print("💡 Убедитесь, что вы находитесь в корневой папке проекта")
             return False
         
-        # Переходим в папку web
-        original_dir = os.getcwd()
-        os.chdir('web')
-        
         # Открываем браузер
         url = f"http://localhost:{port}"
         print(f"🚀 Сервер запущен: {url}")
@@ -43,8 +41,9 @@ def start_server(port=8000):
         browser_thread.daemon = True
         browser_thread.start()
         
-        # Запускаем HTTP сервер
-        subprocess.run([sys.executable, '-m', 'http.server', str(port)])
+        # Запускаем HTTP сервер (keep-alive, ETag, Range, готовые .br/.gz)
+        with make_server(folder, port) as httpd:
+            httpd.serve_forever()
         
         return True
         
@@ -54,10 +53,6 @@ def start_server(port=8000):
     except Exception as e:
         print(f"❌ Ошибка запуска сервера: {e}")
         return False
-    finally:
-        # Возвращаемся в исходную папку
-        if 'original_dir' in locals():
-            os.chdir(original_dir)
 
 if __name__ == "__main__":
     print("🎯 Быстрый запуск локального сервера")
@@ -72,6 +67,6 @@ if __name__ == "__main__":
             print(f"⚠️ Неверный порт: {sys.argv[1]}, используем 8000")
     
     print(f"🎯 Порт: {port}")
-    print(f"📁 Папка: {os.path.abspath('web')}")
+    print(f"📁 Папка: {os.path.abspath(site_dir())}")
     
     start_server(port)
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Статический сервер сайта (замена python -m http.server)
+
+Многопоточный, с keep-alive (HTTP/1.1), ETag/If-None-Match,
+Last-Modified/If-Modified-Since, запросами диапазонов (Range) и
+Cache-Control по шаблонам путей. Сборка (site_build) кладет рядом с
+текстовыми файлами .br и .gz: если браузер их принимает
+(Accept-Encoding), отдается готовая копия, и сервер ничего не сжимает
+на лету.
+
+Запуск: python static_files.py [порт] [папка]
+"""
+
+import os
+import sys
+import shutil
+import fnmatch
+import mimetypes
+import posixpath
+from email.utils import parsedate_to_datetime
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from site_build import (COMPRESSIBLE_EXTENSIONS, DIST_DIR, IMMUTABLE_CACHE, MANIFEST_NAME, PRECOMPRESSED,
+                        SOURCE_DIR, cache_control)
+
+DEFAULT_PORT = 8000
+INDEX_FILE = 'index.html'
+CHUNK_SIZE = 64 * 1024
+
+# Cache-Control по шаблону пути (первое совпадение); остальным - site_build.cache_control
+CACHE_RULES = [
+    ('img/*', 'public, max-age=86400'),
+    ('favicon*', 'public, max-age=86400'),
+]
+
+
+def site_dir(root: str = '.') -> str:
+    """Папка для раздачи: собранный dist/, а если сборки нет - исходный web/"""
+    dist = os.path.join(root, DIST_DIR)
+    if os.path.exists(os.path.join(dist, MANIFEST_NAME)):
+        return dist
+    return os.path.join(root, SOURCE_DIR)
+
+
+def server_command(port, directory: str) -> list:
+    """Команда для запуска сервера отдельным процессом"""
+    return [sys.executable, os.path.abspath(__file__), str(port), directory]
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    """Кодировки из заголовка Accept-Encoding (с q=0 не считаются)"""
+    encodings = set()
+    for part in (accept_encoding or '').split(','):
+        name, _, params = part.strip().partition(';')
+        params = params.replace(' ', '')
+        if name and params not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            encodings.add(name.lower())
+    return encodings
+
+
+def precompressed_path(path: str, accept_encoding: str):
+    """
+    Лучшая сжатая копия файла, которую принимает клиент.
+    Возвращает (путь, кодировка) или (path, None).
+    """
+    accepted = accepted_encodings(accept_encoding)
+    for encoding, suffix in PRECOMPRESSED:
+        if (encoding in accepted or '*' in accepted) and os.path.isfile(path + suffix):
+            return path + suffix, encoding
+    return path, None
+
+
+def cache_control_for(rel: str, rules=None) -> str:
+    """Cache-Control для пути: файлы с отпечатком - навсегда, дальше правила по шаблонам"""
+    value = cache_control(rel)
+    if value == IMMUTABLE_CACHE:
+        return value
+    for pattern, rule_value in (CACHE_RULES if rules is None else rules):
+        if fnmatch.fnmatch(rel, pattern):
+            return rule_value
+    return value
+
+
+def parse_range(header: str, size: int):
+    """
+    Один диапазон из заголовка Range: (start, end) включительно.
+    None - заголовок не понят (отдаем файл целиком), False - диапазон вне файла.
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    start, _, end = header[len('bytes='):].strip().partition('-')
+    try:
+        if not start:
+            length = int(end)
+            if length <= 0:
+                return False
+            return max(0, size - length), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        return False
+    return start, min(end, size - 1)
+
+
+class StaticHandler(BaseHTTPRequestHandler):
+    """Обработчик статики; directory и cache_rules передаются через partial"""
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'PlatformaStatic/1.0'
+    # Заголовки и тело уходят отдельными записями: без TCP_NODELAY на keep-alive
+    # тело ждет подтверждения заголовков (~40 мс на каждый ответ)
+    disable_nagle_algorithm = True
+
+    def __init__(self, *args, directory: str = '.', cache_rules=None, quiet: bool = False, **kwargs):
+        self.directory = os.path.realpath(directory)
+        self.cache_rules = cache_rules
+        self.quiet = quiet
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        self.handle_request(send_body=True)
+
+    def do_HEAD(self):
+        self.handle_request(send_body=False)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+    def resolve(self):
+        """Путь запроса -> (файл, относительный путь) или None; защита от выхода из папки"""
+        rel = posixpath.normpath(unquote(urlsplit(self.path).path)).lstrip('/')
+        if rel in ('', '.'):
+            rel = ''
+        full = os.path.realpath(os.path.join(self.directory, rel))
+        if full != self.directory and not full.startswith(self.directory + os.sep):
+            return None
+        return full, rel
+
+    def send_empty(self, status, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        if status != 304:
+            # У 304 тела нет по определению, а Content-Length описывал бы сам файл
+            self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def not_modified(self, etag: str, mtime: float) -> bool:
+        """Проверка If-None-Match (приоритетнее) и If-Modified-Since"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags or f"W/{etag}" in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, OverflowError):
+                return False
+        return False
+
+    def handle_request(self, send_body: bool):
+        resolved = self.resolve()
+        if resolved is None:
+            self.send_empty(HTTPStatus.NOT_FOUND)
+            return
+        path, rel = resolved
+
+        if os.path.isdir(path):
+            if not urlsplit(self.path).path.endswith('/'):
+                self.send_empty(HTTPStatus.MOVED_PERMANENTLY, {'Location': urlsplit(self.path).path + '/'})
+                return
+            path = os.path.join(path, INDEX_FILE)
+            rel = posixpath.join(rel, INDEX_FILE) if rel else INDEX_FILE
+        if not os.path.isfile(path):
+            self.send_empty(HTTPStatus.NOT_FOUND)
+            return
+
+        # Для запросов диапазона отдаем оригинал, иначе - лучшую сжатую копию
+        range_header = self.headers.get('Range')
+        encoding = None
+        file_path = path
+        if not range_header:
+            file_path, encoding = precompressed_path(path, self.headers.get('Accept-Encoding'))
+
+        try:
+            f = open(file_path, 'rb')
+        except OSError:
+            self.send_empty(HTTPStatus.NOT_FOUND)
+            return
+
+        with f:
+            st = os.fstat(f.fileno())
+            etag = f'"{st.st_size:x}-{st.st_mtime_ns:x}{"-" + encoding if encoding else ""}"'
+            headers = {
+                'ETag': etag,
+                'Last-Modified': self.date_time_string(st.st_mtime),
+                'Cache-Control': cache_control_for(rel, self.cache_rules),
+                'Accept-Ranges': 'bytes',
+            }
+            if rel.endswith(COMPRESSIBLE_EXTENSIONS):
+                headers['Vary'] = 'Accept-Encoding'
+
+            if self.not_modified(etag, st.st_mtime):
+                self.send_empty(HTTPStatus.NOT_MODIFIED, headers)
+                return
+
+            start, end = 0, st.st_size - 1
+            status = HTTPStatus.OK
+            if range_header:
+                byte_range = parse_range(range_header, st.st_size)
+                if byte_range is False:
+                    headers['Content-Range'] = f"bytes */{st.st_size}"
+                    self.send_empty(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, headers)
+                    return
+                if byte_range:
+                    start, end = byte_range
+                    status = HTTPStatus.PARTIAL_CONTENT
+                    headers['Content-Range'] = f"bytes {start}-{end}/{st.st_size}"
+
+            self.send_response(status)
+            self.send_header('Content-Type', mimetypes.guess_type(path)[0] or 'application/octet-stream')
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(max(0, end - start + 1)))
+            self.end_headers()
+
+            if send_body:
+                f.seek(start)
+                if status == HTTPStatus.OK:
+                    shutil.copyfileobj(f, self.wfile, CHUNK_SIZE)
+                else:
+                    remaining = end - start + 1
+                    while remaining > 0:
+                        chunk = f.read(min(CHUNK_SIZE, remaining))
+                        if not chunk:
+                            break
+                        self.wfile.write(chunk)
+                        remaining -= len(chunk)
+
+
+class StaticServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+
+def make_server(directory: str, port: int = DEFAULT_PORT, host: str = '', cache_rules=None,
+                quiet: bool = False) -> StaticServer:
+    """Создает сервер для папки (запуск - serve_forever())"""
+    handler = partial(StaticHandler, directory=directory, cache_rules=cache_rules, quiet=quiet)
+    return StaticServer((host, port), handler)
+
+
+def serve(directory: str, port: int = DEFAULT_PORT, host: str = '', cache_rules=None):
+    """Запуск сервера до Ctrl+C"""
+    with make_server(directory, port, host, cache_rules) as httpd:
+        print(f"🌐 Сервер: http://localhost:{port} ({os.path.abspath(directory)})")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n⏹️ Сервер остановлен")
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PORT
+    directory = sys.argv[2] if len(sys.argv) > 2 else site_dir()
+    serve(directory, port)
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+pytest.importorskip('google.auth.transport.requests', exc_type=ImportError)
+
+from aiohttp.test_utils import TestClient, TestServer  # noqa: E402
+
+from scripts import api_server_async  # noqa: E402
+
+
+class Backend:
+    """Источник товаров без сети; fetch_products можно задержать через gate"""
+
+    def __init__(self, products=None, gate=None):
+        self.products = products
+        self.gate = gate
+        self.closed = False
+        self.fetches = 0
+
+    async def start(self):
+        pass
+
+    async def close(self):
+        self.closed = True
+
+    async def fetch_products(self):
+        self.fetches += 1
+        if self.gate is not None:
+            await self.gate.wait()
+        if self.closed:
+            raise RuntimeError("сеанс закрыт во время загрузки")
+        if self.products is None:
+            raise RuntimeError("нет связи с таблицей")
+        return self.products
+
+
+@pytest.fixture(autouse=True)
+def snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_server_async, 'PRODUCTS_SNAPSHOT', str(tmp_path / 'snapshot.json'))
+
+
+def run(backend, scenario):
+    async def main():
+        client = TestClient(TestServer(api_server_async.create_app(backend)))
+        await client.start_server()
+        try:
+            return await scenario(client)
+        finally:
+            await client.close()
+    return asyncio.run(main())
+
+
+def test_products_etag_and_304():
+    async def scenario(client):
+        response = await client.get('/api/products')
+        assert response.status == 200
+        body = await response.json()
+        assert body['count'] == 1 and body['products'] == [{'ID': 1}]
+        etag = response.headers['ETag']
+
+        cached = await client.get('/api/products', headers={'If-None-Match': etag})
+        assert cached.status == 304
+        assert cached.headers['ETag'] == etag
+
+    run(Backend([{'ID': 1}]), scenario)
+
+
+def test_cold_start_without_data_answers_503():
+    async def scenario(client):
+        response = await client.get('/api/products')
+        assert response.status == 503
+        assert response.headers['Retry-After'] == str(api_server_async.UNAVAILABLE_RETRY_AFTER)
+        status = await (await client.get('/api/status')).json()
+        assert status['cache_status'] == 'empty'
+
+    run(Backend(None), scenario)
+
+
+def test_cleanup_cancels_refresh_before_closing_backend():
+    async def main():
+        backend = Backend([{'ID': 1}], gate=asyncio.Event())
+        client = TestClient(TestServer(api_server_async.create_app(backend)))
+        await client.start_server()
+        api = client.server.app['api']
+        task = api.refresh()
+        await asyncio.sleep(0)
+        assert backend.fetches == 1 and not task.done()
+
+        await client.close()
+        # Обновление в полете отменено и дождано до закрытия сеанса
+        assert task.cancelled()
+        assert backend.closed
+        assert api.cache.last_error is None
+
+    asyncio.run(main())
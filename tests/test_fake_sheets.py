@@ -0,0 +1,27 @@
+from fake_sheets import FakeSheet, FakeWorksheet, parse_range
+
+
+def test_parse_range():
+    assert parse_range('Sheet1!B2:D10') == (1, 1, 9, 3)
+    assert parse_range('A1') == (0, 0, 0, 0)
+    assert parse_range('AA3:AB') == (2, 26, 999999, 27)
+    assert parse_range('1:1') == (0, 0, 0, 25)
+
+
+def test_get_all_values_pads_ragged_rows():
+    worksheet = FakeWorksheet(FakeSheet([['ID', 'Title', 'Price'], ['1', 'Шарф'], ['2', 'Платок', '900']]))
+    assert worksheet.get_all_values() == [['ID', 'Title', 'Price'], ['1', 'Шарф', ''], ['2', 'Платок', '900']]
+    assert worksheet.get('A1:C3')[1] == ['1', 'Шарф']  # сырой ответ API не дополняется
+
+
+def test_update_cell_past_column_z():
+    sheet = FakeSheet([['ID']])
+    FakeWorksheet(sheet).update_cell(1, 28, 'x')
+    assert sheet.values[0][27] == 'x'
+    assert sheet.get('AB1') == [['x']]
+
+
+def test_delete_rows_shifts_rows_up():
+    sheet = FakeSheet([['ID'], ['1'], ['2'], ['3'], ['4']])
+    FakeWorksheet(sheet).delete_rows(2, 3)
+    assert sheet.values == [['ID'], ['3'], ['4']]
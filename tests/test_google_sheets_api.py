@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip('requests')
+
+from fake_sheets import FakeSheet, generate_rows, run_server  # noqa: E402
+from scripts import google_sheets_api  # noqa: E402
+
+
+@pytest.fixture
+def api(monkeypatch):
+    sheet = FakeSheet(generate_rows(5))
+    server = run_server(sheet, 0)
+    monkeypatch.setattr(google_sheets_api, 'SHEETS_API_URL', f"http://127.0.0.1:{server.server_address[1]}")
+    client = google_sheets_api.GoogleSheetsAPI()
+    client.api_key = 'fake'
+    yield client, sheet
+    server.shutdown()
+
+
+def test_update_products_order_reports_missing_ids(api):
+    client, sheet = api
+    result = client.update_products_order({'1': 50, '404': 7})
+    assert result == {'updated': 1, 'missing': ['404']}
+    assert sheet.values[1][1] == '50'
+
+
+def test_update_products_order_failure_is_none(api):
+    client, _ = api
+    client.api_key = None
+    assert client.update_products_order({'1': 2}) is None
+
+
+def test_async_wrapper_runs_off_the_event_loop(api):
+    import asyncio
+
+    client, sheet = api
+    assert asyncio.run(client.update_product_order('2', 70)) is True
+    assert sheet.values[2][1] == '70'
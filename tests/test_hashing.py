@@ -0,0 +1,17 @@
+import hashlib
+
+import image_store
+import incremental_sync
+from hashing import file_hash
+
+
+def test_file_hash_matches_sha256_of_content(tmp_path):
+    path = tmp_path / 'big.bin'
+    data = b'x' * (3 * 1024 * 1024 + 17)  # несколько кусков чтения
+    path.write_bytes(data)
+    assert file_hash(str(path)) == hashlib.sha256(data).hexdigest()
+
+
+def test_modules_share_one_helper():
+    assert image_store.file_hash is file_hash
+    assert incremental_sync.file_hash is file_hash
@@ -0,0 +1,104 @@
+import json
+import os
+
+from PIL import Image
+
+from image_pipeline import MODERN_FORMATS, compress_image, format_path, is_variant_path, product_image_fields, variant_path
+from optimize_images import record_image_variants
+
+
+def make_image(path, size):
+    Image.new('RGB', size, 'red').save(path)
+    return str(path)
+
+
+def test_narrow_source_gets_no_upscaled_variants(tmp_path):
+    src = make_image(tmp_path / 'narrow.png', (500, 300))
+    out = str(tmp_path / 'narrow.jpg')
+    result = compress_image(src, out, formats=[])
+    assert result == {'width': 500, 'widths': [320], 'formats': []}
+    assert os.path.exists(variant_path(out, 320))
+    assert not os.path.exists(variant_path(out, 640))
+
+
+def test_wide_source_is_capped_and_gets_all_variants(tmp_path):
+    src = make_image(tmp_path / 'wide.png', (3000, 1500))
+    out = str(tmp_path / 'wide.jpg')
+    result = compress_image(src, out, formats=[])
+    assert result == {'width': 2000, 'widths': [320, 640, 1024], 'formats': []}
+    with Image.open(variant_path(out, 640)) as img:
+        assert img.width == 640
+
+
+def test_formats_are_the_ones_actually_written(tmp_path, monkeypatch):
+    # Формат, который не удалось записать, не попадает в результат
+    monkeypatch.setitem(MODERN_FORMATS, 'bogus', {})
+    src = make_image(tmp_path / 'photo.png', (800, 600))
+    out = str(tmp_path / 'photo.jpg')
+    result = compress_image(src, out, formats=['webp', 'bogus'])
+    assert result['formats'] == ['webp']
+    assert os.path.exists(format_path(variant_path(out, 320), 'webp'))
+
+
+def test_failed_compression_returns_none(tmp_path):
+    broken = tmp_path / 'broken.jpg'
+    broken.write_bytes(b'not an image')
+    assert compress_image(str(broken), str(tmp_path / 'out.jpg')) is None
+
+
+def test_product_fields_use_widths_every_photo_has():
+    fields = product_image_fields([
+        {'width': 500, 'widths': [320], 'formats': ['avif', 'webp']},
+        {'width': 2000, 'widths': [320, 640, 1024], 'formats': ['webp']},
+    ])
+    assert fields == {'width': '500,2000', 'widths': '320', 'formats': 'webp'}
+    assert product_image_fields([None]) == {}
+
+
+def test_product_width_is_recorded_per_photo():
+    fields = product_image_fields([
+        {'width': 1200, 'widths': [320], 'formats': []},
+        None,
+        {'width': 800, 'widths': [320], 'formats': []},
+    ])
+    assert fields['width'] == '1200,,800'
+
+
+def test_is_variant_path():
+    assert is_variant_path('img/product_1/product_1_2-320w.jpg')
+    assert not is_variant_path('img/product_1/product_1_2.jpg')
+
+
+def test_ingest_keeps_store_work_off_the_event_loop(tmp_path):
+    import asyncio
+    import threading
+
+    from image_pipeline import ingest_product_images
+    from image_store import ImageStore, encode_params
+
+    store = ImageStore(store_dir=str(tmp_path / 'originals'), manifest_path=str(tmp_path / 'manifest.json'))
+    calls = []
+    put_original = store.put_original
+
+    def tracked(*args, **kwargs):
+        calls.append(threading.current_thread() is threading.main_thread())
+        return put_original(*args, **kwargs)
+
+    store.put_original = tracked
+    src = make_image(tmp_path / 'photo.png', (700, 400))
+    names, fields = asyncio.run(ingest_product_images(
+        [src, src], '7', str(tmp_path / 'img'), max_workers=1, store=store, params=encode_params(formats=[])))
+    assert names == ['product_7_1.jpg', 'product_7_2.jpg']
+    assert fields['widths'] == '320,640'
+    assert calls == [False, False]
+
+
+def test_record_image_variants_keeps_width_of_each_photo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'img' / 'p').mkdir(parents=True)
+    make_image(tmp_path / 'img' / 'p' / 'a.jpg', (1200, 800))
+    make_image(tmp_path / 'img' / 'p' / 'b.jpg', (800, 600))
+    (tmp_path / 'products.json').write_text(json.dumps([{'images': 'p/a.jpg,p/missing.jpg,p/b.jpg'}]))
+    record_image_variants('products.json', widths=(), formats=())
+    product = json.loads((tmp_path / 'products.json').read_text())[0]
+    assert product['width'] == '1200,,800'
@@ -0,0 +1,67 @@
+import os
+
+from PIL import Image
+
+from image_pipeline import compress_image
+from image_store import MANIFEST_FILE, PROJECT_DIR, STORE_DIR, ImageStore, encode_params
+
+
+def make_store(tmp_path):
+    return ImageStore(store_dir=str(tmp_path / 'originals'), manifest_path=str(tmp_path / 'manifest.json'))
+
+
+def make_photo(path, color='red'):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    Image.new('RGB', (700, 400), color).save(path, 'JPEG')
+    return path
+
+
+def test_default_paths_are_in_project_dir():
+    assert os.path.dirname(STORE_DIR) == PROJECT_DIR
+    assert os.path.dirname(MANIFEST_FILE) == PROJECT_DIR
+
+
+def test_encode_skip_and_hardlinked_duplicate(tmp_path):
+    store = make_store(tmp_path)
+    params = encode_params(formats=[])
+    first = make_photo(str(tmp_path / 'img' / 'a.jpg'))
+    second = str(tmp_path / 'img' / 'b.jpg')
+    with open(first, 'rb') as src, open(second, 'wb') as dst:
+        dst.write(src.read())
+
+    assert store.optimize(first, params, compress_image) == 'encoded'
+    assert store.optimize(first, params, compress_image) == 'skipped'
+    assert store.optimize(second, params, compress_image) == 'deduped'
+    assert os.path.samefile(first, second)
+    assert os.path.samefile(str(tmp_path / 'img' / 'a-640w.jpg'), str(tmp_path / 'img' / 'b-640w.jpg'))
+    assert not os.path.exists(str(tmp_path / 'img' / 'b-1024w.jpg'))
+
+
+def test_reencoding_a_duplicate_leaves_the_other_file_alone(tmp_path):
+    store = make_store(tmp_path)
+    params = encode_params(formats=[])
+    first = make_photo(str(tmp_path / 'img' / 'a.jpg'))
+    second = str(tmp_path / 'img' / 'b.jpg')
+    with open(first, 'rb') as src, open(second, 'wb') as dst:
+        dst.write(src.read())
+    store.optimize(first, params, compress_image)
+    store.optimize(second, params, compress_image)
+    before = open(first, 'rb').read()
+
+    # Кодирование с другими параметрами не пишет в общий inode
+    store.optimize(second, encode_params(quality=40, formats=[]), compress_image)
+    assert not os.path.samefile(first, second)
+    assert open(first, 'rb').read() == before
+
+
+def test_key_index_survives_reload(tmp_path):
+    store = make_store(tmp_path)
+    params = encode_params(formats=[])
+    path = make_photo(str(tmp_path / 'img' / 'a.jpg'))
+    store.optimize(path, params, compress_image)
+    store.save()
+
+    reloaded = make_store(tmp_path)
+    key = reloaded.encode_key(path, params)
+    assert reloaded.find_output(key, params) == path
+    assert reloaded.find_output(key, params, exclude=path) is None
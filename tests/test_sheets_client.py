@@ -0,0 +1,66 @@
+from fake_sheets import FakeAPIError, FakeSheet, FakeWorksheet
+from sheets_client import SheetsClient, TokenBucket, column_letter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def make_client(worksheet=None):
+    clock = Clock()
+    return SheetsClient(worksheet, bucket=TokenBucket(1.0, 2, clock, clock.sleep), seed=1), clock
+
+
+def test_column_letter():
+    assert [column_letter(i) for i in (0, 25, 26, 27, 701, 702)] == ['A', 'Z', 'AA', 'AB', 'ZZ', 'AAA']
+
+
+def test_token_bucket_waits_after_burst():
+    client, clock = make_client()
+    for _ in range(4):
+        client.bucket.acquire()
+    assert clock.now == 2.0
+
+
+def test_call_retries_retryable_errors():
+    client, _ = make_client()
+    failures = [FakeAPIError(503, 'x'), FakeAPIError(429, 'y')]
+
+    def flaky():
+        if failures:
+            raise failures.pop(0)
+        return 'ok'
+
+    assert client.call(flaky) == 'ok'
+    assert client.stats['retries'] == 2
+
+
+def test_queue_coalesces_cells_into_ranges():
+    client, _ = make_client()
+    client.queue(2, 1, 'a')
+    client.queue(2, 2, 'b')
+    client.queue(2, 1, 'c')
+    client.queue(5, 4, 'd')
+    assert client.batch_data() == [{'range': 'B2:C2', 'values': [['c', 'b']]},
+                                   {'range': 'E5', 'values': [['d']]}]
+    assert client.stats['coalesced'] == 1
+
+
+def test_wrapped_worksheet_charges_only_requests():
+    class Worksheet(FakeWorksheet):
+        def local_label(self):  # без запроса к API
+            return self.title
+
+    client, _ = make_client(Worksheet(FakeSheet([['ID'], ['1']])))
+    worksheet = client.wrap()
+    worksheet.get_all_values()
+    assert worksheet.local_label() == 'Sheet1'
+    assert worksheet.row_count == 1000
+    assert client.stats['requests'] == 1
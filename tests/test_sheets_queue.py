@@ -0,0 +1,108 @@
+import json
+
+from sheets_queue import PermanentWriteError, SheetsWriteQueue
+
+
+class Writer:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+
+    def __call__(self, kind, data):
+        self.calls.append((kind, data))
+        return kind not in self.fail
+
+
+def journal_ops(path):
+    if not path.exists():
+        return []
+    return [json.loads(line)['type'] for line in path.read_text().splitlines()]
+
+
+def test_merge_keeps_last_order_and_row_per_id():
+    ops = [
+        {'id': 'a', 'type': 'order', 'data': {'1': '1', '2': '2'}},
+        {'id': 'b', 'type': 'append', 'data': ['7', 'old']},
+        {'id': 'c', 'type': 'order', 'data': {'1': '3'}},
+        {'id': 'd', 'type': 'append', 'data': ['7', 'new']},
+        {'id': 'e', 'type': 'append', 'data': ['8', 'x']},
+    ]
+    orders, rows = SheetsWriteQueue.merge(ops)
+    assert orders == {'1': '3', '2': '2'}
+    assert rows == [['7', 'new'], ['8', 'x']]
+
+
+def test_flush_sends_appends_before_orders_and_clears_journal(tmp_path):
+    journal = tmp_path / 'queue.jsonl'
+    writer = Writer()
+    queue = SheetsWriteQueue(writer, journal_path=str(journal))
+    queue.enqueue_order({'1': 2})
+    queue.enqueue_append(['9', 'Новый'])
+    assert journal_ops(journal) == ['order', 'append']
+
+    assert queue.flush()
+    assert [kind for kind, _ in writer.calls] == ['append', 'order']
+    assert queue.pending_count() == 0
+    assert not journal.exists()
+
+
+def test_failed_order_does_not_resend_appended_rows(tmp_path):
+    journal = tmp_path / 'queue.jsonl'
+    writer = Writer(fail={'order'})
+    queue = SheetsWriteQueue(writer, journal_path=str(journal))
+    queue.enqueue_append(['9', 'Новый'])
+    queue.enqueue_order({'9': 1})
+
+    assert not queue.flush()
+    assert journal_ops(journal) == ['order']
+
+    writer.fail.clear()
+    assert queue.flush()
+    assert [kind for kind, _ in writer.calls] == ['append', 'order', 'order']
+
+
+def test_journal_survives_restart(tmp_path):
+    journal = tmp_path / 'queue.jsonl'
+    SheetsWriteQueue(Writer(), journal_path=str(journal)).enqueue_order({'1': 5})
+    writer = Writer()
+    queue = SheetsWriteQueue(writer, journal_path=str(journal))
+    assert queue.pending_count() == 1
+    assert queue.flush()
+    assert writer.calls == [('order', {'1': '5'})]
+
+
+def test_writer_exception_keeps_ops(tmp_path):
+    def broken(kind, data):
+        raise RuntimeError('нет сети')
+
+    queue = SheetsWriteQueue(broken, journal_path=str(tmp_path / 'queue.jsonl'))
+    queue.enqueue_append(['1'])
+    assert not queue.flush()
+    assert queue.pending_count() == 1
+    assert queue.last_error == 'нет сети'
+
+
+def test_permanent_error_parks_the_journal(tmp_path, capsys):
+    journal = tmp_path / 'queue.jsonl'
+    calls = []
+
+    def writer(kind, data):
+        calls.append(kind)
+        raise PermanentWriteError("нет настроек")
+
+    queue = SheetsWriteQueue(writer, journal_path=str(journal))
+    queue.enqueue_append(['9', 'Новый'])
+    assert not queue.flush()
+    assert queue.parked and 'остановлена' in queue.status_text()
+
+    # Дальше writer не вызывается и ошибка не печатается повторно
+    queue.enqueue_append(['10', 'Еще'])
+    assert not queue.flush()
+    assert calls == ['append']
+    assert capsys.readouterr().out.count('остановлена') == 1
+    assert journal_ops(journal) == ['append', 'append']
+
+    queue.writer = Writer()
+    queue.resume()
+    assert queue.flush()
+    assert not journal.exists()
@@ -0,0 +1,38 @@
+from fake_sheets import FakeSheet, FakeWorksheet, generate_rows
+from sheets_reader import column_runs, iter_products, iter_rows
+
+
+class NoGridWorksheet(FakeWorksheet):
+    """Лист без row_count: чтение до пустой страницы"""
+    row_count = None
+
+
+def test_column_runs():
+    assert column_runs([3, 0, 1, 2, 7, 9, 8]) == [(0, 3), (7, 9)]
+    assert column_runs([]) == []
+
+
+def test_pages_cover_all_rows():
+    sheet = FakeSheet(generate_rows(25))
+    rows = list(iter_rows(FakeWorksheet(sheet), page_size=10))
+    assert [n for n, _ in rows] == list(range(2, 27))
+    assert rows[0][1]['title'] == 'Товар 1'
+
+
+def test_blank_rows_at_page_end_do_not_stop_reading():
+    values = generate_rows(30)
+    for row_number in range(8, 12):  # строки 8..11: конец первой страницы (2..11) пустой
+        values[row_number - 1] = [''] * len(values[0])
+    for worksheet in (FakeWorksheet(FakeSheet(values)), NoGridWorksheet(FakeSheet(values))):
+        titles = [p['title'] for p in iter_products(worksheet, page_size=10)]
+        assert len(titles) == 26
+        assert titles[-1] == 'Товар 30'
+
+
+def test_reads_past_stale_row_count():
+    sheet = FakeSheet(generate_rows(12))
+
+    class StaleGrid(FakeWorksheet):
+        row_count = 5  # свойства листа прочитаны до добавления строк
+
+    assert len(list(iter_products(StaleGrid(sheet), page_size=4))) == 12
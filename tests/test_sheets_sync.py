@@ -0,0 +1,165 @@
+import json
+
+from fake_sheets import FakeSheet, FakeSpreadsheet, generate_rows
+from sheets_sync import SheetsDeltaSync, parse_rows
+
+
+def make_sync(tmp_path, rows=3):
+    sheet = FakeSheet(generate_rows(rows))
+    worksheet = FakeSpreadsheet(sheet).sheet1
+    return sheet, SheetsDeltaSync(worksheet, state_path=str(tmp_path / 'state.json'))
+
+
+def edited(sheet):
+    sheet.updated += 1  # правка «руками» в таблице меняет время изменения файла
+
+
+def sheet_ids(sheet):
+    return [row[0] for row in sheet.values[1:] if row and row[0]]
+
+
+def first_sync(sync, sheet):
+    _, rows = parse_rows(sheet.values)
+    products, report = sync.sync([dict(record) for _, record in rows.values()])
+    assert not report['aborted']
+    return products
+
+
+def test_plan_classifies_changes(tmp_path):
+    sheet, sync = make_sync(tmp_path, rows=4)
+    products = first_sync(sync, sheet)
+
+    local = [dict(p) for p in products if p['id'] != '4']
+    local[0]['price'] = '1 р.'          # правка локально
+    sheet.values[2][4] = '2 р.'         # правка в таблице (товар 2)
+    local.append({'id': '9', 'title': 'Новый'})
+    plan = sync.plan(local, sheet.values)
+
+    assert list(plan['push']) == ['1']
+    assert list(plan['pull']) == ['2']
+    assert [p['id'] for p in plan['append']] == ['9']
+    assert plan['remove_remote'] == ['4']
+    assert plan['remove_local'] == []
+
+
+def test_cleared_sheet_aborts_without_touching_catalog(tmp_path):
+    sheet, sync = make_sync(tmp_path)
+    products = first_sync(sync, sheet)
+    state_before = json.loads((tmp_path / 'state.json').read_text())
+
+    sheet.values = [sheet.values[0]]  # лист очищен, остались заголовки
+    edited(sheet)
+    result, report = sync.sync(products)
+
+    assert report['aborted']
+    assert result == products
+    assert json.loads((tmp_path / 'state.json').read_text()) == state_before
+
+
+def test_blank_title_is_not_a_deletion(tmp_path):
+    sheet, sync = make_sync(tmp_path)
+    products = first_sync(sync, sheet)
+
+    sheet.values[2][3] = ''  # у товара 2 стерли название
+    edited(sheet)
+    result, report = sync.sync(products)
+
+    assert report['removed'] == []
+    assert [p['id'] for p in result] == ['1', '2', '3']
+
+
+def test_row_deleted_in_sheet_is_removed_locally(tmp_path):
+    sheet, sync = make_sync(tmp_path)
+    products = first_sync(sync, sheet)
+
+    del sheet.values[2]  # строка товара 2
+    edited(sheet)
+    result, report = sync.sync(products)
+
+    assert report['removed'] == ['2']
+    assert [p['id'] for p in result] == ['1', '3']
+
+
+def test_local_delete_removes_sheet_row_and_stays_deleted(tmp_path):
+    sheet, sync = make_sync(tmp_path, rows=5)
+    products = first_sync(sync, sheet)
+
+    local = [p for p in products if p['id'] not in ('2', '3', '5')]
+    result, report = sync.sync(local)
+    assert sorted(report['removed_remote']) == ['2', '3', '5']
+    assert sheet_ids(sheet) == ['1', '4']
+    assert set(sync.state['rows']) == {'1', '2', '3', '4', '5'}  # ждем подтверждения чтением
+
+    result, report = sync.sync(result)
+    assert [p['id'] for p in result] == ['1', '4']
+    assert report['pulled'] == []
+    assert set(sync.state['rows']) == {'1', '4'}
+
+    result, report = sync.sync(result)
+    assert [p['id'] for p in result] == ['1', '4']
+
+
+def test_local_delete_vs_remote_edit_prefers_remote(tmp_path):
+    sheet, sync = make_sync(tmp_path)
+    products = first_sync(sync, sheet)
+
+    sheet.values[2][4] = '5 р.'
+    edited(sheet)
+    result, report = sync.sync([p for p in products if p['id'] != '2'])
+
+    assert report['conflicts'] == ['2']
+    assert sheet_ids(sheet) == ['1', '2', '3']
+    assert sorted(p['id'] for p in result) == ['1', '2', '3']
+
+
+def test_queued_new_product_is_appended_once(tmp_path):
+    from sheets_queue import SheetsWriteQueue
+
+    sheet, _ = make_sync(tmp_path)
+    worksheet = FakeSpreadsheet(sheet).sheet1
+    queue = SheetsWriteQueue(lambda kind, rows: worksheet.append_rows(rows) or True,
+                             journal_path=str(tmp_path / 'queue.jsonl'))
+
+    def sync_now(products):
+        sync = SheetsDeltaSync(worksheet, state_path=str(tmp_path / 'state.json'),
+                               pending_ids=queue.pending_append_ids())
+        return sync.sync(products)
+
+    _, rows = parse_rows(sheet.values)
+    products, _ = sync_now([dict(record) for _, record in rows.values()])
+
+    # Товар добавлен в менеджере: строка ждет в очереди, а синхронизация идет раньше отправки
+    new = {'id': '9', 'order': '9', 'section': 'home', 'title': 'Новый'}
+    queue.enqueue_append([new.get(field, '') for field in ('id', 'order', 'section', 'title')])
+    products, report = sync_now(products + [new])
+    assert report['appended'] == [] and report['pending'] == ['9']
+    assert report['removed'] == []
+
+    # Повторная синхронизация до отправки тоже не удаляет и не добавляет товар
+    edited(sheet)
+    products, report = sync_now(products)
+    assert report['removed'] == [] and report['appended'] == []
+    assert '9' in [p['id'] for p in products]
+
+    assert queue.flush()
+    edited(sheet)
+    products, report = sync_now(products)
+    assert report['appended'] == [] and report['removed'] == []
+    assert sheet_ids(sheet).count('9') == 1
+
+
+def test_sync_products_file_reads_the_queue_journal(tmp_path, monkeypatch):
+    import sheets_sync
+    from sheets_queue import SheetsWriteQueue
+
+    monkeypatch.chdir(tmp_path)
+    sheet, _ = make_sync(tmp_path)
+    worksheet = FakeSpreadsheet(sheet).sheet1
+    _, rows = parse_rows(sheet.values)
+    products = [dict(record) for _, record in rows.values()] + [{'id': '9', 'title': 'Новый'}]
+    (tmp_path / 'products.json').write_text(json.dumps(products, ensure_ascii=False), encoding='utf-8')
+    SheetsWriteQueue(lambda kind, data: True).enqueue_append(['9', '', '', 'Новый'])
+
+    report = sheets_sync.sync_products_file(str(tmp_path / 'products.json'), worksheet=worksheet)
+    assert report['pending'] == ['9']
+    assert '9' not in sheet_ids(sheet)
@@ -0,0 +1,98 @@
+import json
+import re
+
+import site_build
+from site_build import SiteBuilder, card_image_assets, card_image_preload, is_shell_asset
+
+
+def make_project(tmp_path, price='100'):
+    web = tmp_path / 'web'
+    web.mkdir(exist_ok=True)
+    (web / 'index.html').write_text('<html><head></head><body><script src="app.min.js"></script></body></html>')
+    (web / 'app.min.js').write_text(f'// price {price}\n')
+    product_dir = tmp_path / 'img' / 'product_1'
+    product_dir.mkdir(parents=True, exist_ok=True)
+    (product_dir / 'product_1_1.jpg').write_bytes(b'jpeg')
+    (tmp_path / 'img' / 'bannerh.jpg').write_bytes(b'banner')
+    products = [{'id': '1', 'title': 'Платок', 'section': 'home', 'price': price, 'images': 'product_1/product_1_1.jpg'}]
+    (tmp_path / 'products.json').write_text(json.dumps(products, ensure_ascii=False), encoding='utf-8')
+
+
+def build(tmp_path, **options):
+    return SiteBuilder(dist_dir=str(tmp_path / 'dist'), cache_dir=str(tmp_path / 'cache'),
+                       source_dir=str(tmp_path / 'web'), products_file=str(tmp_path / 'products.json'),
+                       images_dir=str(tmp_path / 'img'), **options).run()
+
+
+def inline_assets(tmp_path):
+    html = (tmp_path / 'dist' / 'index.html').read_text(encoding='utf-8')
+    return json.loads(re.search(r'window.__ASSETS__=(\{.*?\});', html).group(1))
+
+
+def test_shell_assets():
+    assert is_shell_asset('app.min.js')
+    assert is_shell_asset('data/home.json')
+    assert is_shell_asset('img/bannerh.jpg')
+    assert not is_shell_asset('img/product_1/product_1_1.jpg')
+    assert not is_shell_asset('data/products/1.json')
+
+
+def test_index_inlines_only_shell_and_points_to_asset_map(tmp_path):
+    make_project(tmp_path)
+    build(tmp_path)
+    inline = inline_assets(tmp_path)
+    assert 'app.min.js' in inline and 'data/home.json' in inline and 'img/bannerh.jpg' in inline
+    assert 'img/product_1/product_1_1.jpg' not in inline
+    assert 'data/products/1.json' not in inline
+
+    asset_map = json.loads((tmp_path / 'dist' / inline['assets.json']).read_text(encoding='utf-8'))
+    assert set(asset_map) == {'img/product_1/product_1_1.jpg', 'data/products/1.json'}
+    assert (tmp_path / 'dist' / asset_map['img/product_1/product_1_1.jpg']).exists()
+
+
+def test_previous_generation_is_kept_for_grace_period(tmp_path, monkeypatch):
+    make_project(tmp_path)
+    build(tmp_path)
+    old_js = inline_assets(tmp_path)['app.min.js']
+
+    make_project(tmp_path, price='200')
+    report = build(tmp_path)
+    assert inline_assets(tmp_path)['app.min.js'] != old_js
+    assert (tmp_path / 'dist' / old_js).exists()
+    assert old_js not in report['deleted']
+
+    monkeypatch.setattr(site_build, 'RETIRED_GRACE_SECONDS', 0)
+    report = build(tmp_path)
+    assert not (tmp_path / 'dist' / old_js).exists()
+    assert old_js in report['deleted']
+    manifest = json.loads((tmp_path / 'dist' / 'build-manifest.json').read_text(encoding='utf-8'))
+    assert old_js not in manifest['retired']
+
+
+def test_card_image_assets_cover_variants_and_formats_only():
+    assets = {
+        'img/product_1/product_1_1.jpg': 'a.jpg',
+        'img/product_1/product_1_1-320w.webp': 'b.webp',
+        'img/product_1/product_1_10.jpg': 'c.jpg',
+        'data/products/1.json': 'd.json',
+    }
+    cards = [{'images': 'product_1/product_1_1.jpg'}]
+    assert card_image_assets(cards, assets) == {
+        'img/product_1/product_1_1.jpg': 'a.jpg',
+        'img/product_1/product_1_1-320w.webp': 'b.webp',
+    }
+
+
+def test_inline_section_carries_its_image_urls(tmp_path):
+    make_project(tmp_path)
+    build(tmp_path, inline_critical=True)
+    html = (tmp_path / 'dist' / 'index.html').read_text(encoding='utf-8')
+    images = json.loads(re.search(r'window.__INLINE_ASSETS__=(\{.*?\});', html).group(1))
+    asset_map = json.loads((tmp_path / 'dist' / inline_assets(tmp_path)['assets.json']).read_text(encoding='utf-8'))
+    assert images == {'img/product_1/product_1_1.jpg': asset_map['img/product_1/product_1_1.jpg']}
+
+
+def test_preload_uses_first_photo_width():
+    card = {'images': 'product_1/a.jpg,product_1/b.jpg', 'width': '900,2000', 'widths': '320'}
+    link = card_image_preload(card, {})
+    assert 'img/product_1/a.jpg 900w' in link
@@ -0,0 +1,66 @@
+import threading
+
+from stale_cache import StaleWhileRevalidateCache
+
+
+def test_cold_start_failure_returns_none(tmp_path):
+    def loader():
+        raise RuntimeError('Sheets недоступен')
+
+    cache = StaleWhileRevalidateCache(loader, snapshot_path=str(tmp_path / 'snap.json'))
+    assert cache.get(wait_timeout=1) is None
+    assert cache.version == 0
+    assert cache.last_error == 'Sheets недоступен'
+
+
+def test_version_changes_only_with_data(tmp_path):
+    values = [[1], [1], [2]]
+    cache = StaleWhileRevalidateCache(lambda: values.pop(0), snapshot_path=str(tmp_path / 'snap.json'))
+    assert cache.refresh() and cache.version == 1
+    assert cache.refresh() and cache.version == 1
+    assert cache.refresh() and cache.version == 2
+    assert cache.value == [2]
+
+
+def test_snapshot_survives_restart_and_failed_refresh_keeps_value(tmp_path):
+    path = str(tmp_path / 'snap.json')
+    StaleWhileRevalidateCache(lambda: ['a'], snapshot_path=path).refresh()
+
+    def loader():
+        raise RuntimeError('нет сети')
+
+    cache = StaleWhileRevalidateCache(loader, snapshot_path=path)
+    assert cache.source == 'snapshot'
+    assert not cache.refresh()
+    assert cache.get() == ['a']
+
+
+def test_concurrent_refreshes_share_one_load(tmp_path):
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return ['x']
+
+    cache = StaleWhileRevalidateCache(loader, snapshot_path=str(tmp_path / 'snap.json'))
+    first = cache.refresh_in_background()
+    started.wait(5)
+    assert cache.refresh_in_background() is first
+    release.set()
+    first.wait(5)
+    assert calls == [1]
+
+
+def test_current_is_consistent_and_a_b_a_gets_new_version(tmp_path):
+    values = [['A'], ['B'], ['A']]
+    cache = StaleWhileRevalidateCache(lambda: values.pop(0), snapshot_path=str(tmp_path / 'snap.json'))
+    seen = []
+    for _ in range(3):
+        cache.refresh()
+        seen.append(cache.current())
+    assert [value for value, _, _ in seen] == [['A'], ['B'], ['A']]
+    assert [version for _, version, _ in seen] == [1, 2, 3]
+    assert seen[0][2] <= seen[2][2]
@@ -0,0 +1,31 @@
+import http.client
+import threading
+
+from static_files import make_server
+
+
+def test_304_has_no_content_length_and_keeps_connection(tmp_path):
+    (tmp_path / 'app.js').write_text('console.log(1);\n')
+    server = make_server(str(tmp_path), port=0, host='127.0.0.1', quiet=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=5)
+        conn.request('GET', '/app.js')
+        first = conn.getresponse()
+        assert first.status == 200 and first.getheader('Content-Length') == '16'
+        first.read()
+
+        conn.request('GET', '/app.js', headers={'If-None-Match': first.getheader('ETag')})
+        cached = conn.getresponse()
+        assert cached.status == 304
+        assert cached.getheader('Content-Length') is None
+        cached.read()
+
+        # Соединение пригодно для следующего запроса
+        conn.request('GET', '/app.js')
+        again = conn.getresponse()
+        assert again.status == 200 and again.read() == b'console.log(1);\n'
+        conn.close()
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,25 @@
+import sync_and_deploy
+
+
+def report(**changes):
+    base = {'pulled': [], 'pushed': [], 'appended': [], 'aborted': False}
+    base.update(changes)
+    return base
+
+
+def test_aborted_sync_stops_the_pipeline(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'web').mkdir()
+    (tmp_path / 'products.json').write_text('[]')
+    monkeypatch.setattr(sync_and_deploy, 'sync_products_file', lambda path: report(aborted=True))
+    assert sync_and_deploy.sync_from_sheets() is False
+    assert not (tmp_path / 'web' / 'products.json').exists()
+
+
+def test_successful_sync_copies_products(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'web').mkdir()
+    (tmp_path / 'products.json').write_text('[]')
+    monkeypatch.setattr(sync_and_deploy, 'sync_products_file', lambda path: report(pulled=['1']))
+    assert sync_and_deploy.sync_from_sheets() is True
+    assert (tmp_path / 'web' / 'products.json').read_text() == '[]'
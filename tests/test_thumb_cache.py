@@ -0,0 +1,75 @@
+import os
+import time
+
+from PIL import Image
+
+from thumb_cache import DataUriCache, ThumbnailCache
+
+
+def make_photo(path, color):
+    Image.new('RGB', (300, 300), color).save(path, 'JPEG')
+    return str(path)
+
+
+def test_identical_photos_share_one_data_uri(tmp_path):
+    cache = DataUriCache(size=32)
+    first = make_photo(tmp_path / 'a.jpg', 'red')
+    second = tmp_path / 'b.jpg'
+    second.write_bytes(open(first, 'rb').read())
+    assert cache.get(first) == cache.get(str(second))
+    assert (cache.misses, cache.hits) == (1, 1)
+
+
+def test_replaced_photo_keeps_one_hash_entry(tmp_path):
+    cache = DataUriCache(size=32)
+    path = make_photo(tmp_path / 'a.jpg', 'red')
+    first = cache.content_hash(path)
+    make_photo(tmp_path / 'a.jpg', 'blue')
+    os.utime(path, ns=(1, 1))
+    assert cache.content_hash(path) != first
+    assert len(cache._hashes) == 1
+
+
+def test_hash_entries_are_bounded(tmp_path):
+    cache = DataUriCache(size=32, hash_entries=2)
+    paths = [make_photo(tmp_path / f'{i}.jpg', 'red') for i in range(3)]
+    for path in paths:
+        cache.content_hash(path)
+    assert list(cache._hashes) == [os.path.abspath(p) for p in paths[1:]]
+
+
+def wait_for(callbacks, count, timeout=30):
+    deadline = time.time() + timeout
+    while len(callbacks) < count and time.time() < deadline:
+        time.sleep(0.01)
+    return callbacks
+
+
+def test_thumbnail_is_built_in_background(tmp_path):
+    cache = ThumbnailCache(cache_dir=str(tmp_path / 'cache'), size=32, workers=1)
+    try:
+        src = make_photo(tmp_path / 'a.jpg', 'red')
+        results = []
+        cache.request(src, results.append)
+        path, = wait_for(results, 1)
+        assert os.path.exists(path)
+        assert cache.get(src) == path
+    finally:
+        cache.shutdown()
+
+
+def test_broken_source_calls_back_with_none_once(tmp_path):
+    cache = ThumbnailCache(cache_dir=str(tmp_path / 'cache'), size=32, workers=1)
+    try:
+        broken = tmp_path / 'broken.jpg'
+        broken.write_bytes(b'not an image')
+        results = []
+        cache.request(str(broken), results.append)
+        assert wait_for(results, 1) == [None]
+
+        # Повторная отрисовка не запускает сборку заново
+        cache.request(str(broken), results.append)
+        assert results == [None, None]
+        assert not cache._pending
+    finally:
+        cache.shutdown()
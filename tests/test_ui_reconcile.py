@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+from ui_reconcile import KeyedList, RenderWindow, scroll_position, viewport_capacity
+
+
+def make_list():
+    return KeyedList(
+        build=lambda item: {'id': item['id'], 'title': item['title']},
+        signature=lambda item: item['title'],
+        update=lambda control, item: control.update(title=item['title']),
+    )
+
+
+def test_reconcile_reuses_updates_and_moves_by_key():
+    keyed = make_list()
+    controls = []
+    items = [{'id': 1, 'title': 'a'}, {'id': 2, 'title': 'b'}, {'id': 3, 'title': 'c'}]
+    assert keyed.reconcile(controls, items)['built'] == 3
+    first, second, third = controls
+
+    stats = keyed.reconcile(controls, [{'id': 2, 'title': 'b'}, {'id': 1, 'title': 'A'}])
+    assert stats == {'built': 0, 'updated': 1, 'kept': 1, 'removed': 1, 'moved': True}
+    assert controls[0] is second and controls[1] is first
+    assert first['title'] == 'A'
+
+
+def test_reconcile_without_changes_keeps_the_list():
+    keyed = make_list()
+    controls = []
+    items = [{'id': 1, 'title': 'a'}, {'id': 1, 'title': 'dup'}]
+    keyed.reconcile(controls, items)
+    assert len(controls) == 1
+    assert keyed.reconcile(controls, items)['moved'] is False
+
+
+def test_new_controls_list_starts_over():
+    keyed = make_list()
+    items = [{'id': 1, 'title': 'a'}]
+    keyed.reconcile([], items)
+    fresh = ['stale']
+    assert keyed.reconcile(fresh, items)['built'] == 1
+    assert fresh[0] == {'id': 1, 'title': 'a'}
+
+
+def test_window_grows_at_the_end_and_resets_on_new_key():
+    window = RenderWindow(page_size=10)
+    items = list(range(25))
+    assert window.visible(items, key='home') == items[:10]
+    assert not window.grow(0.5)
+    assert window.grow(0.9)
+    assert window.visible(items, key='home') == items[:20]
+    generation = window.generation
+    assert window.visible(items, key='nessffo') == items[:10]
+    assert window.generation != generation
+
+
+def test_window_fills_the_viewport_without_scroll_events():
+    window = RenderWindow(page_size=10)
+    items = list(range(100))
+    # На экран помещается 25 элементов: первая страница прокрутки бы не дала
+    assert len(window.visible(items, key='home', capacity=25)) == 40
+    assert not window.fit(25)
+
+
+def test_viewport_capacity_and_scroll_position():
+    assert viewport_capacity(1000, 220, per_row=4) == 20
+    assert viewport_capacity(None, 32) == 0
+    assert scroll_position(SimpleNamespace(pixels=50, max_scroll_extent=100)) == 0.5
+    assert scroll_position(SimpleNamespace(pixels=0, max_scroll_extent=0)) == 1.0
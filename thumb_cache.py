@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Кэши миниатюр для менеджера
+
+ThumbnailCache - дисковый кэш миниатюр для сетки просмотра.
+
+Плитка получает миниатюру 200px вместо полноразмерного JPEG. Ключ -
+путь, mtime и размер исходника: после замены фото миниатюра строится
+заново, а старая со временем вытесняется. Миниатюры строятся в пуле
+процессов, кэш ограничен по объему на диске (LRU по времени последнего
+использования). Исходник, из которого миниатюра не строится, запоминается
+и не перезапускается при каждой отрисовке (пока файл не изменится).
+
+DataUriCache - уменьшенные миниатюры в виде data URI в памяти: LRU с
+ограничением по объему, ключ - хеш содержимого файла (одинаковые фото
+кодируются один раз).
+"""
+
+import io
+import os
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+
+from hashing import file_hash
+
+CACHE_DIR = ".thumb_cache"
+THUMB_SIZE = 200
+THUMB_QUALITY = 80
+BUDGET_BYTES = 64 * 1024 * 1024
+DATA_URI_BUDGET_BYTES = 16 * 1024 * 1024
+HASH_ENTRIES = 4096  # сколько путей помнит DataUriCache (хеш по mtime и размеру)
+
+
+def render_thumbnail(src: str, size: int = THUMB_SIZE):
+    """Квадратная миниатюра (как ImageFit.COVER у плитки)"""
+    with Image.open(src) as img:
+        img.draft('RGB', (size * 2, size * 2))  # JPEG декодируется сразу в уменьшенном виде
+        img = ImageOps.exif_transpose(img).convert('RGB')
+        return ImageOps.fit(img, (size, size), Image.LANCZOS)
+
+
+def make_thumbnail(src: str, dst: str, size: int = THUMB_SIZE, quality: int = THUMB_QUALITY) -> str:
+    """Миниатюра в файл; запись атомарная"""
+    thumb = render_thumbnail(src, size)
+    tmp_path = f"{dst}.{os.getpid()}.tmp"
+    thumb.save(tmp_path, 'JPEG', quality=quality, optimize=True)
+    os.replace(tmp_path, dst)
+    return dst
+
+
+class ThumbnailCache:
+    def __init__(self, cache_dir: str = CACHE_DIR, size: int = THUMB_SIZE,
+                 budget_bytes: int = BUDGET_BYTES, workers: int = None):
+        self.cache_dir = cache_dir
+        self.size = size
+        self.budget_bytes = budget_bytes
+        self.workers = workers or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._pool = None
+        self._lock = threading.Lock()
+        self._pending = {}  # ключ -> список колбэков
+        self._entries = {}  # ключ -> (размер, время использования)
+        self._failed = {}  # ключ -> ошибка (битый исходник не строим повторно)
+        os.makedirs(cache_dir, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        """Учет уже лежащих на диске миниатюр"""
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.jpg'):
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                self._entries[name[:-4]] = (stat.st_size, stat.st_mtime)
+
+    def key(self, src: str):
+        """Ключ миниатюры: путь + mtime + размер исходника (None, если файла нет)"""
+        try:
+            stat = os.stat(src)
+        except OSError:
+            return None
+        raw = f"{os.path.abspath(src)}|{stat.st_mtime_ns}|{stat.st_size}|{self.size}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.jpg")
+
+    def _touch(self, key: str):
+        """Отметка использования (mtime файла переживает перезапуск)"""
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+            stat = os.stat(path)
+        except OSError:
+            with self._lock:
+                self._entries.pop(key, None)
+            return
+        with self._lock:
+            self._entries[key] = (stat.st_size, stat.st_mtime)
+
+    def get(self, src: str):
+        """Путь к готовой миниатюре или None (тогда ее нужно заказать через request)"""
+        key = self.key(src)
+        if key is None or key not in self._entries:
+            return None
+        self._touch(key)
+        return self.path_for(key) if key in self._entries else None
+
+    def request(self, src: str, on_ready=None):
+        """
+        Строит миниатюру в фоне. on_ready(путь) вызывается из фонового
+        потока, когда файл готов (сразу - если он уже в кэше), и
+        on_ready(None), если миниатюру построить нельзя: тогда плитка
+        показывает запасной вариант, а не ждет вечно.
+        """
+        ready = self.get(src)
+        if ready:
+            if on_ready:
+                on_ready(ready)
+            return
+        key = self.key(src)
+        if key is None or key in self._failed:
+            if on_ready:
+                on_ready(None)
+            return
+
+        with self._lock:
+            if key in self._pending:
+                if on_ready:
+                    self._pending[key].append(on_ready)
+                return
+            self._pending[key] = [on_ready] if on_ready else []
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            future = self._pool.submit(make_thumbnail, src, self.path_for(key), self.size)
+        future.add_done_callback(lambda f: self._done(key, src, f))
+
+    def _done(self, key: str, src: str, future):
+        with self._lock:
+            callbacks = self._pending.pop(key, [])
+        try:
+            path = future.result()
+        except Exception as e:
+            print(f"⚠️ Миниатюра для {src} не создана: {e}")
+            with self._lock:
+                self._failed[key] = str(e)
+            path = None
+        else:
+            self._touch(key)
+            self.evict()
+        for callback in callbacks:
+            try:
+                callback(path)
+            except Exception as e:
+                print(f"⚠️ Ошибка обновления плитки: {e}")
+
+    def total_bytes(self) -> int:
+        return sum(size for size, _ in self._entries.values())
+
+    def evict(self):
+        """Удаляет давно не использованные миниатюры сверх бюджета"""
+        with self._lock:
+            total = self.total_bytes()
+            if total <= self.budget_bytes:
+                return
+            for key, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+                if total <= self.budget_bytes:
+                    break
+                try:
+                    os.remove(self.path_for(key))
+                except OSError:
+                    pass
+                del self._entries[key]
+                total -= size
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+
+class DataUriCache:
+    def __init__(self, size: int = THUMB_SIZE, budget_bytes: int = DATA_URI_BUDGET_BYTES,
+                 hash_entries: int = HASH_ENTRIES):
+        self.size = size
+        self.budget_bytes = budget_bytes
+        self.hash_entries = hash_entries
+        self._lock = threading.Lock()
+        self._hashes = OrderedDict()  # путь -> (mtime, размер, хеш содержимого), LRU
+        self._uris = OrderedDict()  # хеш -> data URI
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def content_hash(self, src: str) -> str:
+        """
+        Хеш файла; файл перечитывается, только если изменились mtime или
+        размер. На путь хранится одна запись (замененное фото вытесняет
+        свою старую), всего - не больше hash_entries путей.
+        """
+        stat = os.stat(src)
+        path = os.path.abspath(src)
+        with self._lock:
+            entry = self._hashes.get(path)
+            if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                self._hashes.move_to_end(path)
+                return entry[2]
+
+        digest = file_hash(src)
+        with self._lock:
+            self._hashes[path] = (stat.st_mtime_ns, stat.st_size, digest)
+            self._hashes.move_to_end(path)
+            while len(self._hashes) > self.hash_entries:
+                self._hashes.popitem(last=False)
+        return digest
+
+    def get(self, src: str) -> str:
+        """data:image/jpeg;base64,... уменьшенной копии (из кэша, если уже есть)"""
+        digest = self.content_hash(src)
+        with self._lock:
+            uri = self._uris.get(digest)
+            if uri is not None:
+                self._uris.move_to_end(digest)
+                self.hits += 1
+                return uri
+
+        buffer = io.BytesIO()
+        render_thumbnail(src, self.size).save(buffer, 'JPEG', quality=THUMB_QUALITY, optimize=True)
+        uri = "data:image/jpeg;base64," + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+        with self._lock:
+            self.misses += 1
+            if digest not in self._uris:
+                self._uris[digest] = uri
+                self.bytes += len(uri)
+            while self.bytes > self.budget_bytes and len(self._uris) > 1:
+                _, old = self._uris.popitem(last=False)
+                self.bytes -= len(old)
+                self.evictions += 1
+        return uri
+
+    def report(self) -> str:
+        """Строка для лога: объем кэша и попадания"""
+        return (f"🖼️ data URI кэш: {len(self._uris)} шт., {self.bytes / 1024 / 1024:.1f} "
+                f"из {self.budget_bytes / 1024 / 1024:.1f} МБ, попаданий {self.hits}, "
+                f"промахов {self.misses}, вытеснено {self.evictions}")
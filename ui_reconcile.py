@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Сверка списков контролов Flet по ключу (вместо clear() и пересборки)
+
+KeyedList помнит контрол каждого товара. При новом списке товаров:
+- неизменившиеся контролы переиспользуются как есть;
+- изменившиеся (другая «подпись» товара) обновляются на месте;
+- новые строятся, исчезнувшие удаляются.
+
+Flet при page.update() сравнивает дочерние контролы по идентичности и
+отправляет только перемещения, вставки и изменения, поэтому перестановка
+двух товаров стоит O(изменений), а не O(каталога).
+
+RenderWindow ограничивает, сколько элементов длинного списка вообще
+превращается в контролы (дорисовка страницами при прокрутке).
+"""
+
+import math
+
+
+class KeyedList:
+    def __init__(self, build, signature, update=None, key=None):
+        """
+        build(item) -> контрол, signature(item) -> то, что видно на экране
+        (если не изменилась - контрол не трогаем), update(контрол, item) -
+        обновление на месте (без него контрол строится заново),
+        key(item) -> ключ (по умолчанию ID товара).
+        """
+        self.build = build
+        self.signature = signature
+        self.update = update
+        self.key = key or (lambda item: str(item.get('id', '')))
+        self._controls = None
+        self._cache = {}  # ключ -> (контрол, подпись)
+        self.stats = {}
+
+    def reset(self):
+        self._cache = {}
+
+    def reconcile(self, controls: list, items: list) -> dict:
+        """
+        Приводит список controls к items. Возвращает статистику
+        (built, updated, kept, removed, moved). page.update() - за вызывающим.
+        """
+        if controls is not self._controls:
+            # Представление построено заново: старые контролы к нему не относятся
+            self._controls = controls
+            self._cache = {}
+            controls.clear()
+
+        stats = {'built': 0, 'updated': 0, 'kept': 0, 'removed': 0, 'moved': False}
+        cache = {}
+        result = []
+        for item in items:
+            item_key = self.key(item)
+            if item_key in cache:
+                continue  # повторный ключ - показываем один раз
+            signature = self.signature(item)
+            cached = self._cache.get(item_key)
+            if cached is None:
+                control = self.build(item)
+                stats['built'] += 1
+            else:
+                control, old_signature = cached
+                if old_signature == signature:
+                    stats['kept'] += 1
+                elif self.update is not None:
+                    self.update(control, item)
+                    stats['updated'] += 1
+                else:
+                    control = self.build(item)
+                    stats['built'] += 1
+            cache[item_key] = (control, signature)
+            result.append(control)
+
+        stats['removed'] = len(set(self._cache) - set(cache))
+        self._cache = cache
+        if len(result) != len(controls) or any(a is not b for a, b in zip(result, controls)):
+            stats['moved'] = True
+            controls[:] = result
+        self.stats = stats
+        return stats
+
+
+class RenderWindow:
+    """
+    Окно отрисовки длинного списка: строятся первые page_size элементов,
+    а при прокрутке к концу (grow_at - доля прокрутки) - следующая страница.
+    Контролы дальше видимой части плюс одной страницы запаса не создаются.
+
+    Окно только растет (начало всегда 0) - это сознательно неполное
+    решение: оно ускоряет открытие списка, но после прокрутки до конца
+    построены все контролы. Скользящее окно с отступом-заглушкой сверху
+    требует фиксированной высоты элемента и подстройки позиции прокрутки
+    после сдвига, а ни ListView, ни GridView менеджера, ни Treeview этого
+    не дают; при каталоге в сотни товаров растущего окна достаточно.
+
+    generation меняется при каждом сбросе: отложенная дорисовка (after_idle
+    в Tk) по нему узнает, что список уже показан заново.
+    """
+
+    def __init__(self, page_size: int = 60, grow_at: float = 0.8):
+        self.page_size = page_size
+        self.grow_at = grow_at
+        self.limit = page_size
+        self.total = 0
+        self.key = None
+        self.generation = 0
+
+    def reset(self, key=None):
+        self.limit = self.page_size
+        self.key = key
+        self.generation += 1
+
+    def fit(self, capacity: int) -> bool:
+        """
+        capacity - сколько элементов помещается в видимой области. Если
+        первая страница экран не заполняет, прокрутки нет, on_scroll не
+        приходит и окно само не вырастет - поэтому оно сразу расширяется
+        до capacity плюс страница запаса (целыми страницами).
+        True - окно расширено.
+        """
+        needed = math.ceil((capacity + self.page_size) / self.page_size) * self.page_size
+        if capacity <= 0 or self.limit >= needed:
+            return False
+        self.limit = needed
+        return True
+
+    def visible(self, items: list, key=None, capacity: int = 0) -> list:
+        """
+        Видимая часть items; другой key (раздел, поиск) - окно с начала.
+        capacity - сколько элементов помещается на экране (см. fit).
+        """
+        if key != self.key:
+            self.reset(key)
+        self.fit(capacity)
+        self.total = len(items)
+        return items[:self.limit]
+
+    def grow(self, position: float) -> bool:
+        """position - доля прокрутки 0..1; True, если окно расширено и нужно дорисовать"""
+        if position < self.grow_at or self.limit >= self.total:
+            return False
+        self.limit += self.page_size
+        return True
+
+
+def viewport_capacity(height, item_extent: float, per_row: int = 1) -> int:
+    """Сколько элементов высотой item_extent (по per_row в ряд) помещается в height пикселей"""
+    if not height or item_extent <= 0:
+        return 0
+    return math.ceil(height / item_extent) * max(1, per_row)
+
+
+def scroll_position(e) -> float:
+    """Доля прокрутки из события on_scroll Flet (0, если прокручивать некуда)"""
+    extent = getattr(e, 'max_scroll_extent', 0) or 0
+    return (getattr(e, 'pixels', 0) or 0) / extent if extent > 0 else 1.0
@@ -9,6 +9,9 @@ import gspread
 from google.oauth2.credentials import Credentials
 import zipfile
 
+from sheets_client import SheetsClient
+from sheets_sync import SheetsDeltaSync
+
 def update_prices_in_products():
     """Обновление цен в файле products.json"""
     print("🔄 Обновление цен в products.json...")
@@ -77,9 +80,9 @@ def update_google_sheets(products):
         creds = Credentials.from_authorized_user_file(CREDENTIALS_FILE, scopes=SCOPES)
         client = gspread.authorize(creds)
         
-        # Открываем таблицу
+        # Открываем таблицу (вызовы - с ограничением частоты и повторами на 429/5xx)
         spreadsheet = client.open_by_key(spreadsheet_id)
-        worksheet = spreadsheet.sheet1
+        worksheet = SheetsClient().wrap(spreadsheet.sheet1)
         
         # Получаем все данные
         all_values = worksheet.get_all_values()
@@ -87,9 +90,6 @@ def update_google_sheets(products):
             print("❌ Таблица пуста!")
             return False
         
-        headers = all_values[0]
-        data = all_values[1:]
-        
         # Создаем словарь обновленных товаров
         updated_products = {}
         for product in products:
@@ -102,32 +102,10 @@ def update_google_sheets(products):
                (product_id == '1' and section == 'nessffo' and 'цветочный' in title):
                 updated_products[product_id] = product
         
-        # Обновляем строки в таблице
-        updated_count = 0
-        for i, row in enumerate(data, 2):  # Начинаем с 2, так как 1 - заголовки
-            if len(row) > 0:
-                product_id = str(row[0])
-                if product_id in updated_products:
-                    product = updated_products[product_id]
-                    
-                    # Подготавливаем данные для обновления
-                    update_data = [
-                        product.get('id', ''),
-                        product.get('order', ''),
-                        product.get('section', ''),
-                        product.get('title', ''),
-                        product.get('price', ''),
-                        product.get('desc', ''),
-                        product.get('meta', ''),
-                        product.get('status', ''),
-                        product.get('images', ''),
-                        product.get('link', '')
-                    ]
-                    
-                    # Обновляем строку в таблице
-                    worksheet.update(f'A{i}:J{i}', [update_data])
-                    updated_count += 1
-                    print(f"📝 Обновлена строка {i}: {product.get('title', '')} → {product.get('price', '')}")
+        # Отправляем только изменившиеся ячейки одним пакетным запросом
+        cells = SheetsDeltaSync(worksheet).push_products(list(updated_products.values()), all_values)
+        updated_count = len(updated_products)
+        print(f"📝 Изменено ячеек: {cells}")
         
         print(f"✅ Обновлено {updated_count} товаров в Google Sheets")
         return True
@@ -20,9 +20,129 @@ const $mStatus = document.getElementById('mStatus');
 // Данные товаров
 let products = [];
 
+// Карта файлов с отпечатками содержимого:
+// 'img/product_1/product_1_1.jpg' -> 'img/product_1/product_1_1.3f2a1b9c.jpg'
+// В index.html встроены только оболочка и разделы (и фото встроенного
+// раздела - window.__INLINE_ASSETS__), а фото и описания остальных
+// товаров - в assets.<hash>.json, который загружается один раз
+const ASSETS = Object.assign({}, window.__ASSETS__, window.__INLINE_ASSETS__);
+let assetMapRequest = null;
+
+// JSON по адресу; ответ с ошибкой (404, 500) - это ошибка, а не данные
+function fetchJson(url) {
+  return fetch(url).then(response => {
+    if (!response.ok) throw new Error(`HTTP ${response.status}: ${url}`);
+    return response.json();
+  });
+}
+
+// Без карты адресов фото нет: в собранном сайте лежат только файлы с
+// отпечатками, поэтому ошибка пробрасывается, а не подменяется путями img/...
+function loadAssetMap() {
+  if (!ASSETS['assets.json']) return Promise.resolve(ASSETS);
+  if (!assetMapRequest) {
+    const url = ASSETS['assets.json'];
+    assetMapRequest = fetchJson(url)
+      .catch(() => fetchJson(url)) // один повтор: сбой сети бывает разовым
+      .then(map => Object.assign(ASSETS, map))
+      .catch(error => {
+        assetMapRequest = null;
+        console.error('Error loading asset map:', error);
+        throw error;
+      });
+  }
+  return assetMapRequest;
+}
+
+function assetUrl(path) {
+  return ASSETS[path] || path;
+}
+
+function imgUrl(imagePath) {
+  return assetUrl(`img/${imagePath}`);
+}
+
+// Ширина основного файла для записей без поля width (max_size при сжатии)
+const FULL_IMAGE_WIDTH = 2000;
+
+// Приведение записи из JSON к формату витрины
+function normalizeProduct(item) {
+  return {
+    id: `product_${item.id}`,
+    images: item.images.split(',').map(img => img.trim()),
+    // Ширины основных файлов по фото (старые записи - одно число на все)
+    imageWidths: item.width ? String(item.width).split(',').map(w => parseInt(w) || FULL_IMAGE_WIDTH) : [],
+    widths: item.widths ? item.widths.split(',').map(w => parseInt(w)) : [],
+    formats: item.formats ? item.formats.split(',').map(f => f.trim()) : [],
+    title: item.title,
+    price: item.price,
+    desc: item.desc,
+    meta: item.meta,
+    link: item.link,
+    status: item.status,
+    order: parseInt(item.order),
+    section: item.section
+  };
+}
+
+// Собранный сайт отдает каждый раздел отдельным файлом data/<раздел>.json
+// (только карточки, уже по порядку), а описание товара - data/products/<id>.json
+// Первый раздел сборка может встроить прямо в index.html (window.__INLINE_SECTIONS__)
+const INLINE_SECTIONS = window.__INLINE_SECTIONS__ || {};
+const loadedSections = {};
+
+function hasSectionData(section) {
+  return Boolean(INLINE_SECTIONS[section] || ASSETS[`data/${section}.json`]);
+}
+
+async function loadSection(section) {
+  if (!loadedSections[section]) {
+    // Адреса фото встроенного раздела уже в index.html, остальным нужна карта ассетов
+    const request = INLINE_SECTIONS[section]
+      ? Promise.resolve([INLINE_SECTIONS[section]])
+      : Promise.all([fetchJson(ASSETS[`data/${section}.json`]), loadAssetMap()]);
+    loadedSections[section] = request
+      .then(([items]) => {
+        products = products.concat(items.map(normalizeProduct));
+      })
+      .catch(error => {
+        // Неудачную загрузку не запоминаем: следующее открытие раздела повторит запрос
+        delete loadedSections[section];
+        throw error;
+      });
+  }
+  return loadedSections[section];
+}
+
+// Подгрузка описания, состава и ссылки товара (один раз)
+function loadProductDetails(item) {
+  if (item.desc !== undefined) return Promise.resolve(item);
+  if (!item.detailsRequest) {
+    item.detailsRequest = loadAssetMap()
+      .then(() => {
+        const url = ASSETS[`data/products/${item.id.replace('product_', '')}.json`];
+        return url ? fetchJson(url) : { desc: '' };
+      })
+      .then(details => Object.assign(item, details))
+      .catch(error => {
+        item.detailsRequest = null;
+        console.error('Error loading product details:', error);
+        return item;
+      });
+  }
+  return item.detailsRequest;
+}
+
 // Загрузка данных из products.json
 async function loadProducts() {
   try {
+    if (hasSectionData(currentTab)) {
+      // Для первой отрисовки нужен только активный раздел
+      await loadSection(currentTab);
+      renderCatalog();
+      return;
+    }
+    
     if (window.loadProductsWithCacheBust) {
       products = await window.loadProductsWithCacheBust();
     } else {
@@ -32,26 +152,29 @@ async function loadProducts() {
     console.log('Products loaded:', products);
     
     // Преобразуем данные в нужный формат
-    products = products.map(item => ({
-      id: `product_${item.id}`,
-      images: item.images.split(',').map(img => img.trim()),
-      title: item.title,
-      price: item.price,
-      desc: item.desc,
-      meta: item.meta,
-      link: item.link,
-      status: item.status,
-      order: parseInt(item.order),
-      section: item.section
-    }));
+    products = products.map(normalizeProduct);
     
     // Обновляем каталог после загрузки данных
     renderCatalog();
   } catch (error) {
     console.error('Error loading products:', error);
+    showCatalogError(currentTab);
   }
 }
 
+// Раздел не загрузился: сообщение с кнопкой повтора вместо пустой витрины
+function showCatalogError(section) {
+  const catalog = document.getElementById('catalog');
+  if (!catalog || currentTab !== section) return;
+  
+  catalog.innerHTML = '<div class="empty"><div>Не удалось загрузить каталог<br>' +
+    '<button class="fbtn active" type="button">Повторить</button></div></div>';
+  catalog.querySelector('button').addEventListener('click', () => switchTab(section));
+  catalog.style.opacity = '1';
+  catalog.style.visibility = 'visible';
+  catalog.style.display = 'grid';
+}
+
 
 // Инициализация
 document.addEventListener('DOMContentLoaded', () => {
@@ -112,8 +235,17 @@ function switchTab(section) {
   // Обновляем баннер
   loadHero();
   
-  // Обновляем каталог
-  renderCatalog();
+  // Обновляем каталог (раздел подгружается при первом открытии)
+  if (hasSectionData(section)) {
+    loadSection(section)
+      .then(() => { if (currentTab === section) renderCatalog(); })
+      .catch(error => {
+        console.error('Error loading section:', error);
+        showCatalogError(section);
+      });
+  } else {
+    renderCatalog();
+  }
   
   // Устанавливаем атрибут data-section для стилей
   document.body.setAttribute('data-section', section);
@@ -202,7 +334,7 @@ function loadHero() {
   const hero = document.querySelector('.hero');
   if (hero) {
     const banner = currentTab === 'home' ? 'bannerh.jpg' : 'banner.jpg';
-    hero.src = `img/${banner}`;
+    hero.src = imgUrl(banner);
     hero.alt = currentTab === 'home' ? 'Главная страница' : 'Nessffo Collection';
     hero.style.opacity = '1';
     hero.style.visibility = 'visible';
@@ -239,14 +371,66 @@ function renderCatalog(filterType = 'all') {
   catalog.style.display = 'grid';
 }
 
+// Адаптивные копии изображений: product_2_1.jpg -> product_2_1-320w.jpg
+const CARD_SIZES = '(max-width: 1100px) 50vw, 400px';
+
+function variantSrc(imagePath, width, format) {
+  const ext = format ? `.${format}` : '$1';
+  return imgUrl(imagePath.replace(/(\.[a-z0-9]+)$/i, `-${width}w${ext}`));
+}
+
+function formatSrc(imagePath, format) {
+  return imgUrl(imagePath.replace(/\.[a-z0-9]+$/i, `.${format}`));
+}
+
+// Ширина основного файла конкретного фото (дескриптор в srcset)
+function imageWidth(item, imagePath) {
+  const widths = item.imageWidths || [];
+  const index = item.images.indexOf(imagePath);
+  if (index !== -1 && widths[index]) return widths[index];
+  return widths.length === 1 ? widths[0] : FULL_IMAGE_WIDTH;
+}
+
+function buildSrcset(item, imagePath, format) {
+  const full = format ? formatSrc(imagePath, format) : imgUrl(imagePath);
+  if (!item.widths || !item.widths.length) return format ? full : '';
+  return item.widths.map(w => `${variantSrc(imagePath, w, format)} ${w}w`).join(', ') + `, ${full} ${imageWidth(item, imagePath)}w`;
+}
+
+// <source> для AVIF/WebP, JPEG остается в <img> как запасной вариант
+const FORMAT_TYPES = { avif: 'image/avif', webp: 'image/webp' };
+
+function buildSources(item, imagePath) {
+  return ['avif', 'webp']
+    .filter(format => item.formats && item.formats.includes(format))
+    .map(format => `<source type="${FORMAT_TYPES[format]}" data-format="${format}" srcset="${buildSrcset(item, imagePath, format)}" sizes="${CARD_SIZES}">`)
+    .join('');
+}
+
+function setCardImage(img, item, imagePath) {
+  const picture = img.parentElement;
+  if (picture && picture.tagName === 'PICTURE') {
+    picture.querySelectorAll('source').forEach(source => {
+      source.srcset = buildSrcset(item, imagePath, source.dataset.format);
+    });
+  }
+  const srcset = buildSrcset(item, imagePath);
+  if (srcset) img.srcset = srcset;
+  img.src = imgUrl(imagePath);
+}
+
 function createCard(item) {
   const statusText = item.status === 'preorder' ? 'под заказ' : 'в наличии';
   const statusClass = item.status === 'preorder' ? 'pre' : 'in';
+  const srcset = buildSrcset(item, item.images[0]);
+  const srcsetAttrs = srcset ? ` srcset="${srcset}" sizes="${CARD_SIZES}"` : '';
+  const sources = buildSources(item, item.images[0]);
+  const imgTag = `<img src="${imgUrl(item.images[0])}"${srcsetAttrs} alt="${item.title}" loading="lazy">`;
   
   return `
     <div class="card" data-id="${item.id}">
       <div class="card-img">
-        <img src="img/${item.images[0]}" alt="${item.title}" loading="lazy">
+        ${sources ? `<picture>${sources}${imgTag}</picture>` : imgTag}
       </div>
       <h3>${item.title}</h3>
       <div class="price">${item.price}</div>
@@ -262,8 +446,9 @@ function addCardEventListeners() {
     const item = products.find(p => p.id === itemId);
     
     if (item) {
-      // Обработчик клика
+      // Обработчик клика (описание начинаем грузить уже при наведении/касании)
       card.addEventListener('click', () => openModal(item, currentTab));
+      card.addEventListener('pointerenter', () => loadProductDetails(item), { once: true });
       
       // Эффект смены изображений при наведении (только для десктопа)
       if (window.innerWidth > 768) {
@@ -278,7 +463,7 @@ function addCardEventListeners() {
           const applyIdx = (idx) => {
             if (idx !== currentHoverIndex && idx < item.images.length) {
               currentHoverIndex = idx;
-              img.src = `img/${item.images[idx]}`;
+              setCardImage(img, item, item.images[idx]);
             }
           };
           
@@ -332,9 +517,10 @@ function addCardEventListeners() {
 }
 
 // Функции для модального окна (десктоп)
-function openModal(item, section) {
+async function openModal(item, section) {
   // Проверяем размер экрана для определения мобильной/десктопной версии
   const isMobile = window.innerWidth <= 768;
+  const detailsLoaded = item.desc !== undefined;
   
   if (isMobile) {
     // Для мобильной версии открываем новую модалку
@@ -343,6 +529,37 @@ function openModal(item, section) {
     // Для десктопной версии открываем обычную модалку
     openDesktopModal(item, section);
   }
+  if (detailsLoaded) return;
+  
+  // Модалка открывается сразу с данными карточки, описание подставляется после загрузки
+  showModalDetails(item, isMobile, true);
+  await loadProductDetails(item);
+  if (current === item) {
+    showModalDetails(item, isMobile, false);
+  }
+}
+
+// Описание и ссылка в открытой модалке (loading - пока описание грузится)
+function showModalDetails(item, isMobile, loading) {
+  const desc = isMobile ? document.getElementById('mobileDesc') : $mDesc;
+  const link = isMobile ? document.getElementById('mobileLink') : $mLink;
+  if (!desc || !link) return;
+  
+  if (loading) {
+    desc.textContent = 'Загрузка описания…';
+  } else if (item.desc === undefined) {
+    desc.textContent = 'Не удалось загрузить описание';
+  } else {
+    desc.textContent = item.desc;
+  }
+  desc.style.opacity = loading ? '0.5' : '';
+  if (!isMobile) $mMeta.textContent = loading ? '' : (item.meta || '');
+  
+  if (item.link && !loading) {
+    link.href = item.link;
+  } else {
+    link.removeAttribute('href');
+  }
 }
 
 function openDesktopModal(item, section) {
@@ -401,7 +618,7 @@ function openDesktopModal(item, section) {
 function setMainImage(src) {
   const viewerImg = document.getElementById('viewerImg');
   if (viewerImg) {
-    viewerImg.src = `img/${src}`;
+    viewerImg.src = imgUrl(src);
   }
   
   // Добавляем обработчики кликов для листания фото
@@ -447,7 +664,7 @@ function handleMobileViewerClick(e) {
     curIndex = (curIndex - 1 + current.images.length) % current.images.length;
     const mobileMainImg = document.getElementById('mobileMainImg');
     if (mobileMainImg) {
-      mobileMainImg.src = `img/${current.images[curIndex]}`;
+      mobileMainImg.src = imgUrl(current.images[curIndex]);
     }
     updateMobileDots();
   }
@@ -456,7 +673,7 @@ function handleMobileViewerClick(e) {
     curIndex = (curIndex + 1) % current.images.length;
     const mobileMainImg = document.getElementById('mobileMainImg');
     if (mobileMainImg) {
-      mobileMainImg.src = `img/${current.images[curIndex]}`;
+      mobileMainImg.src = imgUrl(current.images[curIndex]);
     }
     updateMobileDots();
   }
@@ -475,10 +692,10 @@ function handleMobileZoomClick(e) {
     const mobileMainImg = document.getElementById('mobileMainImg');
     const mobileZoomImg = document.getElementById('mobileZoomImg');
     if (mobileMainImg) {
-      mobileMainImg.src = `img/${current.images[curIndex]}`;
+      mobileMainImg.src = imgUrl(current.images[curIndex]);
     }
     if (mobileZoomImg) {
-      mobileZoomImg.src = `img/${current.images[curIndex]}`;
+      mobileZoomImg.src = imgUrl(current.images[curIndex]);
     }
     updateMobileDots();
     updateZoomDots();
@@ -489,10 +706,10 @@ function handleMobileZoomClick(e) {
     const mobileMainImg = document.getElementById('mobileMainImg');
     const mobileZoomImg = document.getElementById('mobileZoomImg');
     if (mobileMainImg) {
-      mobileMainImg.src = `img/${current.images[curIndex]}`;
+      mobileMainImg.src = imgUrl(current.images[curIndex]);
     }
     if (mobileZoomImg) {
-      mobileZoomImg.src = `img/${current.images[curIndex]}`;
+      mobileZoomImg.src = imgUrl(current.images[curIndex]);
     }
     updateMobileDots();
     updateZoomDots();
@@ -506,7 +723,7 @@ function renderThumbnails(images) {
   thumbs.innerHTML = '';
   images.forEach((imagePath, idx) => {
     const thumb = document.createElement('img');
-    thumb.src = `img/${imagePath}`;
+    thumb.src = imgUrl(imagePath);
     thumb.alt = '';
     thumb.className = `thumb ${idx === 0 ? 'active' : ''}`;
     thumb.addEventListener('click', () => {
@@ -618,7 +835,7 @@ function openMobileModal(item, section) {
   mobileLink.href = item.link;
   
   // Устанавливаем первое изображение
-  mobileMainImg.src = `img/${item.images[0]}`;
+  mobileMainImg.src = imgUrl(item.images[0]);
   mobileMainImg.alt = item.title;
   
   // Добавляем обработчики кликов для листания фото в мобильной версии
@@ -642,7 +859,7 @@ function openMobileModal(item, section) {
         
         if (curIndex !== idx) {
           curIndex = idx;
-          mobileMainImg.src = `img/${item.images[idx]}`;
+          mobileMainImg.src = imgUrl(item.images[idx]);
           updateMobileDots();
         }
       });
@@ -753,9 +970,9 @@ function openMobileZoom() {
           curIndex = idx;
           const mobileMainImg = document.getElementById('mobileMainImg');
           if (mobileMainImg) {
-            mobileMainImg.src = `img/${current.images[idx]}`;
+            mobileMainImg.src = imgUrl(current.images[idx]);
           }
-          mobileZoomImg.src = `img/${current.images[idx]}`;
+          mobileZoomImg.src = imgUrl(current.images[idx]);
           updateZoomDots();
           updateMobileDots();
         }
@@ -834,9 +1051,9 @@ function addMobileZoomEventHandlers() {
           
           const mobileMainImg = document.getElementById('mobileMainImg');
           if (mobileMainImg) {
-            mobileMainImg.src = `img/${current.images[curIndex]}`;
+            mobileMainImg.src = imgUrl(current.images[curIndex]);
           }
-          mobileZoomImg.src = `img/${current.images[curIndex]}`;
+          mobileZoomImg.src = imgUrl(current.images[curIndex]);
           updateZoomDots();
           updateMobileDots();
         }